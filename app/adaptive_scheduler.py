@@ -0,0 +1,215 @@
+import datetime
+
+from app.db import LOCAL_TIMEZONE
+from app.league_registry import DEFAULT_PRIORITY
+from app.refresh_planner import MATCH_DURATION
+
+# Atualizações antes do início de um jogo (árbitro e escalações mudam perto da hora)
+PRE_KICKOFF_OFFSETS = (datetime.timedelta(minutes=60), datetime.timedelta(minutes=15))
+# Espera após o fim previsto de um jogo para a API consolidar resultado e estatísticas
+POST_MATCH_DELAY = MATCH_DURATION + datetime.timedelta(minutes=15)
+# Ações de uma mesma liga dentro deste intervalo viram uma só
+COALESCE_WINDOW = datetime.timedelta(minutes=30)
+# Jogos que não acontecem (adiados, cancelados, abandonados, W.O.)
+SKIPPED_STATUSES = {"PST", "CANC", "ABD", "AWD", "WO"}
+
+PRE_KICKOFF = "pre_kickoff"
+POST_MATCH = "post_match"
+
+
+class ScheduledRefresh:
+    """
+    Uma atualização planejada para uma liga.
+
+    Attributes:
+    - kind (str): "pre_kickoff" (jogos que vão começar, por árbitro e escalações) ou
+      "post_match" (jogos, classificação e estatísticas dos times depois do fim dos jogos).
+    - league_id (int): ID da liga.
+    - season (int): Temporada.
+    - run_at (datetime): Quando executar (UTC).
+    - fixture_ids (list): Jogos que motivaram a atualização.
+    - priority (int): Menor valor = mais importante no corte pelo orçamento.
+    - league_priority (int): Prioridade da liga no registro de ligas, usada no desempate.
+    - status (str): "scheduled" ou "skipped_budget".
+    """
+
+    def __init__(self, kind: str, league_id: int, season: int, run_at: datetime.datetime,
+                 fixture_ids: list, priority: int, league_priority: int = DEFAULT_PRIORITY):
+        self.kind = kind
+        self.league_id = league_id
+        self.season = season
+        self.run_at = run_at
+        self.fixture_ids = fixture_ids
+        self.priority = priority
+        self.league_priority = league_priority
+        self.status = "scheduled"
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.league_id}:{self.season}:{self.run_at:%Y%m%d%H%M}"
+
+    @property
+    def cost(self) -> int:
+        if self.kind == PRE_KICKOFF:
+            # Uma chamada a /v3/fixtures pelos IDs dos jogos
+            return 1
+        # Jogos pelos IDs, classificação e as estatísticas dos dois times de cada jogo
+        return 2 + 2 * len(self.fixture_ids)
+
+    def describe(self) -> dict:
+        return {
+            "key": self.key,
+            "kind": self.kind,
+            "league_id": self.league_id,
+            "season": self.season,
+            "run_at": self.run_at,
+            "fixture_ids": self.fixture_ids,
+            "cost": self.cost,
+            "status": self.status,
+        }
+
+
+class RefreshSchedule:
+    """
+    Agenda calculada: atualizações planejadas, cortes pelo orçamento e ligas ociosas.
+    """
+
+    def __init__(self, refreshes: list, idle_leagues: list, budget: dict, computed_at):
+        self.refreshes = refreshes
+        self.idle_leagues = idle_leagues
+        self.budget = budget
+        self.computed_at = computed_at
+
+    @property
+    def scheduled(self) -> list:
+        return [refresh for refresh in self.refreshes if refresh.status == "scheduled"]
+
+    def report(self) -> dict:
+        return {
+            "computed_at": self.computed_at,
+            "budget": self.budget,
+            "scheduled": len(self.scheduled),
+            "skipped_budget": len(self.refreshes) - len(self.scheduled),
+            "planned_cost": sum(refresh.cost for refresh in self.scheduled),
+            "idle_leagues": [{"league_id": league_id, "season": season}
+                             for league_id, season in self.idle_leagues],
+            "refreshes": [refresh.describe() for refresh in self.refreshes],
+        }
+
+
+class AdaptiveRefreshPlanner:
+    """
+    Planeja as atualizações das ligas a partir do calendário de jogos guardado.
+
+    - Antes de cada início de jogo, atualiza os jogos que vão começar (60 e 15 minutos antes).
+    - Depois do fim previsto dos jogos, atualiza jogos, classificação e estatísticas dos
+      times da liga uma única vez para os jogos que terminam juntos.
+    - Ligas sem jogos no horizonte não são atualizadas.
+    - O custo planejado por dia (no fuso local) respeita o orçamento diário de cota,
+      descontado do que já foi gasto hoje; as ações menos importantes (e, entre elas, as
+      das ligas de menor prioridade) são cortadas primeiro.
+    """
+
+    def __init__(self, db_instance, daily_budget: int,
+                 horizon: datetime.timedelta = datetime.timedelta(hours=24)):
+        self._db = db_instance
+        self.daily_budget = daily_budget
+        self.horizon = horizon
+
+    def plan(self, leagues: list, now: datetime.datetime = None, spent_today: int = 0,
+             quota_remaining: float = None) -> RefreshSchedule:
+        """
+        Calcula a agenda de atualizações.
+
+        Args:
+        - leagues (list): Ligas do registro de ligas.
+        - now (datetime, opcional): Instante atual (UTC).
+        - spent_today (int): Chamadas à API já feitas hoje pelas tarefas agendadas.
+        - quota_remaining (float, opcional): Saldo atual da cota da API-Football.
+
+        Returns:
+        - RefreshSchedule: Agenda calculada.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        keys = [(league["league_id"], league["season"]) for league in leagues]
+        fixtures = self._db.get_fixture_calendar(
+            keys, now - POST_MATCH_DELAY, now + self.horizon + max(PRE_KICKOFF_OFFSETS))
+
+        candidates = {}
+        for fixture in fixtures:
+            if fixture.get("status") in SKIPPED_STATUSES:
+                continue
+            key = (fixture["league_id"], fixture["season"])
+            kickoff = fixture["date"]
+            actions = candidates.setdefault(key, [])
+            for priority, offset in enumerate(sorted(PRE_KICKOFF_OFFSETS), start=1):
+                # T-15 (prioridade 1) vale mais que T-60 (prioridade 2)
+                actions.append((PRE_KICKOFF, priority, kickoff - offset, fixture["_id"]))
+            actions.append((POST_MATCH, 0, kickoff + POST_MATCH_DELAY, fixture["_id"]))
+
+        league_priorities = {(league["league_id"], league["season"]):
+                             league.get("priority", DEFAULT_PRIORITY) for league in leagues}
+        refreshes = []
+        for (league_id, season), actions in candidates.items():
+            actions = [action for action in actions if now <= action[2] <= now + self.horizon]
+            for refresh in self._coalesce(league_id, season, actions):
+                refresh.league_priority = league_priorities[(league_id, season)]
+                refreshes.append(refresh)
+
+        idle_leagues = [key for key in keys
+                        if not any((refresh.league_id, refresh.season) == key for refresh in refreshes)]
+        budget = self._apply_budget(refreshes, now, spent_today, quota_remaining)
+        refreshes.sort(key=lambda refresh: refresh.run_at)
+
+        return RefreshSchedule(refreshes, idle_leagues, budget, now)
+
+    def _coalesce(self, league_id: int, season: int, actions: list) -> list:
+        refreshes = []
+        for kind in (PRE_KICKOFF, POST_MATCH):
+            group = []
+            for action in sorted((action for action in actions if action[0] == kind),
+                                 key=lambda action: action[2]):
+                if group and action[2] - group[0][2] > COALESCE_WINDOW:
+                    refreshes.append(self._merge(league_id, season, kind, group))
+                    group = []
+                group.append(action)
+            if group:
+                refreshes.append(self._merge(league_id, season, kind, group))
+        return refreshes
+
+    @staticmethod
+    def _merge(league_id: int, season: int, kind: str, group: list) -> ScheduledRefresh:
+        # Antes dos jogos: no horário mais cedo; depois: quando o último jogo terminar
+        run_at = group[0][2] if kind == PRE_KICKOFF else group[-1][2]
+        fixture_ids = list(dict.fromkeys(action[3] for action in group))
+        priority = min(action[1] for action in group)
+        return ScheduledRefresh(kind, league_id, season, run_at, fixture_ids, priority)
+
+    def _apply_budget(self, refreshes: list, now: datetime.datetime, spent_today: int,
+                      quota_remaining: float) -> dict:
+        today = now.astimezone(LOCAL_TIMEZONE).date()
+        remaining = {}
+
+        def budget_for(day):
+            if day not in remaining:
+                remaining[day] = self.daily_budget - (spent_today if day == today else 0)
+                if day == today and quota_remaining is not None:
+                    remaining[day] = min(remaining[day], int(quota_remaining))
+            return remaining[day]
+
+        ordered = sorted(refreshes, key=lambda refresh: (
+            refresh.priority, refresh.league_priority, refresh.run_at))
+        for refresh in ordered:
+            day = refresh.run_at.astimezone(LOCAL_TIMEZONE).date()
+            if refresh.cost <= budget_for(day):
+                remaining[day] -= refresh.cost
+            else:
+                refresh.status = "skipped_budget"
+
+        budget_for(today)
+        return {
+            "daily_budget": self.daily_budget,
+            "spent_today": spent_today,
+            "quota_remaining": quota_remaining,
+            "remaining": {day.isoformat(): value for day, value in sorted(remaining.items())},
+        }
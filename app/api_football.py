@@ -0,0 +1,191 @@
+import asyncio
+import contextvars
+import json
+import random
+import time
+import httpx
+from os import getenv
+from dotenv import load_dotenv
+from app.http_cache import HTTPCache
+from app.metrics import (API_FOOTBALL_REQUESTS, API_FOOTBALL_QUOTA_LIMIT,
+                         API_FOOTBALL_QUOTA_REMAINING)
+from app.profiling import current_profile
+from app.ratelimit_mecanism import (QuotaManager, QuotaExceeded, PRIORITY_NORMAL, LIMIT_HEADER,
+                                    REMAINING_HEADER)
+
+load_dotenv()
+
+API_FOOTBALL_HOST = "api-football-v1.p.rapidapi.com"
+
+# Status HTTP que valem uma nova tentativa
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+# Quem deve contabilizar as requisições feitas no contexto atual (ex.: um job de ingestão);
+# qualquer objeto com ``record_api_call()``. É herdado pelas subtarefas do asyncio.
+current_request_counter = contextvars.ContextVar("current_request_counter", default=None)
+
+
+class APIFootballError(Exception):
+    pass
+
+
+class APIFootballClient:
+    """
+    Cliente assíncrono da API-Football com pool de conexões keep-alive.
+
+    Uma única instância deve ser compartilhada pela aplicação: as conexões TLS são
+    reaproveitadas entre chamadas e o semáforo limita quantas requisições ficam em
+    andamento ao mesmo tempo, mesmo quando várias ligas são atualizadas em paralelo.
+    """
+
+    def __init__(self, api_key: str, quota: QuotaManager, host: str = API_FOOTBALL_HOST,
+                 base_url: str = None, max_concurrency: int = 5, timeout: float = 10.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5,
+                 cache: HTTPCache = None):
+        self.api_key = api_key
+        self.quota = quota
+        self.cache = cache
+        self.host = host
+        # Permite apontar para um servidor substituto (ex.: bench/fake_api_football.py)
+        self.base_url = base_url or f"https://{host}"
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._client = None
+        self._semaphore = None
+        # Requisições de fato enviadas à API (tentativas incluídas; acertos do cache não)
+        self.requests_made = 0
+
+    @classmethod
+    def from_env(cls, quota: QuotaManager):
+        cache = None
+        if getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true':
+            cache = HTTPCache(
+                getenv('HTTP_CACHE_DIR', '.api_football_cache'),
+                max_bytes=int(float(getenv('HTTP_CACHE_MAX_MB', 256)) * 1024 * 1024))
+
+        return cls(
+            api_key=getenv('API_FOOTBALL_KEY'),
+            quota=quota,
+            host=getenv('API_FOOTBALL_HOST', API_FOOTBALL_HOST),
+            base_url=getenv('API_FOOTBALL_BASE_URL'),
+            max_concurrency=int(getenv('API_FOOTBALL_MAX_CONCURRENCY', 5)),
+            timeout=float(getenv('API_FOOTBALL_TIMEOUT', 10)),
+            max_retries=int(getenv('API_FOOTBALL_MAX_RETRIES', 3)),
+            cache=cache,
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Criado sob demanda para ficar preso ao event loop em execução
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    'X-RapidAPI-Key': self.api_key or "",
+                    'X-RapidAPI-Host': self.host,
+                },
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt) + random.uniform(0, self.backoff_factor)
+
+    @staticmethod
+    def _record_quota(headers):
+        remaining = headers.get(REMAINING_HEADER)
+        if remaining is not None:
+            API_FOOTBALL_QUOTA_REMAINING.set(float(remaining))
+        limit = headers.get(LIMIT_HEADER)
+        if limit is not None:
+            API_FOOTBALL_QUOTA_LIMIT.set(float(limit))
+
+    async def get(self, endpoint: str, params: dict = None, priority: int = PRIORITY_NORMAL,
+                  force: bool = False) -> dict:
+        """
+        Faz uma requisição GET à API-Football, com novas tentativas e backoff exponencial.
+
+        Respostas ainda frescas no cache em disco são servidas sem chamar a API; as
+        vencidas são revalidadas com ETag/Last-Modified quando a API os fornece.
+
+        Args:
+        - endpoint (str): Caminho do endpoint, por exemplo "/v3/standings".
+        - params (dict): Parâmetros da query string.
+        - priority (int): Classe de prioridade da requisição na cota compartilhada.
+        - force (bool): Se True, chama a API mesmo com uma resposta fresca no cache (ex.:
+          logo depois de um jogo), ainda revalidando com ETag/Last-Modified.
+
+        Returns:
+        - dict: Corpo da resposta em JSON.
+        """
+        entry = None
+        if self.cache is not None:
+            entry = await asyncio.to_thread(self.cache.get, endpoint, params)
+            if entry is not None and entry.is_fresh() and not force:
+                self.cache.record_hit(entry)
+                return json.loads(entry.body)
+            self.cache.record_miss()
+
+        client = self._get_client()
+        headers = entry.validators() if entry is not None else {}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.quota.acquire(priority)
+            except QuotaExceeded as e:
+                # Não segura a requisição ou o job por horas esperando a cota renovar
+                raise APIFootballError(str(e)) from e
+            self.requests_made += 1
+            counter = current_request_counter.get()
+            if counter is not None:
+                counter.record_api_call()
+            response = None
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(endpoint, params=params, headers=headers)
+                    finally:
+                        profile = current_profile.get()
+                        if profile is not None:
+                            profile.record_upstream(time.perf_counter() - started)
+                API_FOOTBALL_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+                self._record_quota(response.headers)
+                await asyncio.to_thread(self.quota.sync_from_headers, response.headers)
+                if response.status_code == 304 and entry is not None:
+                    await asyncio.to_thread(self.cache.revalidated, entry)
+                    return json.loads(entry.body)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    data = response.json()
+                    # Respostas com erros no corpo (ex.: cota, parâmetros) não são guardadas
+                    if self.cache is not None and not data.get("errors"):
+                        await asyncio.to_thread(
+                            self.cache.put, endpoint, params, response.content, response.headers)
+                    return data
+                error = APIFootballError(
+                    f"API-Football respondeu {response.status_code} em {endpoint}")
+            except httpx.TransportError as e:
+                API_FOOTBALL_REQUESTS.inc(endpoint=endpoint, status="error")
+                error = e
+            except httpx.HTTPStatusError as e:
+                raise APIFootballError(str(e)) from e
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, response))
+
+        raise error
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
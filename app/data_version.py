@@ -0,0 +1,93 @@
+import threading
+import time
+
+# Intervalo padrão, em segundos, entre leituras da versão compartilhada
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+class SharedDataVersion:
+    """
+    Versão dos dados servidos pelos endpoints de leitura, compartilhada entre workers.
+
+    A versão é um contador no MongoDB que a ingestão incrementa sempre que grava algo que
+    os endpoints servem. Cada worker relê o contador no máximo a cada ``check_interval``
+    segundos e, quando ele avança, chama ``on_change`` para descartar o que calculou a
+    partir dos dados anteriores (``ResponseCache``, ``Screener`` e ``StandingsIndex``).
+    Um worker que grava algo descarta os seus caches na hora; os demais, em até
+    ``check_interval`` segundos.
+    """
+
+    def __init__(self, db_async, on_change, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self._db = db_async
+        self.on_change = on_change
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # Última versão vista por este worker; None antes da primeira leitura
+        self.version = None
+        self._checked_at = None
+        self.checks = 0
+        self.changes = 0
+        self.errors = 0
+
+    def _observe(self, version: int):
+        with self._lock:
+            changed = self.version is None or version > self.version
+            if changed:
+                self.version = version
+                self.changes += 1
+        if changed:
+            self.on_change()
+
+    async def check(self):
+        """
+        Relê a versão compartilhada, se a última leitura tiver mais de ``check_interval``
+        segundos, e descarta os caches locais se ela mudou.
+
+        Uma falha na leitura é registrada e não interrompe a requisição; os caches locais
+        continuam valendo até a próxima leitura.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            # Marcado antes da leitura, para que requisições simultâneas não a repitam
+            self._checked_at = now
+            self.checks += 1
+
+        try:
+            version = await self._db.get_data_version()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Erro ao ler a versão dos dados: {str(e)}")
+            return
+        self._observe(version)
+
+    async def bump(self) -> int:
+        """
+        Incrementa a versão compartilhada, avisando os outros workers de que os dados mudaram.
+
+        Se outro worker também a incrementou desde a última leitura, os caches locais são
+        descartados por inteiro.
+
+        Returns:
+        - int: Nova versão.
+        """
+        version = await self._db.increment_data_version()
+        with self._lock:
+            expected = self.version is not None and version == self.version + 1
+            if expected:
+                self.version = version
+        if not expected:
+            self._observe(version)
+        return version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "check_interval": self.check_interval,
+                "checks": self.checks,
+                "changes": self.changes,
+                "errors": self.errors,
+            }
@@ -1,16 +1,80 @@
-from pymongo import MongoClient
+from pymongo import (MongoClient, ASCENDING, DESCENDING, UpdateOne, ReplaceOne, DeleteMany,
+                     ReturnDocument)
 from os import getenv
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
 import datetime
+import functools
+import hashlib
+import json
+import pytz
+from app.metrics import CommandMetricsListener
+from app.profiling import ProfilingListener
 
 load_dotenv()
 
+# Fuso horário usado para definir o que é "hoje"
+LOCAL_TIMEZONE = pytz.timezone('America/Sao_Paulo')
+
+# Status da API-Football de jogos encerrados
+FINISHED_STATUSES = ["FT", "AET", "PEN"]
+
+# Documentos por lote nas leituras em streaming
+STREAM_BATCH_SIZE = int(getenv('MONGODB_STREAM_BATCH_SIZE', 500))
+
+
+def _batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
 class MongoDB:
     def __init__(self):
-        self.client = MongoClient(getenv('MONGODB_URI'))
+        self.client = MongoClient(
+            getenv('MONGODB_URI'), tz_aware=True,
+            event_listeners=[CommandMetricsListener(), ProfilingListener()])
         self.db = self.client[getenv('DB_NAME')]
         self.collection = self.db[getenv('COLLECTION_NAME')]
+        self.team_stats_collection = self.db[getenv(
+            'TEAM_STATS_COLLECTION_NAME', 'team_stats')]
+        self.fixtures_collection = self.db[getenv(
+            'FIXTURES_COLLECTION_NAME', 'fixtures')]
+        self.match_details_collection = self.db[getenv(
+            'MATCH_DETAILS_COLLECTION_NAME', 'match_details')]
+        self.job_runs_collection = self.db[getenv(
+            'JOB_RUNS_COLLECTION_NAME', 'job_runs')]
+        self.jobs_collection = self.db[getenv('JOBS_COLLECTION_NAME', 'jobs')]
+        self.counters_collection = self.db[getenv('COUNTERS_COLLECTION_NAME', 'counters')]
+
+    def ensure_indexes(self):
+        """
+        Cria os índices das coleções (idempotente).
+
+        Não roda na criação da instância, para que importar a aplicação não exija um
+        banco acessível: é chamada na inicialização da API e pela migração
+        (``python -m app.migrate``).
+        """
+        self.fixtures_collection.create_index(
+            [("league_id", ASCENDING), ("season", ASCENDING), ("date", ASCENDING)])
+        self.fixtures_collection.create_index([("status", ASCENDING)])
+        self.match_details_collection.create_index(
+            [("league_id", ASCENDING), ("season", ASCENDING), ("date", ASCENDING)])
+        self.match_details_collection.create_index(
+            [("season", ASCENDING), ("in_week", ASCENDING), ("quartile", ASCENDING)])
+        self.team_stats_collection.create_index(
+            [("team_id", ASCENDING), ("league_id", ASCENDING), ("season", ASCENDING)],
+            unique=True)
+        self.job_runs_collection.create_index([("job", ASCENDING), ("started_at", DESCENDING)])
+        self.job_runs_collection.create_index([("started_at", DESCENDING)])
+        self.jobs_collection.create_index([("created_at", DESCENDING)])
 
     def update_league_data(self, league_id: int, season: int, data: dict):
         query = {"league_info.id": league_id, "league_info.season": season}
@@ -38,152 +102,425 @@ class MongoDB:
             raise ValueError(
                 f"No standings data found for league_id {league_id} and season {season}.")
 
-    def update_today_matches(self, league_id: int, season: int, today_matches: list):
+    @staticmethod
+    def _fixture_date(fixture: dict) -> datetime.datetime:
+        timestamp = fixture.get('timestamp')
+        if timestamp is not None:
+            return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+        return datetime.datetime.fromisoformat(fixture['date']).astimezone(datetime.timezone.utc)
+
+    @staticmethod
+    def fixture_content_hash(match: dict) -> str:
+        """
+        Calcula um hash estável do conteúdo de um jogo (campos "fixture" e "teams").
+        """
+        content = {"fixture": match.get('fixture', {}), "teams": match.get('teams', {})}
+        encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha1(encoded).hexdigest()
+
+    def _fixture_document(self, league_id: int, season: int, match: dict) -> dict:
+        fixture = match.get('fixture', {})
+        return {
+            "_id": fixture['id'],
+            "league_id": league_id,
+            "season": season,
+            "date": self._fixture_date(fixture),
+            "status": fixture.get('status', {}).get('short'),
+            "content_hash": self.fixture_content_hash(match),
+            "fixture": fixture,
+            "teams": match.get('teams', {}),
+        }
+
+    def sync_fixtures(self, league_id: int, season: int, matches: list, window: dict = None) -> dict:
         """
-        Atualiza os jogos do dia na coleção MongoDB para uma liga específica.
+        Sincroniza jogos com a coleção de jogos enviando apenas as diferenças.
+
+        Os jogos recebidos são comparados com os armazenados pelo ID e pelo hash do
+        conteúdo; inserções, alterações e remoções vão em um único ``bulk_write``
+        não ordenado.
 
         Args:
         - league_id (int): ID da liga.
         - season (int): Temporada.
-        - today_matches (list): Lista de informações completas dos jogos do dia.
+        - matches (list): Lista de jogos com os campos "fixture" e "teams".
+        - window (dict, opcional): Janela {"from", "to"} coberta pelos jogos recebidos.
+          Jogos armazenados nessa janela que não vieram na lista são removidos.
 
-        Esta função atualiza os jogos do dia na coleção MongoDB para a liga e temporada especificadas.
+        Returns:
+        - dict: Contagem de jogos inseridos, modificados, inalterados e removidos.
         """
-        query = {"league_info.id": league_id, "league_info.season": season}
-        new_data = {"$set": {"today_matches": today_matches}}
+        documents = {}
+        for match in matches:
+            document = self._fixture_document(league_id, season, match)
+            documents[document["_id"]] = document
+
+        query = {"_id": {"$in": list(documents)}}
+        if window is not None:
+            query = {"$or": [query, {
+                "league_id": league_id,
+                "season": season,
+                "date": {"$gte": window["from"], "$lt": window["to"]},
+            }]}
+        stored = {
+            fixture["_id"]: fixture.get("content_hash")
+            for fixture in self.fixtures_collection.find(query, {"content_hash": 1})
+        }
 
-        self.collection.update_one(query, new_data)
+        counts = {"inserted": 0, "modified": 0, "unchanged": 0, "removed": 0}
+        operations = []
+        for fixture_id, document in documents.items():
+            if fixture_id not in stored:
+                counts["inserted"] += 1
+            elif stored[fixture_id] != document["content_hash"]:
+                counts["modified"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            operations.append(ReplaceOne({"_id": fixture_id}, document, upsert=True))
+
+        removed_ids = [fixture_id for fixture_id in stored if fixture_id not in documents]
+        if removed_ids:
+            counts["removed"] = len(removed_ids)
+            operations.append(DeleteMany({"_id": {"$in": removed_ids}}))
+            self.match_details_collection.delete_many({"_id": {"$in": removed_ids}})
+
+        if operations:
+            self.fixtures_collection.bulk_write(operations, ordered=False)
+
+        return counts
+
+    def _find_fixtures(self, query: dict) -> list:
+        projection = {"_id": 0, "fixture": 1, "teams": 1}
+        return list(self.fixtures_collection.find(
+            query, projection, sort=[("date", ASCENDING)]))
+
+    @staticmethod
+    def today_range() -> tuple:
+        """
+        Retorna o início e o fim (exclusivo) do dia de hoje no fuso local, em UTC.
+        """
+        today = datetime.datetime.now(LOCAL_TIMEZONE).date()
+        start = LOCAL_TIMEZONE.localize(datetime.datetime.combine(today, datetime.time()))
+        end = LOCAL_TIMEZONE.localize(datetime.datetime.combine(
+            today + datetime.timedelta(days=1), datetime.time()))
+        return start.astimezone(datetime.timezone.utc), end.astimezone(datetime.timezone.utc)
+
+    @staticmethod
+    def date_window(start_date: str, end_date: str) -> dict:
+        """
+        Converte datas YYYY-MM-DD (inclusivas, em UTC) em uma janela [from, to).
+        """
+        start = datetime.datetime.fromisoformat(start_date).replace(tzinfo=datetime.timezone.utc)
+        end = datetime.datetime.fromisoformat(end_date).replace(tzinfo=datetime.timezone.utc)
+        return {"from": start, "to": end + datetime.timedelta(days=1)}
 
-    def get_today_matches(self, league_id: int, season: int):
+    def update_week_matches(self, league_id: int, season: int, week_matches: list,
+                            start_date: str, end_date: str):
         """
-        Obtém os jogos do dia para uma liga específica do banco de dados MongoDB.
+        Atualiza os jogos da semana na coleção de jogos para uma liga específica.
 
         Args:
         - league_id (int): ID da liga.
         - season (int): Temporada.
+        - week_matches (list): Lista de informações completas dos jogos da semana.
+        - start_date (str): Data de início da semana (no formato YYYY-MM-DD).
+        - end_date (str): Data de término da semana (no formato YYYY-MM-DD).
+
+        Esta função sincroniza os jogos com a coleção de jogos, remove os jogos da janela
+        que não vieram mais da API (adiados ou remarcados) e registra a janela da semana
+        no documento da liga.
 
         Returns:
-        - list: Uma lista de informações completas dos jogos do dia.
+        - dict: Contagem de jogos inseridos, modificados, inalterados e removidos.
         """
-        query = {
-            "league_info.id": league_id,
-            "league_info.season": season,
-            "today_matches": {"$exists": True, "$not": {"$size": 0}}
-        }
-
-        projection = {"_id": 0, "today_matches": 1}
-        matches = self.collection.find(query, projection)
+        window = self.date_window(start_date, end_date)
+        counts = self.sync_fixtures(league_id, season, week_matches, window)
+        self.set_week_window(league_id, season, {
+            **window, "synced_at": datetime.datetime.now(datetime.timezone.utc)})
 
-        return list(matches)
+        return counts
 
-    def update_week_matches(self, league_id: int, season: int, week_matches: list):
+    def set_week_window(self, league_id: int, season: int, window: dict):
         """
-        Atualiza os jogos da semana na coleção MongoDB para uma liga específica.
+        Registra a janela da semana de uma liga e quando ela foi sincronizada com a API.
 
         Args:
         - league_id (int): ID da liga.
         - season (int): Temporada.
-        - week_matches (list): Lista de informações completas dos jogos da semana.
-
-        Esta função atualiza os jogos da semana na coleção MongoDB para a liga e temporada especificadas.
+        - window (dict): Janela {"from", "to", "synced_at"}.
         """
         query = {"league_info.id": league_id, "league_info.season": season}
-        new_data = {"$set": {"week_matches": week_matches}}
+        self.collection.update_one(query, {"$set": {"week_window": window}})
+
+    def get_fixtures_in_window(self, league_id: int, season: int, window: dict) -> list:
+        """
+        Obtém os jogos guardados de uma liga em uma janela {"from", "to"}.
 
-        self.collection.update_one(query, new_data)
+        Returns:
+        - list: Jogos com os campos "fixture" e "teams", ordenados por data.
+        """
+        query = {
+            "league_id": league_id,
+            "season": season,
+            "date": {"$gte": window["from"], "$lt": window["to"]},
+        }
+        return self._find_fixtures(query)
 
-    def get_all_week_matches(self, season: int):
+    def get_fixture_calendar(self, league_keys: list, start: datetime.datetime,
+                             end: datetime.datetime) -> list:
         """
-        Obtém os jogos da semana para todas as ligas do banco de dados MongoDB em uma temporada específica.
+        Obtém o calendário guardado (ID, liga, data e status) dos jogos de um conjunto de
+        ligas entre duas datas.
 
         Args:
-        - season (int): Temporada.
+        - league_keys (list): (league_id, season) das ligas.
+        - start (datetime): Início (inclusivo).
+        - end (datetime): Fim (exclusivo).
 
         Returns:
-        - list: Uma lista de informações completas dos jogos da semana para todas as ligas.
+        - list: Jogos com "_id", "league_id", "season", "date" e "status", ordenados por data.
         """
+        if not league_keys:
+            return []
         query = {
-            "league_info.season": season,
-            "week_matches": {"$exists": True, "$not": {"$size": 0}}
+            "$or": [{"league_id": league_id, "season": season} for league_id, season in league_keys],
+            "date": {"$gte": start, "$lt": end},
         }
+        projection = {"league_id": 1, "season": 1, "date": 1, "status": 1}
+        return list(self.fixtures_collection.find(query, projection, sort=[("date", ASCENDING)]))
 
-        projection = {"_id": 0, "week_matches": 1, "league_info.id": 1}
-        matches = self.collection.find(query, projection)
+    def get_week_windows(self, season: int) -> dict:
+        """
+        Obtém a janela da semana registrada para cada liga de uma temporada.
 
-        return list(matches)
+        Args:
+        - season (int): Temporada.
 
-    def get_week_matches(self, league_id: int, season: int):
+        Returns:
+        - dict: Janelas {"from", "to", "synced_at"} indexadas pelo ID da liga.
         """
-        Obtém os jogos da semana para uma liga específica do banco de dados MongoDB.
+        query = {"league_info.season": season, "week_window": {"$exists": True}}
+        projection = {"_id": 0, "league_info.id": 1, "week_window": 1}
+
+        return {
+            league["league_info"]["id"]: league["week_window"]
+            for league in self.collection.find(query, projection)
+        }
+
+    def get_last_played_dates(self, teams_by_league: dict) -> dict:
+        """
+        Obtém a data do último jogo encerrado de vários times, em uma única agregação.
 
         Args:
-        - league_id (int): ID da liga.
-        - season (int): Temporada.
+        - teams_by_league (dict): IDs dos times indexados por (league_id, season).
 
         Returns:
-        - list: Uma lista de informações completas dos jogos da semana.
+        - dict: Data do último jogo indexada por (league_id, season, team_id).
         """
-        query = {
-            "league_info.id": league_id,
-            "league_info.season": season,
-            "week_matches": {"$exists": True, "$not": {"$size": 0}}
+        if not teams_by_league:
+            return {}
+
+        team_ids = list({team_id for team_ids in teams_by_league.values() for team_id in team_ids})
+        pipeline = [
+            {"$match": {"$or": [
+                {"league_id": league_id, "season": season, "status": {"$in": FINISHED_STATUSES}}
+                for league_id, season in teams_by_league
+            ]}},
+            {"$project": {
+                "league_id": 1,
+                "season": 1,
+                "date": 1,
+                "team_id": ["$teams.home.id", "$teams.away.id"],
+            }},
+            {"$unwind": "$team_id"},
+            {"$match": {"team_id": {"$in": team_ids}}},
+            {"$group": {
+                "_id": {"league_id": "$league_id", "season": "$season", "team_id": "$team_id"},
+                "last_played": {"$max": "$date"},
+            }},
+        ]
+
+        return {
+            (result["_id"]["league_id"], result["_id"]["season"], result["_id"]["team_id"]): result["last_played"]
+            for result in self.fixtures_collection.aggregate(pipeline)
         }
 
-        projection = {"_id": 0, "week_matches": 1}
-        matches = self.collection.find(query, projection)
+    def migrate_embedded_fixtures(self, unset_embedded: bool = False) -> int:
+        """
+        Migra os arrays ``week_matches``/``today_matches`` embutidos nos documentos
+        das ligas para a coleção de jogos.
+
+        Args:
+        - unset_embedded (bool): Remove os arrays embutidos das ligas após a migração.
 
-        return list(matches)
+        Returns:
+        - int: Quantidade de jogos migrados.
+        """
+        query = {"$or": [{"week_matches": {"$exists": True}}, {"today_matches": {"$exists": True}}]}
+        projection = {"_id": 1, "league_info.id": 1, "league_info.season": 1,
+                      "week_matches": 1, "today_matches": 1}
+
+        migrated = 0
+        for league in self.collection.find(query, projection):
+            league_id = league["league_info"]["id"]
+            season = league["league_info"]["season"]
+            week_matches = league.get("week_matches", [])
+            matches = week_matches + league.get("today_matches", [])
+            self.sync_fixtures(league_id, season, matches)
+            migrated += len(matches)
+
+            update = {}
+            if week_matches:
+                dates = [self._fixture_date(match['fixture']) for match in week_matches]
+                start = min(dates).replace(hour=0, minute=0, second=0, microsecond=0)
+                end = max(dates).replace(hour=0, minute=0, second=0, microsecond=0)
+                update["$set"] = {"week_window": {
+                    "from": start, "to": end + datetime.timedelta(days=1)}}
+            if unset_embedded:
+                update["$unset"] = {"week_matches": "", "today_matches": ""}
+            if update:
+                self.collection.update_one({"_id": league["_id"]}, update)
+
+        return migrated
 
     def update_team_statistics(self, league_id: int, season: int, team_id: int, team_stats: dict):
-        query = {"league_info.id": league_id, "league_info.season": season}
+        """
+        Atualiza as estatísticas de um time na coleção de estatísticas.
+
+        Args:
+        - league_id (int): ID da liga.
+        - season (int): Temporada.
+        - team_id (int): ID do time.
+        - team_stats (dict): Estatísticas do time.
+        """
+        query = {"team_id": team_id, "league_id": league_id, "season": season}
         update_query = {
             "$set": {
-                f"team_stats.{team_id}": team_stats
+                "statistics": team_stats,
+                "updated_at": datetime.datetime.now(datetime.timezone.utc),
             }
         }
-        self.collection.update_one(query, update_query)
+        self.team_stats_collection.update_one(query, update_query, upsert=True)
 
-    def get_team_stats(self, team_id: int):
+    def get_team_stats_updated_at(self, teams_by_league: dict) -> dict:
         """
-        Obtém as estatísticas de um time com base no ID do time.
+        Obtém a data da última atualização das estatísticas de vários times.
 
         Args:
-        - team_id (int): ID do time.
+        - teams_by_league (dict): IDs dos times indexados por (league_id, season).
 
         Returns:
-        - dict: Estatísticas do time.
+        - dict: Data de atualização indexada por (league_id, season, team_id).
         """
-        query = {
-            f"team_stats.{team_id}": {"$exists": True}
+        if not teams_by_league:
+            return {}
+
+        query = {"$or": [
+            {"league_id": league_id, "season": season, "team_id": {"$in": list(team_ids)}}
+            for (league_id, season), team_ids in teams_by_league.items()
+        ]}
+        projection = {"_id": 0, "team_id": 1, "league_id": 1, "season": 1, "updated_at": 1}
+
+        return {
+            (document["league_id"], document["season"], document["team_id"]): document.get("updated_at")
+            for document in self.team_stats_collection.find(query, projection)
         }
-        projection = {"_id": 0, f"team_stats.{team_id}": 1}
 
-        team_stats_data = self.collection.find_one(query, projection)
+    def migrate_embedded_team_stats(self, unset_embedded: bool = False) -> int:
+        """
+        Migra os mapas ``team_stats.{team_id}`` embutidos nos documentos das ligas
+        para a coleção de estatísticas de times.
 
-        if team_stats_data:
-            return team_stats_data["team_stats"][str(team_id)]
-        else:
-            raise ValueError(f"No team stats found for team_id {team_id}.")
+        Args:
+        - unset_embedded (bool): Remove o mapa embutido das ligas após a migração.
 
-    def get_match_by_id(self, match_id: int):
+        Returns:
+        - int: Quantidade de estatísticas migradas.
         """
-        Get a match by its ID from the MongoDB database.
+        query = {"team_stats": {"$exists": True}}
+        projection = {"_id": 1, "league_info.id": 1, "league_info.season": 1, "team_stats": 1}
+
+        migrated = 0
+        for league in self.collection.find(query, projection):
+            league_id = league["league_info"]["id"]
+            season = league["league_info"]["season"]
+            operations = [
+                UpdateOne(
+                    {"team_id": int(team_id), "league_id": league_id, "season": season},
+                    {"$setOnInsert": {"statistics": team_stats}},
+                    upsert=True)
+                for team_id, team_stats in league["team_stats"].items()
+            ]
+            if operations:
+                self.team_stats_collection.bulk_write(operations, ordered=False)
+                migrated += len(operations)
+
+            if unset_embedded:
+                self.collection.update_one(
+                    {"_id": league["_id"]}, {"$unset": {"team_stats": ""}})
+
+        return migrated
+
+    def get_team_stats_many(self, league_id: int, season: int, team_ids: list) -> dict:
+        """
+        Obtém as estatísticas de vários times em uma liga e temporada, em uma única consulta.
 
         Args:
-        - match_id (int): ID of the match to retrieve.
+        - league_id (int): ID da liga.
+        - season (int): Temporada.
+        - team_ids (list): IDs dos times.
 
         Returns:
-        - dict: Information about the match.
+        - dict: Estatísticas encontradas, indexadas pelo ID do time.
         """
-        query = {"week_matches.fixture.id": match_id}
-        projection = {"_id": 0, "week_matches.$": 1}
+        team_ids = list(dict.fromkeys(team_ids))
+        if not team_ids:
+            return {}
 
-        match_data = self.collection.find_one(query, projection)
-        if match_data and 'week_matches' in match_data:
-            # First match with the given ID
-            return match_data['week_matches'][0]
-        else:
-            raise ValueError(f"No match found for match_id {match_id}.")
+        query = {"league_id": league_id, "season": season, "team_id": {"$in": team_ids}}
+        projection = {"_id": 0, "team_id": 1, "statistics": 1}
+
+        return {
+            document["team_id"]: document["statistics"]
+            for document in self.team_stats_collection.find(query, projection)
+        }
+
+    def get_fixtures(self, league_id: int, season: int, fixture_ids: list = None) -> list:
+        """
+        Obtém os documentos completos dos jogos de uma liga.
+
+        Args:
+        - league_id (int): ID da liga.
+        - season (int): Temporada.
+        - fixture_ids (list, opcional): Restringe aos jogos com esses IDs.
+
+        Returns:
+        - list: Documentos da coleção de jogos.
+        """
+        query = {"league_id": league_id, "season": season}
+        if fixture_ids is not None:
+            query["_id"] = {"$in": fixture_ids}
+
+        return list(self.fixtures_collection.find(query, sort=[("date", ASCENDING)]))
+
+    def get_match_detail_hashes(self, match_ids: list) -> dict:
+        """
+        Obtém o hash das entradas dos documentos pré-calculados de várias partidas.
+        """
+        query = {"_id": {"$in": match_ids}}
+        return {
+            document["_id"]: document.get("inputs_hash")
+            for document in self.match_details_collection.find(query, {"inputs_hash": 1})
+        }
+
+    def write_match_details(self, documents: list):
+        """
+        Grava documentos pré-calculados de partidas, substituindo os anteriores.
+        """
+        operations = [ReplaceOne({"_id": document["_id"]}, document, upsert=True)
+                      for document in documents]
+        if operations:
+            self.match_details_collection.bulk_write(operations, ordered=False)
 
     def get_detailed_match_data(self, match_id: int):
         """
@@ -195,45 +532,314 @@ class MongoDB:
         Returns:
         - dict: Detailed match data in the specified format.
         """
-        match_data = self.get_match_by_id(match_id)
+        document = self.match_details_collection.find_one(
+            {"_id": match_id}, {"_id": 0, "detail": 1})
 
-        if not match_data:
+        if document:
+            return document["detail"]
+        else:
             raise ValueError(f"No match found for match_id {match_id}.")
 
-        fixture = match_data.get('fixture', {})
-        teams = match_data.get('teams', {})
-
-        home_team = teams.get('home', {})
-        away_team = teams.get('away', {})
-        home_id = home_team.get('id', 0)
-        away_id = away_team.get('id', 0)
-
-        # Obtain team statistics using the team IDs
-        home_team_stats = self.get_team_stats(home_id)
-        away_team_stats = self.get_team_stats(away_id)
-
-        # Create the detailed match data object
-        detailed_match_data = {
-            "match_id": match_id,
-            "referee": fixture.get('referee', ""),
-            "venue": fixture.get('venue', {}).get('name', ""),
-            "date": fixture.get('date', ""),
-            "timezone": fixture.get('timezone', ""),
-            "home": {
-                "team_id": home_team.get('id', 0),
-                "team_name": home_team.get('name', ""),
-                "team_logo": home_team.get('logo', ""),
-                "statistics": home_team_stats,
-            },
-            "away": {
-                "team_id": away_team.get('id', 0),
-                "team_name": away_team.get('name', ""),
-                "team_logo": away_team.get('logo', ""),
-                "statistics": away_team_stats,
-            },
+    def get_detailed_match_data_many(self, match_ids: list) -> list:
+        """
+        Get detailed match data for several matches in a single query.
+
+        Args:
+        - match_ids (list): IDs of the matches to retrieve.
+
+        Returns:
+        - list: Detailed match data, in the same order as ``match_ids``. Matches
+          that are not found are omitted; missing team statistics are ``null``.
+        """
+        match_ids = list(dict.fromkeys(match_ids))
+        details = {
+            document["_id"]: document["detail"]
+            for document in self.match_details_collection.find(
+                {"_id": {"$in": match_ids}}, {"detail": 1})
+        }
+
+        return [details[match_id] for match_id in match_ids if match_id in details]
+
+    def get_today_quartile_matches(self, league_id: int, season: int) -> list:
+        """
+        Obtém os jogos do dia de uma liga, ainda não iniciados, que atendem ao critério
+        do quartil.
+
+        Returns:
+        - list: Dados detalhados das partidas.
+        """
+        start, end = self.today_range()
+        query = {
+            "league_id": league_id,
+            "season": season,
+            "date": {"$gte": start, "$lt": end},
+            # A janela da semana também guarda os jogos já iniciados ou encerrados do dia
+            "status": "NS",
+            "quartile": True,
         }
+        documents = self.match_details_collection.find(
+            query, {"_id": 0, "detail": 1}, sort=[("date", ASCENDING)])
+
+        return [document["detail"] for document in documents]
+
+    def get_week_screen_rows(self, season: int) -> list:
+        """
+        Obtém, para os jogos da semana de todas as ligas, os times e suas estatísticas.
+
+        Args:
+        - season (int): Temporada.
+
+        Returns:
+        - list: Documentos com "_id", "home" e "away" ({"team_id", "statistics"}),
+          ordenados por data.
+        """
+        pipeline = [
+            {"$match": {"season": season, "in_week": True}},
+            {"$sort": {"date": ASCENDING}},
+            {"$project": {
+                "home": {"team_id": "$detail.home.team_id", "statistics": "$detail.home.statistics"},
+                "away": {"team_id": "$detail.away.team_id", "statistics": "$detail.away.statistics"},
+            }},
+        ]
+
+        return list(self.match_details_collection.aggregate(pipeline))
+
+    def record_job_run(self, run: dict):
+        """
+        Registra uma execução de tarefa agendada no histórico de execuções.
+
+        Args:
+        - run (dict): Tarefa, worker, início, duração, chamadas à API e resultado.
+        """
+        self.job_runs_collection.insert_one(dict(run))
+
+    def get_job_runs(self, job: str = None, limit: int = 20) -> list:
+        """
+        Obtém as execuções mais recentes das tarefas agendadas.
+
+        Args:
+        - job (str, opcional): Filtra por tarefa.
+        - limit (int): Máximo de execuções.
+
+        Returns:
+        - list: Execuções, da mais recente para a mais antiga.
+        """
+        query = {"job": job} if job else {}
+        return list(self.job_runs_collection.find(
+            query, {"_id": 0}, sort=[("started_at", DESCENDING)], limit=limit))
+
+    def get_api_calls_since(self, start: datetime.datetime) -> int:
+        """
+        Soma as chamadas à API-Football feitas pelas tarefas agendadas desde um instante.
+        """
+        pipeline = [
+            {"$match": {"started_at": {"$gte": start}}},
+            {"$group": {"_id": None, "api_calls": {"$sum": "$api_calls"}}},
+        ]
+        result = list(self.job_runs_collection.aggregate(pipeline))
+        return result[0]["api_calls"] if result else 0
+
+    def save_job(self, snapshot: dict):
+        """
+        Grava o estado de um job de ingestão, preservando um pedido de cancelamento.
+        """
+        self.jobs_collection.update_one(
+            {"_id": snapshot["job_id"]}, {"$set": snapshot}, upsert=True)
+
+    def get_job(self, job_id: str) -> dict:
+        return self.jobs_collection.find_one({"_id": job_id}, {"_id": 0, "cancel_requested": 0})
+
+    def get_jobs(self, limit: int = 20) -> list:
+        return list(self.jobs_collection.find(
+            {}, {"_id": 0, "cancel_requested": 0}, sort=[("created_at", DESCENDING)], limit=limit))
+
+    def request_job_cancel(self, job_id: str) -> bool:
+        """
+        Marca um job ativo para cancelamento pelo worker que o executa.
+
+        Returns:
+        - bool: Se havia um job ativo com esse ID.
+        """
+        updated = self.jobs_collection.update_one(
+            {"_id": job_id, "status": {"$in": ["queued", "running"]}},
+            {"$set": {"cancel_requested": True}})
+        return updated.matched_count > 0
+
+    def is_job_cancel_requested(self, job_id: str) -> bool:
+        document = self.jobs_collection.find_one({"_id": job_id}, {"cancel_requested": 1})
+        return bool(document and document.get("cancel_requested"))
+
+    def get_data_version(self) -> int:
+        """
+        Obtém a versão dos dados servidos pelos endpoints de leitura (0 se nunca incrementada).
+        """
+        document = self.counters_collection.find_one({"_id": "data_version"})
+        return document["value"] if document else 0
+
+    def increment_data_version(self) -> int:
+        """
+        Incrementa atomicamente a versão dos dados servidos pelos endpoints de leitura.
+
+        Returns:
+        - int: Nova versão.
+        """
+        document = self.counters_collection.find_one_and_update(
+            {"_id": "data_version"}, {"$inc": {"value": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER)
+        return document["value"]
+
+    @staticmethod
+    def _weekly_quartile_pipeline(leagues: list, after: tuple = None) -> list:
+        league_ids = [league["league_id"] for league in leagues]
+        pipeline = [
+            {"$match": {
+                "in_week": True,
+                "quartile": True,
+                "$or": [{"league_id": league["league_id"], "season": league["season"]}
+                        for league in leagues],
+            }},
+            {"$addFields": {"league_order": {"$indexOfArray": [league_ids, "$league_id"]}}},
+        ]
+        if after is not None:
+            league_order, date, match_id = after
+            pipeline.append({"$match": {"$or": [
+                {"league_order": {"$gt": league_order}},
+                {"league_order": league_order, "date": {"$gt": date}},
+                {"league_order": league_order, "date": date, "_id": {"$gt": match_id}},
+            ]}})
+        pipeline.append({"$sort": {"league_order": ASCENDING, "date": ASCENDING, "_id": ASCENDING}})
+        return pipeline
+
+    def get_weekly_quartile_report(self, leagues: list) -> list:
+        """
+        Monta o relatório semanal do quartil em uma única agregação no servidor.
+
+        Filtra os jogos da semana que atendem ao critério do quartil apenas das ligas
+        (e temporadas) informadas e ordena pela ordem da lista de ligas e, dentro de
+        cada liga, pela data.
+
+        Args:
+        - leagues (list): Ligas do registro de ligas ({"league_id", "season"}).
+
+        Returns:
+        - list: Dados detalhados das partidas.
+        """
+        if not leagues:
+            return []
+
+        pipeline = self._weekly_quartile_pipeline(leagues)
+        pipeline.append({"$replaceRoot": {"newRoot": "$detail"}})
+
+        return list(self.match_details_collection.aggregate(pipeline))
+
+    def iter_weekly_quartile_report(self, leagues: list, after: tuple = None, limit: int = None,
+                                    batch_size: int = STREAM_BATCH_SIZE):
+        """
+        Percorre o relatório semanal do quartil em lotes, sem carregá-lo inteiro na memória.
+
+        Args:
+        - leagues (list): Ligas do registro de ligas ({"league_id", "season"}).
+        - after (tuple, opcional): Posição (league_order, date, _id) do último jogo já lido.
+        - limit (int, opcional): Máximo de jogos.
+        - batch_size (int): Documentos por lote.
+
+        Yields:
+        - list: Lotes de documentos com "_id", "league_order", "date" e "detail".
+        """
+        if not leagues:
+            return
+
+        pipeline = self._weekly_quartile_pipeline(leagues, after)
+        if limit is not None:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": {"league_order": 1, "date": 1, "detail": 1}})
+
+        cursor = self.match_details_collection.aggregate(pipeline, batchSize=batch_size)
+        try:
+            yield from _batches(cursor, batch_size)
+        finally:
+            cursor.close()
+
+    def iter_detailed_match_data(self, match_ids: list, batch_size: int = STREAM_BATCH_SIZE):
+        """
+        Percorre os dados detalhados de várias partidas em lotes, na ordem de ``match_ids``.
+
+        Yields:
+        - list: Lotes de dados detalhados das partidas encontradas.
+        """
+        for chunk in _batches(match_ids, batch_size):
+            yield self.get_detailed_match_data_many(chunk)
+
+
+class AsyncMongoDB:
+    """
+    Variante assíncrona de ``MongoDB`` para os endpoints ``async def`` e a ingestão.
+
+    As chamadas do pymongo rodam em um pool de threads limitado, então uma consulta lenta
+    não trava o event loop e a quantidade de consultas simultâneas fica sob controle.
+    O contexto (contextvars) da requisição é propagado para a thread.
+    """
+
+    def __init__(self, sync_db: MongoDB, max_workers: int = 8):
+        self.sync = sync_db
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mongodb")
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Executa uma função bloqueante no pool de threads do banco.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def iterate(self, func, *args, **kwargs):
+        """
+        Percorre um gerador bloqueante de lotes, avançando-o no pool de threads do banco.
+        """
+        batches = await self.run(func, *args, **kwargs)
+        try:
+            while True:
+                batch = await self.run(next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            await self.run(batches.close)
+
+    async def get_standings_data(self, league_id: int, season: int) -> dict:
+        return await self.run(self.sync.get_standings_data, league_id, season)
+
+    async def get_detailed_match_data(self, match_id: int):
+        return await self.run(self.sync.get_detailed_match_data, match_id)
+
+    async def get_detailed_match_data_many(self, match_ids: list) -> list:
+        return await self.run(self.sync.get_detailed_match_data_many, match_ids)
+
+    async def get_today_quartile_matches(self, league_id: int, season: int) -> list:
+        return await self.run(self.sync.get_today_quartile_matches, league_id, season)
+
+    async def get_week_screen_rows(self, season: int) -> list:
+        return await self.run(self.sync.get_week_screen_rows, season)
+
+    async def get_weekly_quartile_report(self, leagues: list) -> list:
+        return await self.run(self.sync.get_weekly_quartile_report, leagues)
+
+    def iter_weekly_quartile_report(self, leagues: list, after: tuple = None, limit: int = None):
+        return self.iterate(self.sync.iter_weekly_quartile_report, leagues, after, limit)
+
+    def iter_detailed_match_data(self, match_ids: list):
+        return self.iterate(self.sync.iter_detailed_match_data, match_ids)
+
+    async def get_data_version(self) -> int:
+        return await self.run(self.sync.get_data_version)
+
+    async def increment_data_version(self) -> int:
+        return await self.run(self.sync.increment_data_version)
 
-        return detailed_match_data
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
 
 
 # Usando a classe no seu código
@@ -0,0 +1,213 @@
+import datetime
+
+from app.db import LOCAL_TIMEZONE
+
+# Cada requisição à API-Football consome uma ficha da cota diária
+CALL_COST = 1
+
+DAY = datetime.timedelta(days=1)
+
+
+class FixtureFetchCall:
+    """
+    Uma chamada planejada a /v3/fixtures.
+
+    Attributes:
+    - params (dict): Parâmetros da query string.
+    - leagues (list): (league_id, season) das ligas atendidas pela chamada.
+    - window (dict): Janela {"from", "to"} sincronizada por liga, ou None (só inserções).
+    """
+
+    def __init__(self, params: dict, leagues: list, window: dict = None):
+        self.params = params
+        self.leagues = leagues
+        self.window = window
+
+    @property
+    def per_league(self) -> bool:
+        return "league" in self.params
+
+    def describe(self) -> dict:
+        return {
+            "endpoint": "/v3/fixtures",
+            "params": self.params,
+            "leagues": [league_id for league_id, _ in self.leagues],
+            "quota_cost": CALL_COST,
+        }
+
+
+class FixtureFetchPlan:
+    """
+    Resultado do planejamento: chamadas a fazer e ligas atendidas pelos dados já guardados.
+
+    Attributes:
+    - kind (str): "today" ou "range".
+    - window (dict): Janela {"from", "to"} pedida.
+    - calls (list): Chamadas ``FixtureFetchCall`` a fazer.
+    - served_locally (list): (league_id, season) cujos jogos já estão na janela da semana.
+    - week_windows (dict): Nova janela da semana por (league_id, season), nos planos "range".
+    """
+
+    def __init__(self, kind: str, leagues: list, window: dict, calls: list,
+                 served_locally: list, week_windows: dict = None):
+        self.kind = kind
+        self.leagues = leagues
+        self.window = window
+        self.calls = calls
+        self.served_locally = served_locally
+        self.week_windows = week_windows or {}
+
+    @property
+    def quota_cost(self) -> int:
+        return len(self.calls) * CALL_COST
+
+    def report(self) -> dict:
+        naive_calls = len(self.leagues)
+        return {
+            "kind": self.kind,
+            "from": self.window["from"],
+            "to": self.window["to"],
+            "leagues": naive_calls,
+            "served_locally": len(self.served_locally),
+            "calls": [call.describe() for call in self.calls],
+            "quota_cost": self.quota_cost,
+            "api_calls_saved": naive_calls - len(self.calls),
+        }
+
+    def describe(self) -> str:
+        lines = [f"Plano de busca de jogos ({self.kind}): {len(self.calls)} chamada(s), "
+                 f"custo {self.quota_cost} da cota, {len(self.served_locally)} liga(s) "
+                 f"atendida(s) pela janela da semana guardada"]
+        for call in self.calls:
+            lines.append(f"  GET /v3/fixtures {call.params} -> ligas "
+                         f"{[league_id for league_id, _ in call.leagues]}")
+        return "\n".join(lines)
+
+
+class FixtureFetchPlanner:
+    """
+    Decide o menor conjunto de chamadas a /v3/fixtures para um conjunto de ligas e datas.
+
+    - Ligas cuja janela da semana guardada cobre as datas pedidas e foi sincronizada
+      dentro do TTL são atendidas localmente, sem chamar a API (os jogos do dia saem
+      da janela da semana).
+    - Os trechos que faltam de uma liga viram uma única chamada por intervalo de datas,
+      juntando intervalos separados em um só.
+    - Quando há mais ligas a buscar do que dias, cada dia vira uma única chamada por
+      data (sem liga), que traz os jogos de todas as ligas de uma vez.
+    """
+
+    def __init__(self, db_instance, window_ttl: datetime.timedelta):
+        self._db = db_instance
+        self.window_ttl = window_ttl
+
+    def _week_windows(self, leagues: list) -> dict:
+        windows = {}
+        for season in {league["season"] for league in leagues}:
+            for league_id, window in self._db.get_week_windows(season).items():
+                windows[(league_id, season)] = window
+        return windows
+
+    def _fresh_window(self, window: dict, now: datetime.datetime):
+        if window is None or window.get("synced_at") is None:
+            return None
+        if now - window["synced_at"] > self.window_ttl:
+            return None
+        return window
+
+    def plan_today(self, leagues: list, now: datetime.datetime = None) -> FixtureFetchPlan:
+        """
+        Planeja a atualização dos jogos do dia (no fuso local) de um conjunto de ligas.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        start, end = self._db.today_range()
+        windows = self._week_windows(leagues)
+
+        served_locally = []
+        to_fetch = []
+        for league in leagues:
+            key = (league["league_id"], league["season"])
+            window = self._fresh_window(windows.get(key), now)
+            if window is not None and window["from"] <= start and end <= window["to"]:
+                served_locally.append(key)
+            else:
+                to_fetch.append(key)
+
+        today = start.astimezone(LOCAL_TIMEZONE).date().isoformat()
+        base_params = {"date": today, "timezone": LOCAL_TIMEZONE.zone, "status": "NS"}
+        if len(to_fetch) > 1:
+            calls = [FixtureFetchCall(dict(base_params), to_fetch)]
+        else:
+            calls = [FixtureFetchCall({**base_params, "league": league_id, "season": season},
+                                      [(league_id, season)])
+                     for league_id, season in to_fetch]
+
+        return FixtureFetchPlan("today", [(league["league_id"], league["season"]) for league in leagues],
+                                {"from": start, "to": end}, calls, served_locally)
+
+    def plan_range(self, leagues: list, start_date: str, end_date: str,
+                   now: datetime.datetime = None) -> FixtureFetchPlan:
+        """
+        Planeja a atualização dos jogos de um intervalo de datas (em UTC, inclusivo),
+        que passa a ser a janela da semana das ligas.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        requested = self._db.date_window(start_date, end_date)
+        windows = self._week_windows(leagues)
+
+        served_locally = []
+        missing = {}
+        week_windows = {}
+        for league in leagues:
+            key = (league["league_id"], league["season"])
+            window = self._fresh_window(windows.get(key), now)
+            gaps = _subtract(requested, window)
+            if not gaps:
+                served_locally.append(key)
+            else:
+                missing[key] = gaps
+            # Partes atendidas pela janela guardada mantêm a data de sincronização dela
+            synced_at = window["synced_at"] if window is not None and gaps != [requested] else now
+            week_windows[key] = {**requested, "synced_at": synced_at}
+
+        # Uma chamada por liga, juntando os trechos que faltam em um único intervalo
+        league_calls = []
+        for (league_id, season), gaps in missing.items():
+            merged = {"from": gaps[0]["from"], "to": gaps[-1]["to"]}
+            league_calls.append(FixtureFetchCall({
+                "league": league_id, "season": season,
+                "from": merged["from"].date().isoformat(),
+                "to": (merged["to"] - DAY).date().isoformat(),
+            }, [(league_id, season)], merged))
+
+        # Alternativa: uma chamada por dia para todas as ligas que precisam daquele dia
+        leagues_by_day = {}
+        for key, gaps in missing.items():
+            for gap in gaps:
+                day = gap["from"]
+                while day < gap["to"]:
+                    leagues_by_day.setdefault(day, []).append(key)
+                    day += DAY
+        date_calls = [
+            FixtureFetchCall({"date": day.date().isoformat()}, keys, {"from": day, "to": day + DAY})
+            for day, keys in sorted(leagues_by_day.items())
+        ]
+
+        calls = date_calls if len(date_calls) < len(league_calls) else league_calls
+        return FixtureFetchPlan("range", [(league["league_id"], league["season"]) for league in leagues],
+                                requested, calls, served_locally, week_windows)
+
+
+def _subtract(requested: dict, window: dict) -> list:
+    """
+    Trechos da janela pedida que não estão cobertos pela janela guardada.
+    """
+    if window is None or window["to"] <= requested["from"] or requested["to"] <= window["from"]:
+        return [requested]
+
+    gaps = []
+    if requested["from"] < window["from"]:
+        gaps.append({"from": requested["from"], "to": window["from"]})
+    if window["to"] < requested["to"]:
+        gaps.append({"from": window["to"], "to": requested["to"]})
+    return gaps
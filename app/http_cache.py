@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+# TTL padrão (em segundos) de cada endpoint da API-Football
+DEFAULT_TTLS = {
+    "/v3/standings": 6 * 60 * 60,
+    "/v3/fixtures": 15 * 60,
+    "/v3/teams/statistics": 12 * 60 * 60,
+}
+DEFAULT_TTL = 15 * 60
+
+
+class CacheEntry:
+    def __init__(self, key: str, body: bytes, meta: dict, ttl: float):
+        self.key = key
+        self.body = body
+        self.etag = meta.get("etag")
+        self.last_modified = meta.get("last_modified")
+        self.stored_at = meta["stored_at"]
+        self.ttl = ttl
+
+    def is_fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+    def validators(self) -> dict:
+        """
+        Cabeçalhos para revalidação condicional, quando a API os forneceu.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Cache em disco das respostas da API-Football.
+
+    Cada resposta é guardada em ``<sha256>.body`` com os metadados em ``<sha256>.json``,
+    onde o hash é calculado sobre o endpoint e a query string ordenada. O tamanho total
+    é limitado e as entradas menos usadas recentemente (pelo mtime) são removidas primeiro.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttls: dict = None,
+                 default_ttl: float = DEFAULT_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {}
+        for name in os.listdir(directory):
+            if name.endswith(".body"):
+                path = os.path.join(directory, name)
+                self._sizes[name[:-len(".body")]] = os.path.getsize(path)
+
+    @staticmethod
+    def key(endpoint: str, params: dict = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{endpoint}?{query}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple:
+        base = os.path.join(self.directory, key)
+        return base + ".body", base + ".json"
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint: str, params: dict = None):
+        """
+        Obtém a resposta guardada para uma requisição, fresca ou não.
+
+        Returns:
+        - CacheEntry | None: Entrada do cache, ou None se não houver.
+        """
+        key = self.key(endpoint, params)
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as file:
+                meta = json.load(file)
+            with open(body_path, "rb") as file:
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+
+        # Marca o uso recente para a política LRU
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return CacheEntry(key, body, meta, self.ttl(endpoint))
+
+    def record_hit(self, entry: CacheEntry):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.body)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def revalidated(self, entry: CacheEntry):
+        """
+        Renova uma entrada após uma resposta 304 da API.
+        """
+        _, meta_path = self._paths(entry.key)
+        meta = {"etag": entry.etag, "last_modified": entry.last_modified, "stored_at": time.time()}
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+        with self._lock:
+            self.revalidations += 1
+            self.bytes_saved += len(entry.body)
+
+    def put(self, endpoint: str, params: dict, body: bytes, headers):
+        """
+        Guarda uma resposta e remove as entradas menos usadas se o limite for excedido.
+        """
+        if len(body) > self.max_bytes:
+            return
+
+        key = self.key(endpoint, params)
+        body_path, meta_path = self._paths(key)
+        meta = {
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "stored_at": time.time(),
+        }
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+        with self._lock:
+            self._sizes[key] = len(body)
+        self._evict()
+
+    def _write(self, path: str, data: bytes):
+        # Escrita atômica: grava em um arquivo temporário e renomeia
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def _evict(self):
+        with self._lock:
+            total = sum(self._sizes.values())
+            if total <= self.max_bytes:
+                return
+
+            def last_used(key):
+                try:
+                    return os.path.getmtime(self._paths(key)[1])
+                except OSError:
+                    return 0
+
+            for key in sorted(self._sizes, key=last_used):
+                if total <= self.max_bytes:
+                    break
+                for path in self._paths(key):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= self._sizes.pop(key)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._sizes),
+                "bytes": sum(self._sizes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "bytes_saved": self.bytes_saved,
+            }
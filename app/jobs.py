@@ -0,0 +1,276 @@
+import asyncio
+import datetime
+import uuid
+from collections import OrderedDict
+
+from app.api_football import current_request_counter
+from app.metrics import INGESTION_JOB_DURATION
+from app.profiling import current_profile
+
+# Status de um job de ingestão
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+# Terminou, mas uma ou mais ligas falharam
+PARTIAL = "partial"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Intervalo (em segundos) entre as gravações do progresso e as checagens de cancelamento
+SYNC_INTERVAL = 1.0
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class Job:
+    """
+    Job de ingestão em segundo plano, com progresso por liga.
+
+    Attributes:
+    - id (str): Identificador do job.
+    - kind (str): Tipo do job (ex.: "standings", "today_matches").
+    - params (dict): Parâmetros do job.
+    - status (str): queued, running, succeeded, partial, failed ou cancelled.
+    - api_calls (int): Requisições feitas à API-Football pelo job.
+    - leagues (OrderedDict): Progresso por (league_id, season).
+    - errors (list): Erros registrados durante a execução.
+    """
+
+    def __init__(self, kind: str, params: dict, leagues: list):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.api_calls = 0
+        self.leagues = OrderedDict(
+            ((league["league_id"], league["season"]),
+             {"league_id": league["league_id"], "season": league["season"],
+              "status": "pending", "error": None})
+            for league in leagues)
+        self.errors = []
+        self.dirty = True
+        self._task = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def record_api_call(self):
+        self.api_calls += 1
+        self.dirty = True
+
+    def _set_league(self, league_id: int, season: int, status: str, error: str = None):
+        progress = self.leagues.setdefault((league_id, season), {
+            "league_id": league_id, "season": season, "status": "pending", "error": None})
+        progress["status"] = status
+        progress["error"] = error
+        self.dirty = True
+
+    def league_running(self, league_id: int, season: int):
+        self._set_league(league_id, season, "running")
+
+    def league_done(self, league_id: int, season: int):
+        self._set_league(league_id, season, "done")
+
+    def league_failed(self, league_id: int, season: int, error: str):
+        self._set_league(league_id, season, "failed", error)
+        self.errors.append(f"Liga {league_id}/{season}: {error}")
+
+    @property
+    def failed_leagues(self) -> list:
+        return [league["league_id"] for league in self.leagues.values()
+                if league["status"] == "failed"]
+
+    def finished_status(self) -> str:
+        """
+        Status de um job que terminou sem exceção: partial se alguma liga falhou, failed
+        se todas falharam.
+        """
+        failed = self.failed_leagues
+        if not failed:
+            return SUCCEEDED
+        return FAILED if len(failed) == len(self.leagues) else PARTIAL
+
+    def add_error(self, error: str):
+        self.errors.append(error)
+        self.dirty = True
+
+    def snapshot(self) -> dict:
+        leagues = list(self.leagues.values())
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "api_calls": self.api_calls,
+            "progress": {
+                "total": len(leagues),
+                "done": sum(1 for league in leagues if league["status"] == "done"),
+                "failed": sum(1 for league in leagues if league["status"] == "failed"),
+            },
+            "leagues": [dict(league) for league in leagues],
+            "failed_leagues": self.failed_leagues,
+            "errors": list(self.errors),
+        }
+
+
+class JobQueue:
+    """
+    Fila de jobs de ingestão executados em segundo plano no event loop da aplicação.
+
+    No máximo ``max_concurrent`` jobs rodam ao mesmo tempo; os demais aguardam na fila.
+    O estado dos jobs é espelhado no banco (``store``), para que qualquer worker consulte
+    o status ou peça o cancelamento de um job que roda em outro worker.
+    """
+
+    def __init__(self, store=None, max_concurrent: int = 2, max_finished: int = 100):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Criado sob demanda para ficar preso ao event loop em execução
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def submit(self, kind: str, params: dict, leagues: list, func) -> Job:
+        """
+        Enfileira um job.
+
+        Args:
+        - kind (str): Tipo do job.
+        - params (dict): Parâmetros do job (informativos).
+        - leagues (list): Ligas processadas, para o progresso.
+        - func: Corrotina ``func(job)`` que executa o job e reporta o progresso.
+
+        Returns:
+        - Job: Job enfileirado.
+        """
+        job = Job(kind, params, leagues)
+        self._jobs[job.id] = job
+        self._prune()
+        job._task = asyncio.get_running_loop().create_task(self._run(job, func))
+        return job
+
+    async def _run(self, job: Job, func):
+        # A tarefa nasce com o contexto da requisição que enfileirou o job: o trabalho do
+        # job (e a tarefa de sincronização, criada a seguir) não entra no perfil dela
+        current_profile.set(None)
+        sync_task = asyncio.get_running_loop().create_task(self._sync_forever(job))
+        try:
+            async with self._get_semaphore():
+                job.status = RUNNING
+                job.started_at = _now()
+                job.dirty = True
+                # As chamadas à API-Football feitas pelo job (e subtarefas) contam para ele
+                current_request_counter.set(job)
+                await func(job)
+            job.status = job.finished_status()
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.add_error(str(e))
+            print(f"Erro no job {job.kind} {job.id}: {str(e)}")
+        finally:
+            job.finished_at = _now()
+            sync_task.cancel()
+            if job.started_at is not None:
+                INGESTION_JOB_DURATION.observe((job.finished_at - job.started_at).total_seconds(),
+                                               kind=job.kind, status=job.status)
+            await self._save(job)
+
+    async def _sync_forever(self, job: Job):
+        # Grava o progresso e atende pedidos de cancelamento feitos em outros workers
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            await self._save(job)
+            if self.store is not None and await asyncio.to_thread(
+                    self.store.is_job_cancel_requested, job.id):
+                job._task.cancel()
+                return
+
+    async def _save(self, job: Job):
+        if self.store is None or not job.dirty:
+            return
+        job.dirty = False
+        try:
+            await asyncio.to_thread(self.store.save_job, job.snapshot())
+        except Exception as e:
+            job.dirty = True
+            print(f"Erro ao gravar o job {job.id}: {str(e)}")
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    async def wait(self, job: Job) -> dict:
+        """
+        Aguarda o fim de um job.
+
+        Returns:
+        - dict: Estado final do job.
+        """
+        await asyncio.wait([job._task])
+        return job.snapshot()
+
+    async def get(self, job_id: str) -> dict:
+        """
+        Obtém o estado de um job deste worker ou, se não estiver aqui, do banco.
+
+        Returns:
+        - dict: Estado do job, ou None se não existir.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        if self.store is not None:
+            return await asyncio.to_thread(self.store.get_job, job_id)
+        return None
+
+    async def list(self, limit: int = 20) -> list:
+        """
+        Lista os jobs mais recentes.
+        """
+        if self.store is not None:
+            return await asyncio.to_thread(self.store.get_jobs, limit)
+        jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        return [job.snapshot() for job in jobs[:limit]]
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancela um job na fila ou em execução.
+
+        Returns:
+        - bool: Se havia um job ativo com esse ID.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            if not job.active:
+                return False
+            job._task.cancel()
+            return True
+        if self.store is not None:
+            return await asyncio.to_thread(self.store.request_job_cancel, job_id)
+        return False
+
+    def stats(self) -> dict:
+        jobs = list(self._jobs.values())
+        return {
+            "max_concurrent": self.max_concurrent,
+            "queued": sum(1 for job in jobs if job.status == QUEUED),
+            "running": sum(1 for job in jobs if job.status == RUNNING),
+        }
@@ -0,0 +1,259 @@
+import asyncio
+import datetime
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from os import getenv
+
+from pymongo.errors import DuplicateKeyError
+
+# Duração padrão do lease do líder, em segundos
+LEASE_TTL = 30
+
+
+class FileLeaseStore:
+    """
+    Guarda os leases em um arquivo JSON local, protegido por flock.
+
+    Serve para eleger o líder entre workers de uma mesma máquina.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _transact(self, update):
+        with self._lock, open(self.path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = json.loads(content) if content else {}
+                result = update(state)
+                file.seek(0)
+                file.truncate()
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+                return result
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _lease(state: dict, name: str) -> dict:
+        lease = state.get(name)
+        if not lease or "holder" not in lease:
+            return None
+        return {"holder": lease["holder"], "expires_at": lease["expires_at"]}
+
+    def read(self, name: str) -> dict:
+        """
+        Lê um lease.
+
+        Returns:
+        - dict: {"holder", "expires_at"} ou None se ninguém o detém.
+        """
+        return self._transact(lambda state: self._lease(state, name))
+
+    def compare_and_set(self, name: str, expected: dict, lease: dict) -> bool:
+        """
+        Troca o lease por ``lease`` (ou o remove, se None) apenas se ele ainda for
+        ``expected`` (None: ninguém o detém).
+
+        Returns:
+        - bool: Se a troca foi feita.
+        """
+        def update(state):
+            if self._lease(state, name) != expected:
+                return False
+            if lease is None:
+                state.pop(name, None)
+            else:
+                state[name] = dict(lease)
+            return True
+
+        return self._transact(update)
+
+
+class MongoLeaseStore:
+    """
+    Guarda os leases em uma coleção do MongoDB, um documento por lease.
+
+    A troca é uma única escrita condicionada ao par (holder, expires_at) lido antes, o
+    que permite eleger o líder entre workers e máquinas.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def read(self, name: str) -> dict:
+        document = self.collection.find_one({"_id": name})
+        if not document or "holder" not in document:
+            return None
+        return {"holder": document["holder"], "expires_at": document["expires_at"]}
+
+    def compare_and_set(self, name: str, expected: dict, lease: dict) -> bool:
+        if expected is None:
+            query = {"_id": name, "holder": {"$exists": False}}
+        else:
+            query = {"_id": name, "holder": expected["holder"],
+                     "expires_at": expected["expires_at"]}
+
+        if lease is None:
+            update = {"$unset": {"holder": "", "expires_at": ""}}
+        else:
+            update = {"$set": {"holder": lease["holder"], "expires_at": lease["expires_at"]}}
+
+        try:
+            # Sem lease, o documento pode ainda não existir; com outro dono, o upsert
+            # esbarra no _id existente
+            result = self.collection.update_one(query, update, upsert=expected is None)
+        except DuplicateKeyError:
+            return False
+        return result.matched_count > 0 or result.upserted_id is not None
+
+
+def last_fire_time(trigger, start: datetime.datetime, end: datetime.datetime):
+    """
+    Obtém o último disparo de um trigger do APScheduler no intervalo (start, end].
+
+    Returns:
+    - datetime: Instante do disparo, ou None se não houve disparo no intervalo.
+    """
+    last = None
+    fire_time = trigger.get_next_fire_time(None, start + datetime.timedelta(microseconds=1))
+    while fire_time is not None and fire_time <= end:
+        last = fire_time
+        fire_time = trigger.get_next_fire_time(
+            fire_time, fire_time + datetime.timedelta(microseconds=1))
+    return last
+
+
+class LeaderElection:
+    """
+    Eleição de líder por lease entre os workers (e máquinas) da aplicação.
+
+    O lease fica em um estado compartilhado (arquivo com flock ou documento do MongoDB)
+    e vale por ``ttl`` segundos. O líder o renova periodicamente; se ele parar, outro
+    worker assume quando o lease vencer. Só o líder executa as tarefas agendadas.
+
+    Um disparo que acontece enquanto o lease de um líder que caiu ainda vale é ignorado
+    por todos os workers; ``on_takeover`` é chamada quando este worker assume a liderança,
+    para executar o que ficou para trás.
+    """
+
+    def __init__(self, store, name: str = "scheduler", ttl: float = LEASE_TTL, owner: str = None,
+                 on_takeover=None):
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_takeover = on_takeover
+        self.is_leader = False
+        self.takeovers = 0
+        self._task = None
+
+    @classmethod
+    def from_env(cls, db_instance=None):
+        """
+        Cria a eleição a partir das variáveis de ambiente.
+
+        SCHEDULER_LEASE_BACKEND escolhe entre "mongo" (requer ``db_instance``) e "file".
+        """
+        backend = getenv('SCHEDULER_LEASE_BACKEND', 'file')
+        if backend == 'mongo' and db_instance is not None:
+            store = MongoLeaseStore(
+                db_instance.db[getenv('SCHEDULER_LEASE_COLLECTION_NAME', 'scheduler_leases')])
+        else:
+            store = FileLeaseStore(getenv('SCHEDULER_LEASE_FILE_PATH', 'scheduler_lease.json'))
+
+        return cls(store, ttl=float(getenv('SCHEDULER_LEASE_TTL_SECONDS', LEASE_TTL)))
+
+    @property
+    def missed_tick_window(self) -> datetime.timedelta:
+        """
+        Até quanto tempo antes de assumir a liderança um disparo pode ter sido ignorado:
+        o lease do líder anterior dura ``ttl`` e é renovado a cada ``ttl / 3``.
+        """
+        return datetime.timedelta(seconds=2 * self.ttl)
+
+    def try_acquire(self) -> bool:
+        """
+        Assume ou renova o lease, se ele estiver livre, vencido ou já for deste worker.
+
+        Returns:
+        - bool: Se este worker é o líder.
+        """
+        now = time.time()
+        lease = self.store.read(self.name)
+        if lease is not None and lease["expires_at"] > now and lease["holder"] != self.owner:
+            self.is_leader = False
+            return False
+
+        self.is_leader = self.store.compare_and_set(
+            self.name, lease, {"holder": self.owner, "expires_at": now + self.ttl})
+        return self.is_leader
+
+    async def acquire(self) -> bool:
+        """
+        Versão assíncrona de ``try_acquire`` que chama ``on_takeover`` quando este worker
+        passa a ser o líder.
+        """
+        was_leader = self.is_leader
+        is_leader = await asyncio.to_thread(self.try_acquire)
+        if is_leader and not was_leader:
+            self.takeovers += 1
+            if self.on_takeover is not None:
+                asyncio.get_running_loop().create_task(self.on_takeover())
+        return is_leader
+
+    def release(self):
+        """
+        Libera o lease, se for deste worker, para outro assumir sem esperar o vencimento.
+        """
+        lease = self.store.read(self.name)
+        if lease is not None and lease["holder"] == self.owner:
+            self.store.compare_and_set(self.name, lease, None)
+        self.is_leader = False
+
+    def current(self) -> dict:
+        """
+        Lê o lease atual.
+
+        Returns:
+        - dict: {"holder", "expires_at"} ou None se não houver líder.
+        """
+        lease = self.store.read(self.name)
+        if lease is None or lease["expires_at"] <= time.time():
+            return None
+        return lease
+
+    async def _renew_forever(self):
+        while True:
+            try:
+                await self.acquire()
+            except Exception as e:
+                self.is_leader = False
+                print(f"Erro ao renovar o lease do agendador: {str(e)}")
+            await asyncio.sleep(self.ttl / 3)
+
+    def start(self):
+        """
+        Inicia a renovação periódica do lease no event loop em execução.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._renew_forever())
+
+    async def stop(self):
+        """
+        Para a renovação e libera o lease.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self.release)
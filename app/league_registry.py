@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+from os import getenv
+
+# Arquivo padrão, ao lado deste módulo, independente do diretório de trabalho
+DEFAULT_LEAGUES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "leagues.json")
+
+# Frequência das atualizações agendadas de uma liga
+CADENCE_ADAPTIVE = "adaptive"  # em torno dos jogos, quando o agendador adaptativo está ligado
+CADENCE_DAILY = "daily"        # uma vez por dia, nos horários fixos
+CADENCE_MANUAL = "manual"      # só pelos endpoints de atualização
+CADENCES = (CADENCE_ADAPTIVE, CADENCE_DAILY, CADENCE_MANUAL)
+
+DEFAULT_PRIORITY = 1
+
+
+class LeagueConfig:
+    """
+    Configuração imutável das ligas acompanhadas, lida de uma só vez do arquivo.
+
+    Attributes:
+    - current_season (int): Temporada atual.
+    - leagues (tuple): Ligas na ordem do arquivo, como dicts {"league_id", "season",
+      "priority", "cadence"}.
+    - mtime (float): Data de modificação do arquivo lido.
+    """
+
+    def __init__(self, current_season: int, leagues: tuple, mtime: float):
+        self.current_season = current_season
+        self.leagues = leagues
+        self.mtime = mtime
+
+    @classmethod
+    def parse(cls, data, mtime: float = None) -> "LeagueConfig":
+        """
+        Valida o conteúdo do arquivo de ligas.
+
+        Aceita o formato ``{"current_season": 2023, "leagues": [{"league_id": 39,
+        "priority": 0, "cadence": "adaptive"}, ...]}`` (ligas sem "season" usam a temporada
+        atual) e a lista simples ``[{"league_id": 39, "season": 2023}, ...]``.
+
+        Raises:
+        - ValueError: Se o conteúdo for inválido.
+        """
+        if isinstance(data, list):
+            data = {"leagues": data}
+        if not isinstance(data, dict) or not isinstance(data.get("leagues"), list):
+            raise ValueError("O arquivo de ligas deve ter a lista \"leagues\"")
+
+        current_season = data.get("current_season")
+        leagues = []
+        seen = set()
+        for entry in data["leagues"]:
+            season = entry.get("season", current_season)
+            if "league_id" not in entry or season is None:
+                raise ValueError(f"Liga sem league_id ou temporada: {entry}")
+            cadence = entry.get("cadence", CADENCE_ADAPTIVE)
+            if cadence not in CADENCES:
+                raise ValueError(f"Cadência inválida para a liga {entry['league_id']}: {cadence}")
+            key = (int(entry["league_id"]), int(season))
+            if key in seen:
+                raise ValueError(f"Liga repetida: {key[0]}/{key[1]}")
+            seen.add(key)
+            leagues.append({
+                "league_id": key[0],
+                "season": key[1],
+                "priority": int(entry.get("priority", DEFAULT_PRIORITY)),
+                "cadence": cadence,
+            })
+
+        if current_season is None:
+            # Formato antigo: a temporada atual é a mais recente das ligas
+            current_season = max((league["season"] for league in leagues), default=None)
+
+        return cls(current_season, tuple(leagues), mtime)
+
+
+class LeagueRegistry:
+    """
+    Registro das ligas acompanhadas, lido do arquivo de ligas e mantido em memória.
+
+    O arquivo é relido só quando sua data de modificação muda; a nova configuração é
+    validada antes de substituir a anterior de uma vez, então quem está iterando as
+    ligas nunca vê um estado parcial. Se o arquivo novo for inválido, a configuração
+    anterior continua valendo.
+    """
+
+    def __init__(self, path: str, on_reload=None):
+        self.path = path
+        self.on_reload = on_reload
+        self._config = None
+        self._lock = threading.Lock()
+        # mtime de um arquivo inválido, para não relê-lo a cada chamada
+        self._invalid_mtime = None
+        self.reloads = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, on_reload=None):
+        """
+        Cria o registro a partir da variável de ambiente LEAGUES_FILE.
+        """
+        return cls(getenv('LEAGUES_FILE', DEFAULT_LEAGUES_FILE), on_reload)
+
+    def config(self) -> LeagueConfig:
+        """
+        Obtém a configuração atual, relendo o arquivo se ele mudou.
+
+        Raises:
+        - ValueError: Se o arquivo nunca pôde ser lido.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            if self._config is None:
+                raise ValueError(f"Arquivo de ligas indisponível: {self.path}") from e
+            return self._config
+
+        config = self._config
+        if config is not None and mtime in (config.mtime, self._invalid_mtime):
+            return config
+
+        with self._lock:
+            if self._config is not None and mtime in (self._config.mtime, self._invalid_mtime):
+                return self._config
+            try:
+                with open(self.path, "r") as file:
+                    config = LeagueConfig.parse(json.load(file), mtime)
+            except (OSError, ValueError) as e:
+                self.errors += 1
+                self._invalid_mtime = mtime
+                if self._config is None:
+                    raise ValueError(f"Arquivo de ligas inválido: {str(e)}") from e
+                print(f"Arquivo de ligas inválido, mantendo a configuração anterior: {str(e)}")
+                return self._config
+            reloaded = self._config is not None
+            self._config = config
+            if reloaded:
+                self.reloads += 1
+
+        if reloaded and self.on_reload is not None:
+            self.on_reload(config)
+        return config
+
+    @property
+    def current_season(self) -> int:
+        return self.config().current_season
+
+    def leagues(self, cadences: tuple = None) -> list:
+        """
+        Lista as ligas acompanhadas, na ordem do arquivo.
+
+        Args:
+        - cadences (tuple, opcional): Restringe às ligas com essas cadências.
+
+        Returns:
+        - list: Cópias das ligas ({"league_id", "season", "priority", "cadence"}).
+        """
+        return [dict(league) for league in self.config().leagues
+                if cadences is None or league["cadence"] in cadences]
+
+    def scheduled(self) -> list:
+        """
+        Lista as ligas incluídas nas atualizações agendadas (cadência diferente de manual).
+        """
+        return self.leagues((CADENCE_ADAPTIVE, CADENCE_DAILY))
+
+    def stats(self) -> dict:
+        config = self.config()
+        return {
+            "path": self.path,
+            "current_season": config.current_season,
+            "leagues": len(config.leagues),
+            "reloads": self.reloads,
+            "errors": self.errors,
+        }
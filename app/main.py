@@ -1,12 +1,136 @@
-from fastapi import FastAPI, Query, HTTPException
-from apscheduler.schedulers.background import BackgroundScheduler
+from fastapi import FastAPI, Query, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import pytz
+import datetime
+import functools
 import json
-from app import services
+import time
+from os import getenv
+from app import metrics, services
+from app.db import LOCAL_TIMEZONE
+from app.profiling import RequestProfile, current_profile
+from app.league_registry import CADENCE_DAILY
+from app.screener import ScreenFilter
 
 app = FastAPI()
 
 
+class MatchIdsBatch(BaseModel):
+    match_ids: List[int]
+
+
+FORMATO_DESCRIPTION = "json (padrão) ou ndjson, um jogo por linha enviado à medida que é lido"
+LIMITE_DESCRIPTION = ("Tamanho da página; com limite ou cursor a resposta é paginada "
+                      "(não disponível no formato ndjson)")
+CURSOR_DESCRIPTION = "Cursor next_cursor devolvido pela página anterior"
+DEFAULT_PAGE_SIZE = 100
+
+
+def ndjson_response(items) -> StreamingResponse:
+    """
+    Envia os itens de um gerador assíncrono como NDJSON, sem montar a lista na memória.
+    """
+    async def lines():
+        async for item in items:
+            yield json.dumps(jsonable_encoder(item)) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def cached_response(request: Request, compute, key_extra: tuple = ()) -> Response:
+    """
+    Serve uma resposta JSON do cache de respostas, calculando-a com ``compute`` na falta.
+
+    A chave é o caminho mais os parâmetros da requisição e ``key_extra``, para respostas
+    que dependem de algo fora da requisição (ex.: a data de hoje). A resposta leva um
+    ETag, e um If-None-Match igual ao ETag atual recebe 304 sem corpo.
+    """
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), key_extra)
+    entry = services.response_cache.get(key)
+    if entry is None:
+        # Versão lida antes do cálculo: se a ingestão gravar algo no meio, não guarda
+        version = services.response_cache.version
+        body = json.dumps(jsonable_encoder(await compute())).encode("utf-8")
+        entry = services.response_cache.put(key, body, version)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        services.response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def check_formato(formato: str, limite: Optional[int] = None, cursor: Optional[str] = None):
+    if formato not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail=f"Formato inválido: {formato}")
+    # O stream NDJSON sempre envia todos os jogos; a paginação só existe no formato json
+    if formato == "ndjson" and (limite is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="limite e cursor não são aceitos com formato=ndjson")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Mede a latência de cada requisição, agrupada pelo caminho da rota (sem os valores
+    dos parâmetros). Em respostas em streaming, mede até o envio dos cabeçalhos.
+    """
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started, method=request.method,
+            route=route.path if route is not None else "unmatched", status=status)
+
+
+@app.middleware("http")
+async def check_data_version(request: Request, call_next):
+    """
+    Descarta os caches de leitura deste worker quando outro worker gravou dados novos
+    (ver ``SharedDataVersion``). A versão compartilhada é relida no máximo a cada
+    DATA_VERSION_CHECK_INTERVAL segundos.
+    """
+    await services.data_version.check()
+    return await call_next(request)
+
+
+# Em modo de depuração, avisa quando uma requisição repete um formato de consulta
+PROFILING_DEBUG = getenv('PROFILING_DEBUG', 'false').lower() == 'true'
+N_PLUS_ONE_THRESHOLD = int(getenv('PROFILING_N_PLUS_ONE_THRESHOLD', 10))
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Atribui à requisição os comandos do MongoDB e as chamadas à API-Football que ela
+    causou e devolve o cabeçalho Server-Timing com os tempos de banco, chamadas externas
+    e cálculo. Em respostas em streaming, os tempos vão até o envio dos cabeçalhos.
+    """
+    profile = RequestProfile()
+    token = current_profile.set(profile)
+    try:
+        response = await call_next(request)
+    finally:
+        current_profile.reset(token)
+
+    response.headers["Server-Timing"] = profile.server_timing()
+    if PROFILING_DEBUG:
+        for shape, count in profile.repeated_shapes(N_PLUS_ONE_THRESHOLD):
+            print(f"Aviso: {request.method} {request.url.path} enviou {count} vezes a consulta "
+                  f"{shape} (possível N+1)")
+    return response
+
+
 @app.get("/")
 async def root():
     """
@@ -18,39 +142,77 @@ async def root():
 
 
 @app.on_event("startup")
-def start_recurring_update():
+async def start_recurring_update():
     """
-    Inicia uma tarefa de atualização recorrente das ligas.
+    Inicia as tarefas de atualização recorrente das ligas.
 
-    Esta função é executada na inicialização do aplicativo e agenda uma tarefa
-    para atualizar os dados das ligas diariamente às 6:30 da manhã.
+    Com ADAPTIVE_SCHEDULER_ENABLED, o calendário de jogos é atualizado diariamente às
+    6:10 e a agenda adaptativa (antes e depois dos jogos) é recalculada periodicamente;
+    as ligas com cadência "daily" têm a classificação atualizada às 6:00. Caso contrário,
+    classificações e jogos do dia são atualizados diariamente às 6:00 e 6:10. Ligas com
+    cadência "manual" ficam fora das tarefas agendadas.
     """
+    if getenv('MONGODB_ENSURE_INDEXES', 'true').lower() == 'true':
+        # Com vários workers, prefira MONGODB_ENSURE_INDEXES=false e "python -m app.migrate"
+        await services.db_async.run(services.db_instance.ensure_indexes)
     tz = pytz.timezone('America/Sao_Paulo')
-    scheduler = BackgroundScheduler(timezone=tz)
-    scheduler.add_job(bulk_update_standings_data, 'cron', hour=6)
-    scheduler.add_job(update_today_matches_for_all_leagues_endpoint,
-                      'cron', hour=6, minute=10)
+    # As tarefas são corrotinas, então rodam no próprio event loop da aplicação
+    scheduler = AsyncIOScheduler(timezone=tz)
+    # As ligas são lidas do registro a cada execução, para seguir as mudanças no arquivo
+    if getenv('ADAPTIVE_SCHEDULER_ENABLED', 'false').lower() == 'true':
+        scheduler.add_job(services.run_scheduled_job, 'cron', hour=6,
+                          args=["bulk_update_standings_data", lambda: services.run_ingestion_job(
+                              "standings", services.league_registry.leagues((CADENCE_DAILY,)))])
+        scheduler.add_job(services.run_scheduled_job, 'cron', hour=6, minute=10,
+                          args=["update_week_matches_calendar", services.run_calendar_refresh])
+        scheduler.add_job(services.replan_refreshes, 'interval',
+                          minutes=float(getenv('ADAPTIVE_REPLAN_MINUTES', 15)),
+                          next_run_time=datetime.datetime.now(tz), args=[scheduler])
+    else:
+        scheduler.add_job(services.run_scheduled_job, 'cron', hour=6,
+                          args=["bulk_update_standings_data", lambda: services.run_ingestion_job(
+                              "standings", services.league_registry.scheduled())])
+        scheduler.add_job(services.run_scheduled_job, 'cron', hour=6, minute=10,
+                          args=["update_today_matches_for_all_leagues", lambda: services.run_ingestion_job(
+                              "today_matches", services.league_registry.scheduled())])
     scheduler.start()
+    # Cada worker tem o seu agendador, mas só o líder eleito executa as tarefas; quem
+    # assume a liderança executa os disparos que o líder anterior perdeu ao cair
+    services.leader_election.on_takeover = functools.partial(services.run_missed_ticks, scheduler)
+    services.leader_election.start()
+
+
+@app.on_event("shutdown")
+async def close_api_client():
+    """
+    Fecha o pool de conexões do cliente da API-Football e o pool de threads do banco,
+    e libera o lease do líder do agendador.
+    """
+    await services.leader_election.stop()
+    await services.api_client.aclose()
+    services.db_async.shutdown()
+
+
+def job_accepted(job) -> JSONResponse:
+    return JSONResponse(status_code=202, content={
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+    })
 
 
 @app.post("/bulk-update-standings-data/")
 async def bulk_update_standings_data():
     """
-    Atualiza os dados das ligas com base em um arquivo JSON.
+    Enfileira a atualização dos dados de todas as ligas do arquivo JSON de ligas.
 
-    Este endpoint lê um arquivo JSON contendo informações das ligas e realiza a
-    atualização dos dados de todas as ligas especificadas no arquivo.
+    A atualização roda em segundo plano; o andamento é consultado em /jobs/{job_id}.
 
-    Retorna uma mensagem de sucesso após a atualização.
+    Returns:
+        JSONResponse: 202 com o ID do job.
     """
     try:
-        with open("leagues.json", "r") as file:
-            leagues = json.load(file)
-
-        for league in leagues:
-            await services.update_league_data(league["league_id"], league["season"])
-
-        return {"message": "Data updated successfully for all leagues"}
+        return job_accepted(services.submit_ingestion_job("standings"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,7 +235,7 @@ async def update_standings_data(league_id: int, season: int):
 
 
 @app.get("/today-quartile-matches/{league_id}/{season}")
-async def get_today_quartile_matches(league_id: int, season: int):
+async def get_today_quartile_matches(request: Request, league_id: int, season: int):
     """
     Obtém os jogos do dia de uma liga que correspondem aos critérios do quartil
     com base nas classificações das equipes.
@@ -85,90 +247,235 @@ async def get_today_quartile_matches(league_id: int, season: int):
     Returns:
         dict: Um dicionário contendo a lista de jogos que atendem aos critérios.
     """
-    try:
-        standings_data = services.fetch_standings_data(league_id, season)
-        today_matches = services.get_today_matches_from_db(league_id, season)
-        quartile_matches = services.filter_quartile_matches(
-            today_matches, standings_data)
+    async def compute():
+        return {"matches": await services.get_today_quartile_matches(league_id, season)}
 
-        return {"matches": quartile_matches}
+    # "Hoje" muda à meia-noite no fuso das ligas, sem que a ingestão grave nada
+    today = datetime.datetime.now(LOCAL_TIMEZONE).date().isoformat()
+    try:
+        return await cached_response(request, compute, key_extra=(today,))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/weekly-quartile-matches/")
-async def get_weekly_quartile_matches():
+async def get_weekly_quartile_matches(
+    request: Request,
+    formato: str = Query("json", description=FORMATO_DESCRIPTION),
+    limite: Optional[int] = Query(None, ge=1, le=1000, description=LIMITE_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+):
     """
     Obtém, dentre todas as ligas, os jogos da semana que correspondem aos critérios do quartil
     com base nas classificações das equipes.
 
     Returns:
-        dict: Um dicionário contendo a lista de jogos que atendem aos critérios.
+        dict: Um dicionário contendo a lista de jogos que atendem aos critérios
+        (e o next_cursor, se paginado), ou um stream NDJSON com um jogo por linha.
     """
+    check_formato(formato, limite, cursor)
     try:
-        with open("app/leagues.json", "r") as file:
-            leagues = json.load(file)
-
-        week_matches = services.get_week_matches_from_db(2023)
-        weekly_quartile_matches = []
-
-        def find_matches_by_league_id(league_id):
-            for league in week_matches:
-                if league['league_info']['id'] == league_id:
-                    return league
-            return None
-
-        for league in leagues:
-            league_id = league["league_id"]
-            season = league["season"]
-            league_week_matches = find_matches_by_league_id(league_id)
-            if league_week_matches is None:
-                continue
-            league_week_matches = find_matches_by_league_id(league_id)['week_matches']
-            standings_data = services.fetch_standings_data(league_id, season)
-            quartile_matches = services.filter_quartile_matches(league_week_matches, standings_data)
-
-            weekly_quartile_matches.extend(quartile_matches)
-
-        return {"matches": weekly_quartile_matches}
+        leagues = services.league_registry.leagues()
+
+        if formato == "ndjson":
+            return ndjson_response(services.iter_weekly_quartile_matches(leagues))
+
+        async def compute():
+            if limite is not None or cursor is not None:
+                return await services.get_weekly_quartile_matches_page(
+                    leagues, limite or DEFAULT_PAGE_SIZE, cursor)
+            return {"matches": await services.get_weekly_quartile_matches(leagues)}
+
+        return await cached_response(request, compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/leagues")
+async def get_leagues():
+    """
+    Obtém as ligas acompanhadas e a temporada atual do registro de ligas.
+
+    Returns:
+        dict: Temporada atual e ligas com prioridade e cadência.
+    """
+    return {
+        "current_season": services.league_registry.current_season,
+        "leagues": services.league_registry.leagues(),
+    }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Exporta as métricas do worker no formato texto do Prometheus: latência por rota,
+    comandos do MongoDB, chamadas e cota da API-Football, duração dos jobs e das tarefas
+    agendadas e taxas de acerto dos caches.
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/standings-index/stats")
+async def get_standings_index_stats():
+    """
+    Obtém os contadores do índice de classificações em memória.
+
+    Returns:
+        dict: Entradas, acertos, faltas e invalidações do índice.
+    """
+    return services.standings_index.stats()
+
+
+@app.get("/screener/stats")
+async def get_screener_stats():
+    """
+    Obtém os contadores dos arrays de triagem de confrontos em memória.
+
+    Returns:
+        dict: Temporadas carregadas, jogos, acertos, faltas e invalidações.
+    """
+    return services.screener.stats()
+
+
+@app.get("/response-cache/stats")
+async def get_response_cache_stats():
+    """
+    Obtém os contadores do cache de respostas dos endpoints de leitura.
+
+    Returns:
+        dict: Entradas, versão dos dados, acertos, faltas, remoções e respostas 304.
+    """
+    return services.response_cache.stats()
+
+
+@app.get("/data-version/stats")
+async def get_data_version_stats():
+    """
+    Obtém a versão compartilhada dos dados vista por este worker e seus contadores.
+
+    Returns:
+        dict: Versão, intervalo entre leituras, leituras, mudanças vistas e erros.
+    """
+    return services.data_version.stats()
+
+
+@app.get("/scheduler/schedule")
+async def get_refresh_schedule():
+    """
+    Mostra a agenda adaptativa calculada a partir do calendário de jogos: atualizações
+    planejadas antes e depois dos jogos, custo de cota, cortes pelo orçamento diário e
+    ligas sem jogos no horizonte.
+    """
+    schedule = await services.compute_refresh_schedule()
+    return jsonable_encoder(schedule.report())
+
+
+@app.get("/scheduler/status")
+async def get_scheduler_status(limit: int = Query(20, ge=1, le=200)):
+    """
+    Obtém o líder atual do agendador e o histórico das tarefas agendadas.
+
+    Returns:
+        dict: Worker atual, se ele é o líder, lease vigente e execuções recentes.
+    """
+    return jsonable_encoder(await services.get_scheduler_status(limit))
+
+
+@app.get("/http-cache/stats")
+async def get_http_cache_stats():
+    """
+    Obtém os contadores do cache em disco das respostas da API-Football.
+
+    Returns:
+        dict: Entradas, acertos, faltas, revalidações, remoções e bytes economizados.
+    """
+    if services.api_client.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.api_client.cache.stats()}
+
+
 @app.post("/update-today-matches-for-all-leagues")
-async def update_today_matches_for_all_leagues_endpoint():
+async def update_today_matches_for_all_leagues_endpoint(
+    dry_run: bool = Query(False, description="Só mostra as chamadas planejadas e o custo de cota")
+):
     """
-    Inicia a atualização dos jogos do dia para todas as ligas.
+    Enfileira a atualização dos jogos do dia para todas as ligas.
 
     Returns:
-        dict: Um dicionário com uma mensagem indicando o resultado da atualização.
+        JSONResponse: 202 com o ID do job, cujo andamento é consultado em /jobs/{job_id},
+        ou, com dry_run, o plano de chamadas à API e o custo de cota esperado.
     """
     try:
-        services.update_today_matches_for_all_leagues()
-
-        return {"message": "Atualização dos jogos do dia para todas as ligas concluída com sucesso"}
+        if dry_run:
+            return jsonable_encoder(await services.dry_run_fixture_fetch("today"))
+        return job_accepted(services.submit_ingestion_job("today_matches"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/update-week-matches-for-all-leagues")
-async def update_week_matches_for_all_leagues_endpoint(start_date: str, end_date: str):
+async def update_week_matches_for_all_leagues_endpoint(
+    start_date: str, end_date: str,
+    dry_run: bool = Query(False, description="Só mostra as chamadas planejadas e o custo de cota")
+):
     """
-    Inicia a atualização dos jogos da semana para todas as ligas.
+    Enfileira a atualização dos jogos da semana para todas as ligas.
 
     Args:
         start_date (str): Data de início da semana (no formato YYYY-MM-DD).
         end_date (str): Data de término da semana (no formato YYYY-MM-DD).
+        dry_run (bool): Só mostra as chamadas planejadas e o custo de cota esperado.
 
     Returns:
-        dict: Um dicionário com uma mensagem indicando o resultado da atualização.
+        JSONResponse: 202 com o ID do job, cujo andamento é consultado em /jobs/{job_id},
+        ou, com dry_run, o plano de chamadas à API e o custo de cota esperado.
     """
     try:
-        services.update_week_matches_for_all_leagues(start_date, end_date)
-
-        return {"message": "Atualização dos jogos da semana para todas as ligas concluída com sucesso"}
+        if dry_run:
+            return jsonable_encoder(await services.dry_run_fixture_fetch(
+                "range", start_date=start_date, end_date=end_date))
+        return job_accepted(services.submit_ingestion_job(
+            "week_matches", start_date=start_date, end_date=end_date))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/jobs")
+async def list_jobs(limit: int = Query(20, ge=1, le=200)):
+    """
+    Lista os jobs de ingestão mais recentes.
+
+    Returns:
+        dict: Jobs, do mais recente para o mais antigo, e a ocupação da fila neste worker.
+    """
+    return jsonable_encoder({
+        "jobs": await services.job_queue.list(limit),
+        "queue": services.job_queue.stats(),
+    })
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Obtém o andamento de um job de ingestão: status, progresso por liga, chamadas à
+    API-Football e erros.
+    """
+    job = await services.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return jsonable_encoder(job)
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancela um job de ingestão na fila ou em execução.
+    """
+    if not await services.job_queue.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Nenhum job ativo com esse ID")
+    return {"job_id": job_id, "message": "Cancelamento solicitado"}
+
+
 @app.get("/get-detailed-match-data/{match_id}")
 async def get_detailed_match_data_endpoint(match_id: int):
     """
@@ -181,25 +488,98 @@ async def get_detailed_match_data_endpoint(match_id: int):
         dict: Estatísticas detalhadas da partida.
     """
     try:
-        detailed_data = services.get_detailed_match_data(match_id)
+        detailed_data = await services.get_detailed_match_data(match_id)
         return detailed_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/detailed-match-data/batch")
+async def get_detailed_match_data_batch_endpoint(batch: MatchIdsBatch):
+    """
+    Obtém estatísticas detalhadas de várias partidas em uma única requisição.
+
+    Args:
+        batch (MatchIdsBatch): IDs das partidas.
+
+    Returns:
+        dict: Um dicionário contendo as estatísticas detalhadas das partidas encontradas.
+    """
+    try:
+        detailed_data = await services.get_detailed_match_data_many(batch.match_ids)
+        return {"matches": detailed_data}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/confrontos-filtrados")
-def obter_confrontos_filtrados(
-    season: int = Query(...,
-                        description="Temporada dos confrontos"),
-    cartoes_min_por_time: float = Query(...,
-                                        description="Mínimo de média de cartões por jogo de um dos times"),
-    cartoes_media_somada: float = Query(
-        ..., description="Mínimo de média de cartões somada (avg_time1 + avg_time2)")
+async def obter_confrontos_filtrados(
+    request: Request,
+    season: Optional[int] = Query(
+        None, description="Temporada dos confrontos; por padrão, a temporada atual"),
+    filtros: List[str] = Query(
+        [], description="Filtros no formato metrica:escopo:operador:valor, "
+                        "por exemplo yellow_card_avg:soma:>:4 (escopo: algum, ambos ou soma)"),
+    modo: str = Query("todos", description="todos: atende a todos os filtros; algum: a pelo menos um"),
+    formato: str = Query("json", description=FORMATO_DESCRIPTION),
+    limite: Optional[int] = Query(None, ge=1, le=1000, description=LIMITE_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    cartoes_min_por_time: Optional[float] = Query(
+        None, description="Mínimo de média de cartões por jogo de um dos times"),
+    cartoes_media_somada: Optional[float] = Query(
+        None, description="Mínimo de média de cartões somada (avg_time1 + avg_time2)")
 ):
+    """
+    Filtra os confrontos da semana de uma temporada por limites nas estatísticas dos times.
 
-    confrontos_filtrados = services.filtrar_todos_confrontos(
-        season, cartoes_min_por_time, cartoes_media_somada)
+    Os parâmetros ``cartoes_min_por_time`` e ``cartoes_media_somada`` mantêm o filtro
+    original de cartões amarelos: um dos times acima do mínimo ou a soma acima da média,
+    contando como 0 a média de um time sem estatísticas.
 
-    return {
-        "confrontos_filtrados": confrontos_filtrados
-    }
+    Returns:
+        dict: Um dicionário contendo a lista de confrontos filtrados (e o next_cursor,
+        se paginado), ou um stream NDJSON com um confronto por linha.
+    """
+    check_formato(formato, limite, cursor)
+    if season is None:
+        season = services.league_registry.current_season
+    legacy = cartoes_min_por_time is not None or cartoes_media_somada is not None
+    if legacy and filtros:
+        raise HTTPException(
+            status_code=400, detail="Use filtros ou os parâmetros de cartões, não ambos")
+    if modo not in ("todos", "algum"):
+        raise HTTPException(status_code=400, detail=f"Modo inválido: {modo}")
+
+    try:
+        if legacy:
+            if cartoes_min_por_time is None or cartoes_media_somada is None:
+                raise ValueError("Informe cartoes_min_por_time e cartoes_media_somada")
+            screen_filters = [
+                ScreenFilter("yellow_card_avg", "algum", ">", cartoes_min_por_time, missing=0.0),
+                ScreenFilter("yellow_card_avg", "soma", ">", cartoes_media_somada, missing=0.0),
+            ]
+            todos = False
+        else:
+            screen_filters = [ScreenFilter.parse(filtro) for filtro in filtros]
+            todos = modo == "todos"
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if formato == "ndjson":
+        return ndjson_response(services.iter_confrontos_filtrados(season, screen_filters, todos))
+
+    async def compute():
+        if limite is not None or cursor is not None:
+            return await services.get_confrontos_filtrados_page(
+                season, screen_filters, todos, limite or DEFAULT_PAGE_SIZE, cursor)
+
+        confrontos_filtrados = await services.filtrar_todos_confrontos(season, screen_filters, todos)
+
+        return {
+            "confrontos_filtrados": confrontos_filtrados
+        }
+
+    try:
+        return await cached_response(request, compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
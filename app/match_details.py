@@ -0,0 +1,96 @@
+import hashlib
+import json
+
+
+def build_detailed_match_data(match_id: int, match_data: dict,
+                              home_team_stats: dict, away_team_stats: dict) -> dict:
+    """
+    Monta o objeto de dados detalhados de uma partida servido pela API.
+
+    Args:
+    - match_id (int): ID da partida.
+    - match_data (dict): Jogo com os campos "fixture" e "teams".
+    - home_team_stats (dict): Estatísticas do time da casa.
+    - away_team_stats (dict): Estatísticas do time visitante.
+
+    Returns:
+    - dict: Dados detalhados da partida.
+    """
+    fixture = match_data.get('fixture', {})
+    teams = match_data.get('teams', {})
+
+    home_team = teams.get('home', {})
+    away_team = teams.get('away', {})
+
+    detailed_match_data = {
+        "match_id": match_id,
+        "referee": fixture.get('referee', ""),
+        "venue": fixture.get('venue', {}).get('name', ""),
+        "date": fixture.get('date', ""),
+        "timezone": fixture.get('timezone', ""),
+        "home": {
+            "team_id": home_team.get('id', 0),
+            "team_name": home_team.get('name', ""),
+            "team_logo": home_team.get('logo', ""),
+            "statistics": home_team_stats,
+        },
+        "away": {
+            "team_id": away_team.get('id', 0),
+            "team_name": away_team.get('name', ""),
+            "team_logo": away_team.get('logo', ""),
+            "statistics": away_team_stats,
+        },
+    }
+
+    return detailed_match_data
+
+
+def build_match_detail_document(fixture: dict, home_team_stats: dict, away_team_stats: dict,
+                                standings=None, week_window: dict = None):
+    """
+    Monta o documento pré-calculado de uma partida, pronto para ser servido.
+
+    Args:
+    - fixture (dict): Documento da coleção de jogos.
+    - home_team_stats (dict): Estatísticas do time da casa (None se ainda não ingeridas).
+    - away_team_stats (dict): Estatísticas do time visitante (None se ainda não ingeridas).
+    - standings (LeagueStandings, opcional): Classificação indexada da liga.
+    - week_window (dict, opcional): Janela {"from", "to"} da semana da liga.
+
+    Returns:
+    - dict: Documento da partida. Estatísticas ausentes ficam como ``statistics: null``
+      e o campo "missing_statistics" indica quantos times estão sem elas.
+    """
+    detail = build_detailed_match_data(fixture["_id"], fixture, home_team_stats, away_team_stats)
+    home_team_id = detail["home"]["team_id"]
+    away_team_id = detail["away"]["team_id"]
+
+    detail["league_info"] = standings.league_info if standings else None
+    detail["home"]["team_rank"] = standings.rank(home_team_id) if standings else None
+    detail["away"]["team_rank"] = standings.rank(away_team_id) if standings else None
+
+    in_week = bool(week_window) and week_window["from"] <= fixture["date"] < week_window["to"]
+    quartile = bool(standings) and standings.is_quartile_match(home_team_id, away_team_id)
+
+    document = {
+        "_id": fixture["_id"],
+        "league_id": fixture["league_id"],
+        "season": fixture["season"],
+        "date": fixture["date"],
+        "status": fixture.get("status"),
+        "in_week": in_week,
+        "quartile": quartile,
+        "missing_statistics": (home_team_stats is None) + (away_team_stats is None),
+        "detail": detail,
+    }
+    document["inputs_hash"] = inputs_hash(document)
+    return document
+
+
+def inputs_hash(document: dict) -> str:
+    """
+    Hash de tudo o que compõe o documento, para reescrevê-lo apenas quando algo mudar.
+    """
+    content = {key: value for key, value in document.items() if key != "inputs_hash"}
+    encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
@@ -0,0 +1,212 @@
+import threading
+
+from pymongo import monitoring
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites (em segundos) dos histogramas de duração das tarefas de ingestão
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list:
+        with self._lock:
+            return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Counter(_Metric):
+    """
+    Contador que só cresce, por combinação de rótulos.
+    """
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Valor instantâneo, por combinação de rótulos.
+    """
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """
+    Distribuição de valores em faixas cumulativas, com soma e contagem.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> list:
+        lines = []
+        with self._lock:
+            values = sorted((key, (list(counts), total))
+                            for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas do processo, exportadas no formato texto do Prometheus.
+
+    Além das métricas registradas, aceita coletores: funções chamadas a cada exportação
+    que devolvem (nome, tipo, descrição, [(rótulos, valor), ...]), para expor contadores
+    que já existem em outros objetos (ex.: ``stats()`` dos caches) sem duplicá-los.
+
+    As métricas são por processo: com vários workers, cada um exporta as suas.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        for collector in self._collectors:
+            for name, kind, description, samples in collector():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} "
+                                 f"{_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Latência das requisições por rota",
+    ("method", "route", "status")))
+MONGO_COMMANDS = registry.register(Counter(
+    "mongo_commands_total", "Comandos enviados ao MongoDB", ("command", "outcome")))
+MONGO_COMMAND_DURATION = registry.register(Histogram(
+    "mongo_command_duration_seconds", "Duração dos comandos do MongoDB", ("command",)))
+API_FOOTBALL_REQUESTS = registry.register(Counter(
+    "api_football_requests_total", "Requisições enviadas à API-Football",
+    ("endpoint", "status")))
+API_FOOTBALL_QUOTA_REMAINING = registry.register(Gauge(
+    "api_football_quota_remaining", "Cota diária restante informada pela API-Football"))
+API_FOOTBALL_QUOTA_LIMIT = registry.register(Gauge(
+    "api_football_quota_limit", "Cota diária informada pela API-Football"))
+INGESTION_JOB_DURATION = registry.register(Histogram(
+    "ingestion_job_duration_seconds", "Duração dos jobs de ingestão", ("kind", "status"),
+    buckets=JOB_BUCKETS))
+SCHEDULED_JOB_DURATION = registry.register(Histogram(
+    "scheduled_job_duration_seconds", "Duração das tarefas agendadas", ("job", "outcome"),
+    buckets=JOB_BUCKETS))
+
+
+def cache_collector(caches: dict):
+    """
+    Cria um coletor de acertos, faltas e taxa de acerto de caches com ``stats()``.
+
+    Args:
+    - caches (dict): Nome do cache -> objeto com ``stats()`` contendo "hits" e "misses".
+    """
+    def collect():
+        stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+        ratios = []
+        for name, values in stats.items():
+            lookups = values["hits"] + values["misses"]
+            ratios.append(({"cache": name}, values["hits"] / lookups if lookups else 0.0))
+        return [
+            ("cache_hits_total", "counter", "Acertos dos caches",
+             [({"cache": name}, values["hits"]) for name, values in stats.items()]),
+            ("cache_misses_total", "counter", "Faltas dos caches",
+             [({"cache": name}, values["misses"]) for name, values in stats.items()]),
+            ("cache_hit_ratio", "gauge", "Taxa de acerto dos caches desde o início do processo",
+             ratios),
+        ]
+
+    return collect
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Conta os comandos enviados ao MongoDB e mede sua duração (command monitoring do pymongo).
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMANDS.inc(command=event.command_name, outcome="success")
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMANDS.inc(command=event.command_name, outcome="failure")
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
@@ -0,0 +1,50 @@
+"""
+Prepara o banco: cria os índices e migra os dados embutidos nos documentos das ligas
+(jogos e estatísticas de times) para as suas coleções.
+
+Uso:
+    python -m app.migrate
+    python -m app.migrate --indexes-only
+    python -m app.migrate --unset-embedded
+"""
+import argparse
+
+from app import db
+
+
+def migrate(db_instance, unset_embedded: bool = False, indexes_only: bool = False) -> dict:
+    """
+    Executa a migração.
+
+    Args:
+    - db_instance (MongoDB): Banco a migrar.
+    - unset_embedded (bool): Remove os dados embutidos das ligas após a migração.
+    - indexes_only (bool): Apenas cria os índices.
+
+    Returns:
+    - dict: Quantidade de jogos e estatísticas migrados.
+    """
+    db_instance.ensure_indexes()
+    if indexes_only:
+        return {"fixtures": 0, "team_stats": 0}
+
+    return {
+        "fixtures": db_instance.migrate_embedded_fixtures(unset_embedded),
+        "team_stats": db_instance.migrate_embedded_team_stats(unset_embedded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unset-embedded", action="store_true",
+                        help="Remove os arrays e mapas embutidos das ligas após migrá-los")
+    parser.add_argument("--indexes-only", action="store_true", help="Apenas cria os índices")
+    args = parser.parse_args()
+
+    report = migrate(db.MongoDB(), args.unset_embedded, args.indexes_only)
+    print(f"Índices criados; migrados {report['fixtures']} jogo(s) e "
+          f"{report['team_stats']} estatística(s) de times")
+
+
+if __name__ == "__main__":
+    main()
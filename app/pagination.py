@@ -0,0 +1,42 @@
+import base64
+import datetime
+import json
+
+
+def encode_cursor(position: dict) -> str:
+    """
+    Codifica a posição do último item de uma página em um cursor opaco.
+
+    Args:
+    - position (dict): Valores que identificam o último item (datas viram ISO 8601).
+
+    Returns:
+    - str: Cursor seguro para URLs.
+    """
+    encoded = json.dumps(position, default=lambda value: value.isoformat()).encode("utf-8")
+    return base64.urlsafe_b64encode(encoded).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decodifica um cursor gerado por ``encode_cursor``.
+
+    Raises:
+    - ValueError: Se o cursor for inválido.
+    """
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Cursor inválido: {cursor}")
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    """
+    Lê uma data ISO 8601 guardada em um cursor.
+
+    Raises:
+    - ValueError: Se a data for inválida.
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"Data inválida no cursor: {value}")
+    return datetime.datetime.fromisoformat(value)
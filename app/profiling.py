@@ -0,0 +1,124 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+
+from pymongo import monitoring
+
+# Perfil da requisição em andamento. É herdado pelas subtarefas do asyncio e pelas
+# consultas que o AsyncMongoDB executa no pool de threads (que copia o contexto).
+current_profile = contextvars.ContextVar("current_profile", default=None)
+
+
+def _shape(value):
+    # Mantém a estrutura (chaves e operadores) e troca os valores por "?"
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shape(value[0])] if value else []
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> str:
+    """
+    Descreve um comando do MongoDB sem os valores, para agrupar consultas repetidas.
+
+    Ex.: ``find team_stats {'team_id': '?', 'league_id': '?'}``.
+    """
+    collection = command.get(command_name)
+    if command_name == "find":
+        return f"find {collection} {_shape(command.get('filter', {}))}"
+    if command_name == "aggregate":
+        stages = [next(iter(stage)) for stage in command.get("pipeline", [])]
+        return f"aggregate {collection} {stages}"
+    if command_name in ("update", "delete"):
+        key = "updates" if command_name == "update" else "deletes"
+        filters = [_shape(statement.get("q", {})) for statement in command.get(key, [])[:1]]
+        return f"{command_name} {collection} {filters}"
+    return f"{command_name} {collection}" if isinstance(collection, str) else command_name
+
+
+class RequestProfile:
+    """
+    Tempo gasto por uma requisição no MongoDB e em chamadas HTTP externas.
+
+    Attributes:
+    - db_time (float): Soma da duração dos comandos do MongoDB, em segundos.
+    - db_commands (int): Comandos enviados ao MongoDB.
+    - upstream_time (float): Soma da duração das chamadas à API-Football, em segundos.
+    - upstream_calls (int): Chamadas à API-Football.
+    - shapes (Counter): Comandos do MongoDB por formato de consulta.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.db_commands = 0
+        self.upstream_time = 0.0
+        self.upstream_calls = 0
+        self.shapes = Counter()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def db_started(self, request_id: int, shape: str):
+        with self._lock:
+            self._pending[request_id] = shape
+
+    def db_finished(self, request_id: int, seconds: float):
+        with self._lock:
+            shape = self._pending.pop(request_id, None)
+            if shape is not None:
+                self.shapes[shape] += 1
+            self.db_commands += 1
+            self.db_time += seconds
+
+    def record_upstream(self, seconds: float):
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_time += seconds
+
+    def repeated_shapes(self, threshold: int) -> list:
+        """
+        Formatos de consulta enviados mais de ``threshold`` vezes (suspeitas de N+1).
+        """
+        with self._lock:
+            return [(shape, count) for shape, count in self.shapes.most_common()
+                    if count > threshold]
+
+    def server_timing(self) -> str:
+        """
+        Monta o cabeçalho Server-Timing com os tempos de banco, chamadas externas e cálculo.
+
+        Consultas em paralelo podem somar mais que o tempo total; o tempo de cálculo é o
+        que sobra do total, nunca negativo.
+        """
+        total = time.perf_counter() - self.started
+        with self._lock:
+            db_time, db_commands = self.db_time, self.db_commands
+            upstream_time, upstream_calls = self.upstream_time, self.upstream_calls
+        compute = max(total - db_time - upstream_time, 0.0)
+        return ", ".join([
+            f'db;dur={db_time * 1000:.1f};desc="{db_commands} comandos"',
+            f'upstream;dur={upstream_time * 1000:.1f};desc="{upstream_calls} chamadas"',
+            f"compute;dur={compute * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+
+
+class ProfilingListener(monitoring.CommandListener):
+    """
+    Atribui cada comando do MongoDB ao perfil da requisição que o causou.
+    """
+
+    def started(self, event):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.db_started(event.request_id, query_shape(event.command_name, event.command))
+
+    def succeeded(self, event):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.db_finished(event.request_id, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
@@ -1,19 +1,211 @@
-from ratelimit import limits, RateLimitException, sleep_and_retry
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from os import getenv
+from pymongo.errors import DuplicateKeyError
 
-# Define o limite global de taxa (por exemplo, 1000 requisições por dia)
-GLOBAL_RATE_LIMIT = (100, 24 * 60 * 60)  # 1000 requisições por dia
+# Cota diária do plano da API-Football (requisições por dia)
+DAILY_QUOTA = 100
+DAY_SECONDS = 24 * 60 * 60
+# Espera máxima padrão (em segundos) por uma ficha antes de desistir da requisição
+DEFAULT_MAX_WAIT = 300
 
+# Classes de prioridade das tarefas de ingestão (menor valor = mais prioritária)
+PRIORITY_HIGH = 0      # classificações
+PRIORITY_NORMAL = 1    # jogos
+PRIORITY_LOW = 2       # estatísticas de times
 
-def global_rate_limited(func):
-    @sleep_and_retry
-    @limits(calls=GLOBAL_RATE_LIMIT[0], period=GLOBAL_RATE_LIMIT[1])
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except RateLimitException as e:
-            # Lidar com exceção de limite de taxa, como registrar ou esperar
-            # Você pode personalizar isso de acordo com suas necessidades
-            raise Exception(
-                "Limite de taxa global atingido. Aguarde e tente novamente mais tarde.")
+# Fração da cota reservada para as classes mais prioritárias: uma tarefa só consome
+# uma ficha se, depois disso, ainda sobrar a reserva da sua classe
+PRIORITY_RESERVES = {
+    PRIORITY_HIGH: 0.0,
+    PRIORITY_NORMAL: 0.05,
+    PRIORITY_LOW: 0.15,
+}
 
-    return wrapper
+# Cabeçalhos da RapidAPI com a cota diária do plano
+LIMIT_HEADER = "x-ratelimit-requests-limit"
+REMAINING_HEADER = "x-ratelimit-requests-remaining"
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class FileQuotaStore:
+    """
+    Guarda o estado do token bucket em um arquivo JSON local, protegido por flock.
+
+    Serve para compartilhar a cota entre workers de uma mesma máquina.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def transact(self, update):
+        """
+        Lê o estado, aplica ``update(state) -> (state, result)`` e grava o novo estado
+        de forma atômica.
+        """
+        with self._lock, open(self.path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = json.loads(content) if content else None
+                state, result = update(state)
+                file.seek(0)
+                file.truncate()
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+                return result
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class MongoQuotaStore:
+    """
+    Guarda o estado do token bucket em um documento do MongoDB.
+
+    As escritas usam controle de concorrência otimista pelo campo ``version``, o que
+    permite compartilhar a cota entre workers e máquinas.
+    """
+
+    def __init__(self, collection, key: str = "api_football"):
+        self.collection = collection
+        self.key = key
+
+    def transact(self, update):
+        while True:
+            document = self.collection.find_one({"_id": self.key})
+            state = document["state"] if document else None
+            new_state, result = update(state)
+
+            try:
+                if document is None:
+                    self.collection.insert_one(
+                        {"_id": self.key, "state": new_state, "version": 1})
+                    return result
+                updated = self.collection.update_one(
+                    {"_id": self.key, "version": document["version"]},
+                    {"$set": {"state": new_state}, "$inc": {"version": 1}})
+                if updated.modified_count:
+                    return result
+            except DuplicateKeyError:
+                pass
+
+
+class QuotaManager:
+    """
+    Cota única da API-Football, compartilhada por todas as chamadas e workers.
+
+    Implementa um token bucket que reabastece ``capacity`` fichas por dia, com reservas
+    por classe de prioridade. As esperas são assíncronas e nunca bloqueiam o event loop,
+    e o saldo é corrigido pelos cabeçalhos de cota devolvidos pela API.
+    """
+
+    def __init__(self, store, capacity: int = DAILY_QUOTA, period: int = DAY_SECONDS,
+                 max_wait: float = DEFAULT_MAX_WAIT):
+        self.store = store
+        self.capacity = capacity
+        self.period = period
+        self.max_wait = max_wait
+
+    @classmethod
+    def from_env(cls, db_instance=None):
+        """
+        Cria o gerenciador a partir das variáveis de ambiente.
+
+        QUOTA_BACKEND escolhe entre "mongo" (requer ``db_instance``) e "file".
+        """
+        backend = getenv('QUOTA_BACKEND', 'file')
+        if backend == 'mongo' and db_instance is not None:
+            store = MongoQuotaStore(db_instance.db[getenv('QUOTA_COLLECTION_NAME', 'quota')])
+        else:
+            store = FileQuotaStore(getenv('QUOTA_FILE_PATH', 'api_football_quota.json'))
+
+        return cls(store,
+                   capacity=int(getenv('QUOTA_DAILY_LIMIT', DAILY_QUOTA)),
+                   max_wait=float(getenv('QUOTA_MAX_WAIT', DEFAULT_MAX_WAIT)))
+
+    def _refill(self, state, now: float) -> dict:
+        if state is None:
+            return {"tokens": float(self.capacity), "capacity": self.capacity, "updated_at": now}
+
+        capacity = state.get("capacity", self.capacity)
+        elapsed = max(0.0, now - state["updated_at"])
+        tokens = min(capacity, state["tokens"] + elapsed * capacity / self.period)
+        return {"tokens": tokens, "capacity": capacity, "updated_at": now}
+
+    def try_acquire(self, priority: int = PRIORITY_NORMAL) -> float:
+        """
+        Tenta consumir uma ficha.
+
+        Returns:
+        - float: 0 se a ficha foi consumida; caso contrário, segundos estimados até haver
+          saldo suficiente para a classe de prioridade.
+        """
+        def update(state):
+            state = self._refill(state, time.time())
+            reserve = PRIORITY_RESERVES.get(priority, 0.0) * state["capacity"]
+            needed = reserve + 1 - state["tokens"]
+            if needed <= 0:
+                state["tokens"] -= 1
+                return state, 0.0
+            return state, needed * self.period / state["capacity"]
+
+        return self.store.transact(update)
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, max_wait: float = None):
+        """
+        Aguarda, sem bloquear o event loop, até consumir uma ficha.
+
+        Args:
+        - priority (int): Classe de prioridade da tarefa.
+        - max_wait (float, opcional): Espera máxima em segundos (padrão: a do gerenciador);
+          se a espera estimada passar dela, estoura ``QuotaExceeded`` sem esperar.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        waited = 0.0
+
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, priority)
+            if wait == 0:
+                return
+            if max_wait is not None and waited + wait > max_wait:
+                raise QuotaExceeded(
+                    "Cota da API-Football esgotada. Aguarde e tente novamente mais tarde.")
+            # Reavalia em intervalos curtos, pois a cota pode ser corrigida pelos cabeçalhos
+            delay = min(wait, 60.0)
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def sync_from_headers(self, headers):
+        """
+        Ajusta o saldo com os cabeçalhos de cota devolvidos pela API-Football.
+        """
+        limit = headers.get(LIMIT_HEADER)
+        remaining = headers.get(REMAINING_HEADER)
+        if remaining is None:
+            return
+
+        def update(state):
+            state = self._refill(state, time.time())
+            if limit is not None:
+                state["capacity"] = int(limit)
+            state["tokens"] = min(float(remaining), state["capacity"])
+            return state, None
+
+        self.store.transact(update)
+
+    def remaining(self) -> float:
+        def update(state):
+            state = self._refill(state, time.time())
+            return state, state["tokens"]
+
+        return self.store.transact(update)
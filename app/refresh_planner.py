@@ -0,0 +1,83 @@
+import datetime
+
+# Tempo após o início de um jogo a partir do qual as estatísticas já o incluem
+MATCH_DURATION = datetime.timedelta(hours=2)
+
+
+class TeamStatsRefreshPlan:
+    """
+    Resultado do planejamento: quais estatísticas buscar e quantas chamadas foram poupadas.
+    """
+
+    def __init__(self, requested: int, unique: int, to_refresh: list, skipped_fresh: int):
+        self.requested = requested
+        self.unique = unique
+        self.to_refresh = to_refresh
+        self.skipped_fresh = skipped_fresh
+
+    def report(self) -> dict:
+        return {
+            "requested": self.requested,
+            "unique": self.unique,
+            "skipped_duplicates": self.requested - self.unique,
+            "skipped_fresh": self.skipped_fresh,
+            "refreshed": len(self.to_refresh),
+            "api_calls_saved": self.requested - len(self.to_refresh),
+        }
+
+
+class TeamStatsRefreshPlanner:
+    """
+    Decide quais estatísticas de times precisam ser buscadas na API em uma rodada de ingestão.
+
+    Os times são deduplicados entre todas as ligas da rodada. Um time é pulado quando
+    suas estatísticas foram atualizadas dentro do TTL e depois do seu último jogo encerrado.
+    """
+
+    def __init__(self, db_instance, ttl: datetime.timedelta):
+        self._db = db_instance
+        self.ttl = ttl
+
+    def plan(self, matches_by_league: dict) -> TeamStatsRefreshPlan:
+        """
+        Planeja a atualização das estatísticas dos times de um conjunto de jogos.
+
+        Args:
+        - matches_by_league (dict): Jogos indexados por (league_id, season).
+
+        Returns:
+        - TeamStatsRefreshPlan: Times a atualizar e contadores do planejamento.
+        """
+        requested = 0
+        teams_by_league = {}
+        for key, matches in matches_by_league.items():
+            team_ids = teams_by_league.setdefault(key, set())
+            for match in matches:
+                team_ids.add(match["teams"]["home"]["id"])
+                team_ids.add(match["teams"]["away"]["id"])
+                requested += 2
+
+        updated_at = self._db.get_team_stats_updated_at(teams_by_league)
+        last_played = self._db.get_last_played_dates(teams_by_league)
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        to_refresh = []
+        skipped_fresh = 0
+        unique = 0
+        for (league_id, season), team_ids in teams_by_league.items():
+            for team_id in sorted(team_ids):
+                unique += 1
+                key = (league_id, season, team_id)
+                if self._is_fresh(updated_at.get(key), last_played.get(key), now):
+                    skipped_fresh += 1
+                else:
+                    to_refresh.append(key)
+
+        return TeamStatsRefreshPlan(requested, unique, to_refresh, skipped_fresh)
+
+    def _is_fresh(self, updated_at, last_played, now: datetime.datetime) -> bool:
+        if updated_at is None or now - updated_at > self.ttl:
+            return False
+        if last_played is not None and updated_at < last_played + MATCH_DURATION:
+            return False
+        return True
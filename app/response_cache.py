@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class CachedResponse:
+    """
+    Corpo JSON já serializado de uma resposta e seu ETag.
+    """
+
+    def __init__(self, body: bytes, version: int):
+        self.body = body
+        self.version = version
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+class ResponseCache:
+    """
+    Cache LRU em memória das respostas dos endpoints de leitura.
+
+    As entradas são indexadas pelo endpoint e pelos parâmetros e valem enquanto a versão
+    dos dados não mudar: a ingestão chama ``bump`` sempre que grava algo que os endpoints
+    servem, o que invalida todas as entradas de uma vez.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        """
+        Obtém a resposta em cache de uma chave, se ela ainda for da versão atual dos dados.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != self.version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body: bytes, version: int) -> CachedResponse:
+        """
+        Guarda uma resposta calculada na versão ``version`` dos dados.
+
+        Se os dados mudaram durante o cálculo a resposta é devolvida, mas não é guardada.
+        """
+        entry = CachedResponse(body, version)
+        with self._lock:
+            if version != self.version:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def bump(self):
+        """
+        Avança a versão dos dados, invalidando todas as respostas em cache.
+        """
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+            }
@@ -0,0 +1,221 @@
+import operator
+import threading
+
+import numpy as np
+
+# Métricas disponíveis para os filtros -> função que extrai o valor das estatísticas
+# armazenadas de um time (ver services.organize_team_statistics)
+METRICS = {
+    "yellow_card_avg": lambda stats: stats.get("yellow_card_avg"),
+    "red_card_avg": lambda stats: stats.get("red_card_avg"),
+    "goals_for_avg": lambda stats: _per_match(stats, "total_goals_for"),
+    "goals_against_avg": lambda stats: _per_match(stats, "total_goals_against"),
+    "win_percentage_home": lambda stats: stats.get("win_percentage_home"),
+    "win_percentage_away": lambda stats: stats.get("win_percentage_away"),
+    "clean_sheet_percentage_home": lambda stats: stats.get("clean_sheet_percentage_home"),
+    "clean_sheet_percentage_away": lambda stats: stats.get("clean_sheet_percentage_away"),
+}
+
+# "algum": um dos times atende; "ambos": os dois times atendem; "soma": a soma dos dois atende
+SCOPES = ("algum", "ambos", "soma")
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def _per_match(stats: dict, field: str):
+    played = stats.get("total_matches_played")
+    value = stats.get(field)
+    if not played or value is None:
+        return None
+    return value / played
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ScreenFilter:
+    """
+    Predicado de limite sobre uma métrica das estatísticas dos times.
+
+    Attributes:
+    - metric (str): Nome da métrica (uma das chaves de ``METRICS``).
+    - scope (str): "algum", "ambos" ou "soma".
+    - op (str): Operador de comparação (">", ">=", "<", "<=").
+    - value (float): Limite.
+    - missing (float, opcional): Valor usado no lugar de uma estatística ausente; por
+      padrão, um jogo com um time sem a estatística não atende ao filtro.
+    """
+
+    def __init__(self, metric: str, scope: str, op: str, value: float, missing: float = None):
+        if metric not in METRICS:
+            raise ValueError(f"Métrica desconhecida: {metric}")
+        if scope not in SCOPES:
+            raise ValueError(f"Escopo desconhecido: {scope}")
+        if op not in OPERATORS:
+            raise ValueError(f"Operador desconhecido: {op}")
+        self.metric = metric
+        self.scope = scope
+        self.op = op
+        self.value = float(value)
+        self.missing = None if missing is None else float(missing)
+
+    @classmethod
+    def parse(cls, expression: str) -> "ScreenFilter":
+        """
+        Lê um filtro no formato "metrica:escopo:operador:valor",
+        por exemplo "yellow_card_avg:soma:>:4".
+        """
+        parts = expression.split(":")
+        if len(parts) != 4:
+            raise ValueError(
+                f"Filtro inválido: {expression} (esperado metrica:escopo:operador:valor)")
+        metric, scope, op, value = parts
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"Valor inválido no filtro: {expression}")
+        return cls(metric, scope, op, value)
+
+
+class SeasonScreen:
+    """
+    Estatísticas dos times e jogos da semana de uma temporada em arrays colunares.
+
+    A matriz ``team_metrics`` tem uma linha por time e uma coluna por métrica (NaN quando
+    a estatística não existe); ``home_rows`` e ``away_rows`` apontam, para cada jogo, as
+    linhas dos dois times. Um filtro é avaliado para todos os jogos de uma só vez.
+    """
+
+    def __init__(self, rows: list):
+        team_rows = {}
+        team_values = []
+        match_ids = []
+        home_rows = []
+        away_rows = []
+
+        def team_row(team: dict) -> int:
+            row = team_rows.get(team["team_id"])
+            if row is None:
+                row = team_rows[team["team_id"]] = len(team_values)
+                statistics = team.get("statistics") or {}
+                team_values.append([_as_float(extract(statistics)) for extract in METRICS.values()])
+            return row
+
+        for row in rows:
+            match_ids.append(row["_id"])
+            home_rows.append(team_row(row["home"]))
+            away_rows.append(team_row(row["away"]))
+
+        self.metric_columns = {metric: column for column, metric in enumerate(METRICS)}
+        self.team_metrics = np.array(team_values, dtype=np.float64).reshape(len(team_values), len(METRICS))
+        self.match_ids = np.array(match_ids, dtype=np.int64)
+        self.home_rows = np.array(home_rows, dtype=np.intp)
+        self.away_rows = np.array(away_rows, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def mask(self, screen_filter: ScreenFilter) -> np.ndarray:
+        """
+        Avalia um filtro para todos os jogos. Comparações com NaN resultam em False.
+        """
+        column = self.team_metrics[:, self.metric_columns[screen_filter.metric]]
+        if screen_filter.missing is not None:
+            column = np.nan_to_num(column, nan=screen_filter.missing)
+        home = column[self.home_rows]
+        away = column[self.away_rows]
+        compare = OPERATORS[screen_filter.op]
+
+        with np.errstate(invalid="ignore"):
+            if screen_filter.scope == "soma":
+                return compare(home + away, screen_filter.value)
+            home_mask = compare(home, screen_filter.value)
+            away_mask = compare(away, screen_filter.value)
+        if screen_filter.scope == "ambos":
+            return home_mask & away_mask
+        return home_mask | away_mask
+
+    def screen(self, filters: list, match_all: bool = True) -> list:
+        """
+        Obtém os IDs dos jogos que atendem aos filtros.
+
+        Args:
+        - filters (list): Lista de ``ScreenFilter``.
+        - match_all (bool): Se True, todos os filtros precisam ser atendidos; se False, basta um.
+
+        Returns:
+        - list: IDs dos jogos, na ordem de data.
+        """
+        if not filters:
+            return self.match_ids.tolist()
+
+        masks = [self.mask(screen_filter) for screen_filter in filters]
+        combined = np.logical_and.reduce(masks) if match_all else np.logical_or.reduce(masks)
+        return self.match_ids[combined].tolist()
+
+
+class Screener:
+    """
+    Cache em memória de ``SeasonScreen`` por temporada.
+
+    As entradas são montadas sob demanda a partir de ``AsyncMongoDB.get_week_screen_rows``
+    e invalidadas quando a ingestão regrava os detalhes das partidas da temporada.
+    """
+
+    def __init__(self, db_instance):
+        self._db = db_instance
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Incrementado a cada invalidação, para não guardar uma leitura anterior a ela
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, season: int) -> SeasonScreen:
+        with self._lock:
+            entry = self._entries.get(season)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self._generation
+
+        entry = SeasonScreen(await self._db.get_week_screen_rows(season))
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[season] = entry
+
+        return entry
+
+    def invalidate(self, season: int = None):
+        """
+        Descarta os arrays de uma temporada, ou de todas quando nenhuma é informada.
+        """
+        with self._lock:
+            if season is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(season, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "matches": sum(len(entry) for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
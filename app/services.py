@@ -1,33 +1,74 @@
 import json
-import http.client
+import asyncio
+import functools
+from apscheduler.triggers.cron import CronTrigger
 from app import db
+from app.adaptive_scheduler import AdaptiveRefreshPlanner, PRE_KICKOFF
+from app.api_football import APIFootballClient
+from app.data_version import SharedDataVersion, DEFAULT_CHECK_INTERVAL
+from app.fetch_planner import FixtureFetchPlanner
+from app.jobs import JobQueue, PARTIAL, SUCCEEDED
+from app.league_registry import LeagueRegistry, CADENCE_ADAPTIVE
+from app.leader import LeaderElection, last_fire_time
+from app.match_details import build_match_detail_document
+from app import metrics
+from app.pagination import encode_cursor, decode_cursor, parse_datetime
+from app.ratelimit_mecanism import QuotaManager, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from app.refresh_planner import TeamStatsRefreshPlanner
+from app.response_cache import ResponseCache
+from app.screener import Screener
+from app.standings_index import StandingsIndex
 import datetime
-from app.ratelimit_mecanism import global_rate_limited
+import time
 from os import getenv
 from dotenv import load_dotenv
 
 load_dotenv()
 
-API_FOOTBALL_KEY = getenv('API_FOOTBALL_KEY')
 db_instance = db.MongoDB()
-
-
-@global_rate_limited
-def get_football_data(league_id: int, season: int) -> str:
-    conn = http.client.HTTPSConnection("api-football-v1.p.rapidapi.com")
-
-    headers = {
-        'X-RapidAPI-Key': API_FOOTBALL_KEY,
-        'X-RapidAPI-Host': "api-football-v1.p.rapidapi.com"
-    }
-
-    conn.request(
-        "GET", f"/v3/standings?season={season}&league={league_id}", headers=headers)
-
-    res = conn.getresponse()
-    data = res.read()
-
-    return data.decode("utf-8")
+db_async = db.AsyncMongoDB(db_instance, max_workers=int(getenv('MONGODB_THREAD_POOL_SIZE', 8)))
+quota_manager = QuotaManager.from_env(db_instance)
+api_client = APIFootballClient.from_env(quota_manager)
+standings_index = StandingsIndex(db_async)
+screener = Screener(db_async)
+leader_election = LeaderElection.from_env(db_instance)
+job_queue = JobQueue(db_instance, max_concurrent=int(getenv('JOBS_MAX_CONCURRENT', 2)))
+response_cache = ResponseCache(max_entries=int(getenv('RESPONSE_CACHE_MAX_ENTRIES', 256)))
+# Tarefas agendadas em execução neste worker
+running_scheduled_jobs = set()
+
+
+def _discard_read_caches():
+    # Outro worker gravou dados: tudo o que foi calculado localmente pode estar defasado
+    standings_index.invalidate()
+    screener.invalidate()
+    response_cache.bump()
+
+
+data_version = SharedDataVersion(
+    db_async, on_change=_discard_read_caches,
+    check_interval=float(getenv('DATA_VERSION_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)))
+# Ligas novas ou removidas mudam as respostas de leitura que percorrem todas as ligas
+league_registry = LeagueRegistry.from_env(on_reload=lambda config: response_cache.bump())
+metrics.registry.add_collector(metrics.cache_collector({
+    "response_cache": response_cache,
+    "http_cache": api_client.cache,
+    "screener": screener,
+    "standings_index": standings_index,
+}))
+team_stats_planner = TeamStatsRefreshPlanner(
+    db_instance, ttl=datetime.timedelta(hours=float(getenv('TEAM_STATS_TTL_HOURS', 24))))
+fixture_fetch_planner = FixtureFetchPlanner(
+    db_instance, window_ttl=datetime.timedelta(hours=float(getenv('FIXTURES_WINDOW_TTL_HOURS', 6))))
+adaptive_planner = AdaptiveRefreshPlanner(
+    db_instance, daily_budget=int(getenv('ADAPTIVE_DAILY_BUDGET', 75)),
+    horizon=datetime.timedelta(hours=float(getenv('ADAPTIVE_HORIZON_HOURS', 24))))
+
+
+async def get_football_data(league_id: int, season: int, force: bool = False) -> dict:
+    return await api_client.get(
+        "/v3/standings", params={"season": season, "league": league_id},
+        priority=PRIORITY_HIGH, force=force)
 
 
 def organize_data(data_json: dict) -> dict:
@@ -57,365 +98,786 @@ def organize_data(data_json: dict) -> dict:
     return organized_data
 
 
-async def update_league_data(league_id: int, season: int):
-    raw_data = get_football_data(league_id, season)
-    data_json = json.loads(raw_data)
+async def update_league_data(league_id: int, season: int, force: bool = False):
+    # force: ignora a classificação fresca do cache HTTP (atualizações pós-jogo)
+    data_json = await get_football_data(league_id, season, force)
     organized_data = organize_data(data_json)
-    db_instance.update_league_data(league_id, season, organized_data)
+    await db_async.run(db_instance.update_league_data, league_id, season, organized_data)
+    standings_index.invalidate(league_id, season)
+    await data_version.bump()
+    await rebuild_match_details(league_id, season)
+
+
+async def mark_data_changed(season: int):
+    """
+    Descarta o que os endpoints de leitura calcularam a partir dos detalhes das partidas
+    de uma temporada, depois que a ingestão os alterou.
+
+    Os caches deste worker são descartados na hora; a versão compartilhada dos dados é
+    incrementada para que os outros workers descartem os seus.
+    """
+    screener.invalidate(season)
+    response_cache.bump()
+    await data_version.bump()
 
 
-def fetch_standings_data(league_id: int, season: int) -> dict:
+async def rebuild_match_details(league_id: int, season: int) -> int:
     """
-    Busca, em nosso banco, os dados de classificação de uma liga específica com base no ID da liga e na temporada.
+    Reconstrói os documentos pré-calculados das partidas de uma liga.
+
+    Cada documento junta o jogo, as estatísticas dos dois times, as posições na tabela e
+    as informações da liga, e só é regravado quando alguma dessas entradas mudou.
 
     Args:
     - league_id (int): ID da liga.
     - season (int): Temporada.
 
     Returns:
-    - dict: Dados de classificação da liga.
+    - int: Quantidade de documentos regravados.
+    """
+    # A classificação em memória pode ter sido substituída por outro worker
+    await data_version.check()
+    try:
+        standings = await standings_index.get(league_id, season)
+    except ValueError:
+        standings = None
+
+    fixtures = await db_async.run(db_instance.get_fixtures, league_id, season)
+    team_ids = []
+    for fixture in fixtures:
+        team_ids.append(fixture["teams"]["home"]["id"])
+        team_ids.append(fixture["teams"]["away"]["id"])
+    team_stats, week_windows, stored_hashes = await asyncio.gather(
+        db_async.run(db_instance.get_team_stats_many, league_id, season, team_ids),
+        db_async.run(db_instance.get_week_windows, season),
+        db_async.run(db_instance.get_match_detail_hashes, [fixture["_id"] for fixture in fixtures]))
+    week_window = week_windows.get(league_id)
+
+    documents = []
+    missing_statistics = 0
+    for fixture in fixtures:
+        document = build_match_detail_document(
+            fixture,
+            team_stats.get(fixture["teams"]["home"]["id"]),
+            team_stats.get(fixture["teams"]["away"]["id"]),
+            standings, week_window)
+        if document["missing_statistics"]:
+            missing_statistics += 1
+        if stored_hashes.get(fixture["_id"]) != document["inputs_hash"]:
+            documents.append(document)
+
+    if missing_statistics:
+        print(f"Liga {league_id}/{season}: {missing_statistics} jogo(s) sem estatísticas "
+              f"de um ou dos dois times")
+
+    await db_async.run(db_instance.write_match_details, documents)
+    if documents:
+        await mark_data_changed(season)
+    return len(documents)
+
+
+def _extract_matches(fixtures_data: dict) -> list:
+    # Extrai apenas os campos "fixture" e "teams"
+    return [{"fixture": match.get("fixture", {}), "teams": match.get("teams", {})}
+            for match in fixtures_data.get("response", [])]
+
+
+async def refresh_team_statistics(matches_by_league: dict, force: bool = False) -> dict:
+    """
+    Atualiza as estatísticas dos times de um conjunto de jogos, sem buscas repetidas.
+
+    Args:
+    - matches_by_league (dict): Jogos indexados por (league_id, season).
+    - force (bool): Ignora as respostas frescas do cache HTTP (ex.: logo depois dos jogos).
+
+    Returns:
+    - dict: Relatório do planejamento, incluindo as chamadas à API economizadas.
+    """
+    plan = await db_async.run(team_stats_planner.plan, matches_by_league)
+    await asyncio.gather(*(
+        update_team_statistics_in_db(league_id, season, team_id, force)
+        for league_id, season, team_id in plan.to_refresh))
+
+    report = plan.report()
+    print(f"Estatísticas de times atualizadas: {report}")
+    return report
+
+
+async def _track_league(job, league_id: int, season: int, coro):
+    # Reporta o andamento de uma liga no job, quando a atualização roda como job
+    if job is None:
+        return await coro
+    job.league_running(league_id, season)
+    try:
+        result = await coro
+    except Exception as e:
+        job.league_failed(league_id, season, str(e))
+        raise
+    job.league_done(league_id, season)
+    return result
+
+
+async def _finish_leagues(matches_by_league: dict, job=None) -> list:
+    # Estatísticas dos times planejadas uma única vez para todas as ligas
+    await refresh_team_statistics(matches_by_league)
+    results = await asyncio.gather(*(
+        _track_league(job, league_id, season, rebuild_match_details(league_id, season))
+        for league_id, season in matches_by_league), return_exceptions=True)
+
+    # Uma liga com falha não interrompe as demais; o job termina como "partial"
+    failed = []
+    for (league_id, season), result in zip(matches_by_league, results):
+        if isinstance(result, Exception):
+            print(f"Erro ao reconstruir os jogos da liga {league_id}: {str(result)}")
+            failed.append((league_id, season))
+    return failed
+
+
+async def update_standings_for_all_leagues(leagues: list = None, job=None):
+    """
+    Atualiza as classificações de todas as ligas em paralelo.
+
+    Args:
+    - leagues (list, opcional): Ligas a atualizar; por padrão, todas as do registro de ligas.
+    - job (Job, opcional): Job que acompanha o progresso por liga.
+    """
+    leagues = league_registry.leagues() if leagues is None else leagues
+    results = await asyncio.gather(*(
+        _track_league(job, league["league_id"], league["season"],
+                      update_league_data(league["league_id"], league["season"]))
+        for league in leagues), return_exceptions=True)
+
+    for league, result in zip(leagues, results):
+        if isinstance(result, Exception):
+            print(f"Erro ao atualizar a classificação da liga {league['league_id']}: {str(result)}")
+
+
+async def _execute_fetch_call(call) -> dict:
+    fixtures_data = await api_client.get("/v3/fixtures", params=call.params, priority=PRIORITY_NORMAL)
+
+    matches_by_league = {key: [] for key in call.leagues}
+    for match in fixtures_data.get("response", []):
+        if call.per_league:
+            key = call.leagues[0]
+        else:
+            # Chamada por data: traz jogos de todas as ligas, só as planejadas são gravadas
+            league = match.get("league", {})
+            key = (league.get("id"), league.get("season"))
+        if key in matches_by_league:
+            matches_by_league[key].append({"fixture": match.get("fixture", {}),
+                                           "teams": match.get("teams", {})})
+
+    for (league_id, season), matches in matches_by_league.items():
+        counts = await db_async.run(
+            db_instance.sync_fixtures, league_id, season, matches, call.window)
+        if counts["removed"]:
+            await mark_data_changed(season)
+
+    return matches_by_league
+
+
+def plan_fixture_fetch(kind: str, leagues: list = None, start_date: str = None,
+                       end_date: str = None):
+    """
+    Planeja as chamadas a /v3/fixtures de uma atualização de todas as ligas.
+
+    Args:
+    - kind (str): "today" (jogos do dia) ou "range" (jogos de start_date a end_date).
+    - leagues (list, opcional): Ligas a atualizar; por padrão, todas as do registro de ligas.
+
+    Returns:
+    - FixtureFetchPlan: Chamadas planejadas e ligas atendidas localmente.
+    """
+    leagues = league_registry.leagues() if leagues is None else leagues
+    if kind == "today":
+        return fixture_fetch_planner.plan_today(leagues)
+    return fixture_fetch_planner.plan_range(leagues, start_date, end_date)
+
+
+async def dry_run_fixture_fetch(kind: str, start_date: str = None, end_date: str = None) -> dict:
+    """
+    Mostra as chamadas planejadas e o custo de cota esperado, sem chamar a API.
     """
-    return db_instance.get_standings_data(league_id, season)
+    plan = await db_async.run(plan_fixture_fetch, kind, None, start_date, end_date)
+    print(plan.describe())
+    return {**plan.report(), "quota_remaining": await asyncio.to_thread(quota_manager.remaining)}
 
 
-def filter_quartile_matches(matches: list, standings_data: dict) -> list:
+async def execute_fixture_plan(plan, job=None) -> dict:
     """
-    Filtra os jogos a partir de uma lista com base nas classificações das equipes.
+    Executa um plano de busca de jogos e grava o resultado na coleção de jogos.
 
     Args:
-    - matches (list): Lista de jogos com informações completas.
-    - standings_data (dict): Dados de classificação da liga.
+    - plan (FixtureFetchPlan): Plano a executar.
+    - job (Job, opcional): Job que acompanha o progresso por liga.
 
     Returns:
-    - list: Uma lista de informações completas dos jogos que atendem aos critérios.
+    - dict: Jogos indexados por (league_id, season), incluindo os das ligas atendidas
+      localmente; ligas cujas chamadas falharam ficam de fora.
+    """
+    print(plan.describe())
+    if job is not None:
+        for league_id, season in plan.leagues:
+            job.league_running(league_id, season)
+
+    results = await asyncio.gather(*(_execute_fetch_call(call) for call in plan.calls),
+                                   return_exceptions=True)
+
+    matches_by_league = {}
+    failed = set()
+    for call, result in zip(plan.calls, results):
+        if isinstance(result, Exception):
+            print(f"Erro ao buscar jogos {call.params}: {str(result)}")
+            for league_id, season in call.leagues:
+                failed.add((league_id, season))
+                if job is not None:
+                    job.league_failed(league_id, season, str(result))
+            continue
+        for key, matches in result.items():
+            matches_by_league.setdefault(key, []).extend(matches)
+
+    for league_id, season in plan.served_locally:
+        matches_by_league[(league_id, season)] = await db_async.run(
+            db_instance.get_fixtures_in_window, league_id, season, plan.window)
+
+    for key, window in plan.week_windows.items():
+        if key not in failed:
+            await db_async.run(db_instance.set_week_window, key[0], key[1], window)
+
+    return {key: matches for key, matches in matches_by_league.items() if key not in failed}
+
+
+async def update_week_matches_for_all_leagues(start_date, end_date, leagues: list = None, job=None):
+    """
+    Atualiza os jogos da semana de todas as ligas com o menor número de chamadas à API.
+
+    Args:
+    - start_date (str): Data de início da semana (no formato YYYY-MM-DD).
+    - end_date (str): Data de término da semana (no formato YYYY-MM-DD).
+    - leagues (list, opcional): Ligas a atualizar; por padrão, todas as do registro de ligas.
+    - job (Job, opcional): Job que acompanha o progresso por liga.
     """
-    quartile_threshold = len(standings_data["standings"]) // 4
+    plan = await db_async.run(plan_fixture_fetch, "range", leagues, start_date, end_date)
+    matches_by_league = await execute_fixture_plan(plan, job)
+    await _finish_leagues(matches_by_league, job)
 
-    quartile_matches = []
+    print("Atualização dos jogos da semana para todas as ligas concluída com sucesso")
 
-    for match in matches:
-        home_team_id = match["teams"]["home"]["id"]
-        away_team_id = match["teams"]["away"]["id"]
-        match = db_instance.get_detailed_match_data(
-                match['fixture']['id'])
 
-        # Encontre as classificações das equipes
-        home_team_rank = next(
-            (team["rank"] for team in standings_data["standings"] if team["team_id"] == home_team_id), None)
-        away_team_rank = next(
-            (team["rank"] for team in standings_data["standings"] if team["team_id"] == away_team_id), None)
-            
-        match['league_info'] = standings_data['league_info']
-        match['home']['team_rank'] = home_team_rank
-        match['away']['team_rank'] = away_team_rank
+async def update_today_matches_for_all_leagues(leagues: list = None, job=None):
+    """
+    Atualiza os jogos do dia de todas as ligas com o menor número de chamadas à API;
+    ligas com a janela da semana recente são atendidas pelos jogos já guardados.
 
-        # Verifique se ambas as equipes estão no primeiro ou no último quartil
-        if home_team_rank is not None and away_team_rank is not None:
-            if home_team_rank <= quartile_threshold and away_team_rank > 3 * quartile_threshold:
-                quartile_matches.append(match)
-            elif away_team_rank <= quartile_threshold and home_team_rank > 3 * quartile_threshold:
-                quartile_matches.append(match)
+    Args:
+    - leagues (list, opcional): Ligas a atualizar; por padrão, todas as do registro de ligas.
+    - job (Job, opcional): Job que acompanha o progresso por liga.
+    """
+    plan = await db_async.run(plan_fixture_fetch, "today", leagues)
+    matches_by_league = await execute_fixture_plan(plan, job)
+    await _finish_leagues(matches_by_league, job)
 
-    return quartile_matches
+    print("Atualização dos jogos do dia para todas as ligas concluída com sucesso")
 
 
-@global_rate_limited
-def update_today_matches_in_db(league_id: int, season: int):
+def submit_ingestion_job(kind: str, leagues: list = None, **params):
     """
-    Atualiza os jogos do dia no banco de dados MongoDB para uma liga específica.
+    Enfileira uma atualização de um conjunto de ligas como job em segundo plano.
 
     Args:
-    - league_id (int): ID da liga.
-    - season (int): Temporada.
+    - kind (str): "standings", "today_matches" ou "week_matches".
+    - leagues (list, opcional): Ligas a atualizar; por padrão, todas as do registro de ligas.
+    - params: Parâmetros da atualização (start_date e end_date para "week_matches").
 
-    Esta função faz uma chamada à API externa para obter os jogos do dia e atualiza
-    o campo "today_matches" na coleção do MongoDB para a liga especificada.
+    Returns:
+    - Job: Job enfileirado.
     """
-    try:
-        conn = http.client.HTTPSConnection("api-football-v1.p.rapidapi.com")
+    leagues = league_registry.leagues() if leagues is None else leagues
+    if kind == "standings":
+        func = lambda job: update_standings_for_all_leagues(leagues, job)
+    elif kind == "today_matches":
+        func = lambda job: update_today_matches_for_all_leagues(leagues, job)
+    elif kind == "week_matches":
+        func = lambda job: update_week_matches_for_all_leagues(
+            params["start_date"], params["end_date"], leagues, job)
+    else:
+        raise ValueError(f"Tipo de job desconhecido: {kind}")
 
-        headers = {
-            'X-RapidAPI-Key': API_FOOTBALL_KEY,
-            'X-RapidAPI-Host': "api-football-v1.p.rapidapi.com"
-        }
+    return job_queue.submit(kind, params, leagues, func)
 
-        # Obtém a data atual no formato YYYY-MM-DD
-        today = datetime.date.today().isoformat()
 
-        # Define o fuso horário para "America/Sao_Paulo"
-        timezone = "America/Sao_Paulo"
-        status = "NS"
+async def run_ingestion_job(kind: str, leagues: list = None, **params) -> dict:
+    """
+    Executa uma atualização pela fila de jobs e aguarda o fim (usado pelo agendador).
 
-        # Faz a consulta para obter os jogos do dia para a liga e temporada especificadas
-        conn.request(
-            "GET", f"/v3/fixtures?date={today}&league={league_id}&season={season}&timezone={timezone}&status={status}", headers=headers)
+    Returns:
+    - dict: Estado final do job; com status "partial", "failed_leagues" traz as ligas
+      que falharam.
 
-        res = conn.getresponse()
-        data = res.read()
+    Raises:
+    - Exception: Se o job falhar por inteiro ou for cancelado.
+    """
+    job = submit_ingestion_job(kind, leagues, **params)
+    result = await job_queue.wait(job)
+    if result["status"] not in (SUCCEEDED, PARTIAL):
+        raise Exception(f"Job {job.id} terminou com status {result['status']}: {result['errors']}")
+    return result
 
-        fixtures_data = json.loads(data.decode("utf-8"))
 
-        # Obtém os jogos do dia
-        today_matches = fixtures_data.get("response", [])
+async def run_scheduled_job(job: str, func):
+    """
+    Executa uma tarefa agendada apenas no worker líder e a registra no histórico.
 
-        # Extrai apenas os campos "fixture" e "teams"
-        extracted_matches = []
-        for match in today_matches:
-            extracted_match = {
-                "fixture": match.get("fixture", {}),
-                "teams": match.get("teams", {})
-            }
-            extracted_matches.append(extracted_match)
+    Cada worker tem o seu agendador, mas só quem detém o lease do líder executa a tarefa;
+    os demais a ignoram, assim como o líder se ela ainda estiver em execução. A execução
+    é registrada com início, duração, chamadas feitas à API-Football pelo worker durante
+    a tarefa e resultado.
+
+    Args:
+    - job (str): Nome da tarefa.
+    - func: Corrotina (sem argumentos) que executa a tarefa. Se ela devolver o estado de
+      um job com status "partial", a execução é registrada como "partial", com as ligas
+      que falharam.
 
-        # Atualiza o campo "today_matches" na coleção MongoDB para a liga especificada
-        db_instance.update_today_matches(league_id, season, extracted_matches)
+    Returns:
+    - dict: Registro da execução, ou None se ela foi ignorada.
+    """
+    if not await leader_election.acquire():
+        print(f"Tarefa {job} ignorada: outro worker é o líder do agendador")
+        return None
+    if job in running_scheduled_jobs:
+        print(f"Tarefa {job} ignorada: já está em execução")
+        return None
+
+    running_scheduled_jobs.add(job)
+    try:
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        started = time.perf_counter()
+        requests_before = api_client.requests_made
+        outcome, error, failed_leagues = "success", None, []
+        try:
+            result = await func()
+            if isinstance(result, dict) and result.get("status") == PARTIAL:
+                failed_leagues = result["failed_leagues"]
+                outcome, error = "partial", f"Ligas com falha: {failed_leagues}"
+                print(f"Tarefa agendada {job} terminou com falhas nas ligas {failed_leagues}")
+        except Exception as e:
+            outcome, error = "error", str(e)
+            print(f"Erro na tarefa agendada {job}: {error}")
+
+        duration = time.perf_counter() - started
+        # Tarefas adaptativas têm um nome por atualização; a métrica agrupa pelo tipo
+        metrics.SCHEDULED_JOB_DURATION.observe(
+            duration, job=":".join(job.split(":")[:2]), outcome=outcome)
+        run = {
+            "job": job,
+            "owner": leader_election.owner,
+            "started_at": started_at,
+            "duration_s": duration,
+            "api_calls": api_client.requests_made - requests_before,
+            "outcome": outcome,
+            "error": error,
+            "failed_leagues": failed_leagues,
+        }
+        await db_async.run(db_instance.record_job_run, run)
+        return run
+    finally:
+        # Só depois de registrar, para run_missed_ticks não a executar de novo
+        running_scheduled_jobs.discard(job)
 
-        for match in extracted_matches:
-            home_team_id = match["teams"]["home"]["id"]
-            away_team_id = match["teams"]["away"]["id"]
-            update_team_statistics_in_db(league_id, season, home_team_id)
-            update_team_statistics_in_db(league_id, season, away_team_id)
 
-    except Exception as e:
-        print(f"Erro ao atualizar jogos do dia: {str(e)}")
+async def run_missed_ticks(scheduler) -> list:
+    """
+    Executa as tarefas agendadas (cron) que dispararam enquanto o lease de um líder que
+    caiu ainda valia, quando este worker assume a liderança.
+
+    Um disparo é considerado perdido se aconteceu dentro de
+    ``leader_election.missed_tick_window`` e não há execução registrada da tarefa desde ele.
+
+    Args:
+    - scheduler (AsyncIOScheduler): Agendador do worker.
+
+    Returns:
+    - list: Nomes das tarefas executadas.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    start = now - leader_election.missed_tick_window
+    executed = []
+    for scheduled in scheduler.get_jobs():
+        if (scheduled.func is not run_scheduled_job
+                or not isinstance(scheduled.trigger, CronTrigger)):
+            continue
+        job, func = scheduled.args
+        fire_time = last_fire_time(scheduled.trigger, start, now)
+        if fire_time is None or job in running_scheduled_jobs:
+            continue
+        runs = await db_async.run(db_instance.get_job_runs, job, 1)
+        if runs and runs[0]["started_at"] >= fire_time:
+            continue
+        print(f"Tarefa {job} de {fire_time.isoformat()} não foi executada pelo líder anterior")
+        await run_scheduled_job(job, func)
+        executed.append(job)
+    return executed
+
+
+async def get_scheduler_status(limit: int = 20) -> dict:
+    """
+    Obtém o líder atual do agendador e as execuções mais recentes das tarefas agendadas.
+    """
+    return {
+        "worker": leader_election.owner,
+        "is_leader": leader_election.is_leader,
+        "leader": await asyncio.to_thread(leader_election.current),
+        "runs": await db_async.run(db_instance.get_job_runs, None, limit),
+    }
 
 
-@global_rate_limited
-def update_week_matches_in_db(league_id: int, season: int, start_date: str, end_date: str):
+async def fetch_fixtures_by_ids(league_id: int, season: int, fixture_ids: list,
+                                force: bool = False) -> list:
     """
-    Atualiza os jogos da semana no banco de dados MongoDB para uma liga específica.
+    Busca jogos específicos de uma liga na API externa e grava o que mudou.
 
     Args:
     - league_id (int): ID da liga.
     - season (int): Temporada.
-    - start_date (str): Data de início da semana (no formato YYYY-MM-DD).
-    - end_date (str): Data de término da semana (no formato YYYY-MM-DD).
+    - fixture_ids (list): IDs dos jogos (a API aceita até 20 por chamada).
+    - force (bool): Ignora as respostas frescas do cache HTTP.
 
-    Esta função faz uma chamada à API externa para obter os jogos da semana e atualiza
-    o campo "week_matches" na coleção do MongoDB para a liga especificada.
+    Returns:
+    - list: Jogos extraídos, com os campos "fixture" e "teams".
     """
-    try:
-        conn = http.client.HTTPSConnection("api-football-v1.p.rapidapi.com")
+    matches = []
+    for i in range(0, len(fixture_ids), 20):
+        ids = "-".join(str(fixture_id) for fixture_id in fixture_ids[i:i + 20])
+        fixtures_data = await api_client.get("/v3/fixtures", params={"ids": ids},
+                                             priority=PRIORITY_NORMAL, force=force)
+        matches.extend(_extract_matches(fixtures_data))
 
-        headers = {
-            'X-RapidAPI-Key': API_FOOTBALL_KEY,
-            'X-RapidAPI-Host': "api-football-v1.p.rapidapi.com"
-        }
+    counts = await db_async.run(db_instance.sync_fixtures, league_id, season, matches)
+    print(f"Jogos {fixture_ids} da liga {league_id} sincronizados: {counts}")
+    return matches
 
-        # Define o fuso horário para "America/Sao_Paulo"
-        timezone = "America/Sao_Paulo"
-        status = "NS"
 
-        # Faz a consulta para obter os jogos da semana para a liga e temporada especificadas
-        conn.request(
-            "GET", f"/v3/fixtures?league={league_id}&season={season}&from={start_date}&to={end_date}", headers=headers)
+async def run_adaptive_refresh(refresh):
+    """
+    Executa uma atualização planejada pelo agendador adaptativo.
 
-        res = conn.getresponse()
-        data = res.read()
+    Antes do início dos jogos, atualiza só os jogos (árbitro, horário, status). Depois do
+    fim, atualiza os jogos, a classificação da liga e as estatísticas dos times que jogaram.
+    As respostas frescas do cache HTTP são ignoradas: foram guardadas antes do jogo.
 
-        fixtures_data = json.loads(data.decode("utf-8"))
+    Args:
+    - refresh (ScheduledRefresh): Atualização planejada.
+    """
+    league_id, season = refresh.league_id, refresh.season
+    matches = await fetch_fixtures_by_ids(league_id, season, refresh.fixture_ids, force=True)
+    if refresh.kind == PRE_KICKOFF:
+        await rebuild_match_details(league_id, season)
+        return
 
-        # Obtém os jogos da semana
-        # print("Log: Obtendo jogos da semana...")
-        week_matches = fixtures_data.get("response", [])
-        # print(f"Log: {week_matches}")
+    await update_league_data(league_id, season, force=True)
+    # Com os jogos já encerrados no banco, o planejador considera as estatísticas vencidas
+    await refresh_team_statistics({(league_id, season): matches}, force=True)
+    await rebuild_match_details(league_id, season)
 
-        # Extrai apenas os campos "fixture" e "teams"
-        extracted_matches = []
-        for match in week_matches:
-            extracted_match = {
-                "fixture": match.get("fixture", {}),
-                "teams": match.get("teams", {})
-            }
-            extracted_matches.append(extracted_match)
 
-        # Atualiza o campo "week_matches" na coleção MongoDB para a liga especificada
-        db_instance.update_week_matches(league_id, season, extracted_matches)
+async def compute_refresh_schedule():
+    """
+    Calcula a agenda adaptativa a partir do calendário de jogos guardado, descontando do
+    orçamento diário as chamadas já feitas hoje pelas tarefas agendadas.
 
-        for match in extracted_matches:
-            home_team_id = match["teams"]["home"]["id"]
-            away_team_id = match["teams"]["away"]["id"]
-            update_team_statistics_in_db(league_id, season, home_team_id)
-            update_team_statistics_in_db(league_id, season, away_team_id)
+    Returns:
+    - RefreshSchedule: Agenda calculada.
+    """
+    start, _ = db_instance.today_range()
+    spent_today = await db_async.run(db_instance.get_api_calls_since, start)
+    quota_remaining = await asyncio.to_thread(quota_manager.remaining)
+    leagues = league_registry.leagues((CADENCE_ADAPTIVE,))
+    return await db_async.run(adaptive_planner.plan, leagues, None, spent_today, quota_remaining)
 
-    except Exception as e:
-        print(f"Erro ao atualizar jogos da semana: {str(e)}")
 
+async def replan_refreshes(scheduler):
+    """
+    Recalcula a agenda adaptativa e a sincroniza com o agendador da aplicação.
 
-def update_week_matches_for_all_leagues(start_date, end_date):
-    try:
-        # Ler o arquivo leagues.json para obter a lista de ligas
-        with open("leagues.json", "r") as file:
-            leagues = json.load(file)
+    Cada atualização planejada vira uma tarefa de execução única, identificada pela chave
+    da atualização; tarefas adaptativas que saíram da agenda são removidas.
 
-        # Para cada liga na lista, chame a função para atualizar os jogos da semana
-        for league in leagues:
-            league_id = league["league_id"]
-            season = league["season"]
-            update_week_matches_in_db(league_id, season, start_date, end_date)
+    Args:
+    - scheduler (AsyncIOScheduler): Agendador do worker.
 
-        print("Atualização dos jogos da semana para todas as ligas concluída com sucesso")
-    except Exception as e:
-        print(
-            f"Erro ao atualizar jogos da semana para todas as ligas: {str(e)}")
+    Returns:
+    - RefreshSchedule: Agenda calculada.
+    """
+    schedule = await compute_refresh_schedule()
+    planned = set()
+    for refresh in schedule.scheduled:
+        job_id = f"adaptive:{refresh.key}"
+        planned.add(job_id)
+        scheduler.add_job(run_scheduled_job, 'date', run_date=refresh.run_at, id=job_id,
+                          replace_existing=True,
+                          args=[job_id, functools.partial(run_adaptive_refresh, refresh)])
 
+    for job in scheduler.get_jobs():
+        if job.id.startswith("adaptive:") and job.id not in planned:
+            job.remove()
 
-def update_today_matches_for_all_leagues():
-    try:
-        # Ler o arquivo leagues.json para obter a lista de ligas
-        with open("leagues.json", "r") as file:
-            leagues = json.load(file)
+    print(f"Agenda adaptativa: {len(planned)} atualização(ões) planejada(s), "
+          f"{len(schedule.idle_leagues)} liga(s) sem jogos")
+    return schedule
 
-        # Para cada liga na lista, chame a função para atualizar os jogos do dia
-        for league in leagues:
-            league_id = league["league_id"]
-            season = league["season"]
-            update_today_matches_in_db(league_id, season)
 
-        print("Atualização dos jogos do dia para todas as ligas concluída com sucesso")
+async def run_calendar_refresh():
+    """
+    Atualiza o calendário de jogos dos próximos 7 dias, base da agenda adaptativa.
+    """
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return await run_ingestion_job("week_matches", league_registry.scheduled(),
+                                   start_date=today.isoformat(),
+                                   end_date=(today + datetime.timedelta(days=6)).isoformat())
+
+
+async def get_team_statistics(league_id: int, season: int, team_id: int,
+                              force: bool = False) -> dict:
+    return await api_client.get("/v3/teams/statistics", params={
+        "league": league_id, "season": season, "team": team_id},
+        priority=PRIORITY_LOW, force=force)
+
+
+def organize_team_statistics(response_data: dict) -> dict:
+    """
+    Extrai os campos usados pela aplicação das estatísticas de um time na API-Football.
+
+    Args:
+    - response_data (dict): Campo "response" de /v3/teams/statistics.
+
+    Returns:
+    - dict: Estatísticas do time no formato armazenado no banco.
+    """
+    home_matches_played = response_data["fixtures"]["played"]["home"]
+    away_matches_played = response_data["fixtures"]["played"]["away"]
+
+    yellow_cards = response_data["cards"]["yellow"]
+    red_cards = response_data["cards"]["red"]
+    total_yellow_cards = 0
+    total_red_cards = 0
+
+    # Somar os cartões amarelos
+    for interval in yellow_cards.values():
+        total = interval.get("total", {})
+        if total:
+            total_yellow_cards += int(total)
+
+    # Somar os cartões vermelhos
+    for interval in red_cards.values():
+        total = interval.get("total", {})
+        if total:
+            total_red_cards += int(total)
+
+    total_matches_played = home_matches_played + away_matches_played
+
+    avg_yellow_cards = total_yellow_cards / total_matches_played
+    avg_red_cards = total_red_cards / total_matches_played
+
+    # Extrair os campos desejados
+    extracted_data = {
+        "form": response_data.get("form", ""),
+        "total_matches_played": home_matches_played + away_matches_played,
+        "total_goals_for": response_data["goals"]["for"]["total"]["total"],
+        "total_goals_against": response_data["goals"]["against"]["total"]["total"],
+        "avg_goals_per_game_home": response_data["goals"]["for"]["average"]["home"],
+        "avg_goals_per_game_away": response_data["goals"]["for"]["average"]["away"],
+        "win_percentage_home": response_data["fixtures"]["wins"]["home"] / home_matches_played * 100,
+        "win_percentage_away": response_data["fixtures"]["wins"]["away"] / away_matches_played * 100,
+        "clean_sheet_percentage_home": response_data["clean_sheet"]["home"] / home_matches_played * 100,
+        "total_red_cards": total_red_cards,
+        "red_card_avg": avg_red_cards,
+        "total_yellow_cards": total_yellow_cards,
+        "yellow_card_avg": avg_yellow_cards,
+        "clean_sheet_percentage_away": response_data["clean_sheet"]["away"] / away_matches_played * 100
+    }
+
+    return extracted_data
+
+
+async def update_team_statistics_in_db(league_id: int, season: int, team_id: int,
+                                       force: bool = False):
+    try:
+        data_json = await get_team_statistics(league_id, season, team_id, force)
+        response_data = data_json.get("response", {})
+        if response_data:
+            extracted_data = organize_team_statistics(response_data)
+            await db_async.run(db_instance.update_team_statistics,
+                               league_id, season, team_id, extracted_data)
     except Exception as e:
-        print(f"Erro ao atualizar jogos do dia para todas as ligas: {str(e)}")
+        print(f"Erro ao atualizar estatísticas do time: {str(e)}")
 
 
-def get_today_matches_from_db(league_id: int, season: int):
+async def get_today_quartile_matches(league_id: int, season: int) -> list:
     """
-    Obtém os jogos do dia para uma liga específica do banco de dados MongoDB.
+    Obtém os jogos do dia de uma liga em que um time do primeiro quartil enfrenta um do último.
 
     Args:
     - league_id (int): ID da liga.
     - season (int): Temporada.
 
     Returns:
-    - list: Uma lista de informações completas dos jogos do dia.
+    - list: Dados detalhados das partidas, com posições e informações da liga.
     """
-    # Chama o método do banco de dados para obter os jogos do dia
-    return db_instance.get_today_matches(league_id, season)
+    return await db_async.get_today_quartile_matches(league_id, season)
 
 
-def get_week_matches_from_db(season: int):
+async def get_weekly_quartile_matches(leagues: list) -> list:
     """
-    Obtém os jogos da semana para uma liga específica do banco de dados MongoDB.
+    Obtém os jogos da semana das ligas informadas que atendem ao critério do quartil.
 
     Args:
-    - league_id (int): ID da liga.
-    - season (int): Temporada.
+    - leagues (list): Ligas do registro de ligas, na ordem desejada.
 
     Returns:
-    - list: Uma lista de informações completas dos jogos do dia.
+    - list: Dados detalhados das partidas, agrupados pela ordem das ligas.
     """
-    # Chama o método do banco de dados para obter os jogos do dia
-    return db_instance.get_all_week_matches(season)
+    return await db_async.get_weekly_quartile_report(leagues)
 
 
-@global_rate_limited
-def get_team_statistics(league_id: int, season: int, team_id: int):
-    conn = http.client.HTTPSConnection("api-football-v1.p.rapidapi.com")
+async def iter_weekly_quartile_matches(leagues: list):
+    """
+    Percorre os jogos da semana que atendem ao critério do quartil, lote a lote do cursor.
 
-    headers = {
-        'X-RapidAPI-Key': API_FOOTBALL_KEY,
-        'X-RapidAPI-Host': "api-football-v1.p.rapidapi.com"
-    }
+    Args:
+    - leagues (list): Ligas do registro de ligas, na ordem desejada.
 
-    endpoint = f"/v3/teams/statistics?league={league_id}&season={season}&team={team_id}"
-    conn.request("GET", endpoint, headers=headers)
+    Yields:
+    - dict: Dados detalhados de cada partida, na mesma ordem de ``get_weekly_quartile_matches``.
+    """
+    async for batch in db_async.iter_weekly_quartile_report(leagues):
+        for document in batch:
+            yield document["detail"]
 
-    res = conn.getresponse()
-    data = res.read()
 
-    return data.decode("utf-8")
+async def get_weekly_quartile_matches_page(leagues: list, limit: int, cursor: str = None) -> dict:
+    """
+    Obtém uma página dos jogos da semana que atendem ao critério do quartil.
 
+    Args:
+    - leagues (list): Ligas do registro de ligas, na ordem desejada.
+    - limit (int): Tamanho da página.
+    - cursor (str, opcional): Cursor devolvido pela página anterior.
 
-def update_team_statistics_in_db(league_id: int, season: int, team_id: int):
-    try:
-        raw_data = get_team_statistics(league_id, season, team_id)
-        data_json = json.loads(raw_data)
-        response_data = data_json.get("response", {})
-        if response_data:
-            home_matches_played = response_data["fixtures"]["played"]["home"]
-            away_matches_played = response_data["fixtures"]["played"]["away"]
-
-            yellow_cards = response_data["cards"]["yellow"]
-            red_cards = response_data["cards"]["red"]
-            total_yellow_cards = 0
-            total_red_cards = 0
-
-            # Somar os cartões amarelos
-            for interval in yellow_cards.values():
-                total = interval.get("total", {})
-                if total:
-                    total_yellow_cards += int(total)
-
-            # Somar os cartões vermelhos
-            for interval in red_cards.values():
-                total = interval.get("total", {})
-                if total:
-                    total_red_cards += int(total)
-
-            total_matches_played = home_matches_played + away_matches_played
-
-            avg_yellow_cards = total_yellow_cards / total_matches_played
-            avg_red_cards = total_red_cards / total_matches_played
-
-            # Extrair os campos desejados
-            extracted_data = {
-                "form": response_data.get("form", ""),
-                "total_matches_played": home_matches_played + away_matches_played,
-                "total_goals_for": response_data["goals"]["for"]["total"]["total"],
-                "total_goals_against": response_data["goals"]["against"]["total"]["total"],
-                "avg_goals_per_game_home": response_data["goals"]["for"]["average"]["home"],
-                "avg_goals_per_game_away": response_data["goals"]["for"]["average"]["away"],
-                "win_percentage_home": response_data["fixtures"]["wins"]["home"] / home_matches_played * 100,
-                "win_percentage_away": response_data["fixtures"]["wins"]["away"] / away_matches_played * 100,
-                "clean_sheet_percentage_home": response_data["clean_sheet"]["home"] / home_matches_played * 100,
-                "total_red_cards": total_red_cards,
-                "red_card_avg": avg_red_cards,
-                "total_yellow_cards": total_yellow_cards,
-                "yellow_card_avg": avg_yellow_cards,
-                "clean_sheet_percentage_away": response_data["clean_sheet"]["away"] / away_matches_played * 100
-            }
-
-        db_instance.update_team_statistics(
-            league_id, season, team_id, extracted_data)
-    except Exception as e:
-        print(f"Erro ao atualizar estatísticas do time: {str(e)}")
+    Returns:
+    - dict: {"matches": [...], "next_cursor": str ou None}.
+
+    Raises:
+    - ValueError: Se o cursor for inválido.
+    """
+    after = None
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        try:
+            after = (int(position["league_order"]), parse_datetime(position["date"]),
+                     int(position["match_id"]))
+        except (KeyError, TypeError):
+            raise ValueError(f"Cursor inválido: {cursor}")
+
+    # Um jogo a mais indica se existe uma próxima página
+    documents = []
+    async for batch in db_async.iter_weekly_quartile_report(leagues, after, limit + 1):
+        documents.extend(batch)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor({
+            "league_order": last["league_order"], "date": last["date"], "match_id": last["_id"]})
+
+    return {"matches": [document["detail"] for document in documents], "next_cursor": next_cursor}
 
 
-def get_detailed_match_data(match_id):
-    return db_instance.get_detailed_match_data(match_id)
+async def get_detailed_match_data(match_id):
+    return await db_async.get_detailed_match_data(match_id)
 
 
-def filtrar_todos_confrontos(season: int, cartoes_min_por_time: float, cartoes_media_somada: float):
+async def get_detailed_match_data_many(match_ids: list):
+    return await db_async.get_detailed_match_data_many(match_ids)
+
+
+async def filtrar_todos_confrontos(season: int, filtros: list, todos: bool = True):
     """
-    Filtra todos os confrontos de todas as ligas em uma temporada com base em estatísticas de cartões.
+    Filtra todos os confrontos da semana de todas as ligas em uma temporada com base
+    nas estatísticas dos times.
+
+    Os filtros são avaliados de uma vez para todos os jogos sobre os arrays da temporada
+    mantidos em memória; só os detalhes dos jogos selecionados são lidos do banco.
 
     Args:
     - season (int): Temporada.
-    - cartoes_min_time (float): Valor mínimo para média de cartões por time.
-    - cartoes_min_total (float): Valor mínimo para média consolidada de cartões (time1 + time2).
+    - filtros (list): Lista de ``ScreenFilter``.
+    - todos (bool): Se True, o jogo precisa atender a todos os filtros; se False, a algum.
 
     Returns:
     - list: Uma lista de informações completas dos jogos da semana filtrados.
     """
-    all_week_matches = db_instance.get_all_week_matches(season)
-    confrontos_filtrados = []
+    season_screen = await screener.get(season)
+    match_ids = season_screen.screen(filtros, match_all=todos)
+
+    return await db_async.get_detailed_match_data_many(match_ids)
+
+
+async def iter_confrontos_filtrados(season: int, filtros: list, todos: bool = True):
+    """
+    Percorre os confrontos filtrados, lendo os detalhes do banco em lotes.
 
-    for week_matches in all_week_matches:
-        for confronto in week_matches['week_matches']:
-            confronto = db_instance.get_detailed_match_data(
-                confronto['fixture']['id'])
-            home_yellow_card_avg = confronto['home']['statistics'].get(
-                'yellow_card_avg', 0.0)
-            away_yellow_card_avg = confronto['away']['statistics'].get(
-                'yellow_card_avg', 0.0)
+    Args:
+    - season (int): Temporada.
+    - filtros (list): Lista de ``ScreenFilter``.
+    - todos (bool): Se True, o jogo precisa atender a todos os filtros; se False, a algum.
 
-            if (home_yellow_card_avg > cartoes_min_por_time or
-                    away_yellow_card_avg > cartoes_min_por_time):
-                confrontos_filtrados.append(confronto)
-            else:
+    Yields:
+    - dict: Dados detalhados de cada partida, na ordem de data.
+    """
+    season_screen = await screener.get(season)
+    match_ids = season_screen.screen(filtros, match_all=todos)
 
-                total_yellow_card_avg = home_yellow_card_avg + away_yellow_card_avg
+    async for batch in db_async.iter_detailed_match_data(match_ids):
+        for confronto in batch:
+            yield confronto
 
-                if total_yellow_card_avg > cartoes_media_somada:
-                    confrontos_filtrados.append(confronto)
 
-    return confrontos_filtrados
+async def get_confrontos_filtrados_page(season: int, filtros: list, todos: bool, limit: int,
+                                        cursor: str = None) -> dict:
+    """
+    Obtém uma página dos confrontos filtrados.
+
+    Args:
+    - season (int): Temporada.
+    - filtros (list): Lista de ``ScreenFilter``.
+    - todos (bool): Se True, o jogo precisa atender a todos os filtros; se False, a algum.
+    - limit (int): Tamanho da página.
+    - cursor (str, opcional): Cursor devolvido pela página anterior.
+
+    Returns:
+    - dict: {"confrontos_filtrados": [...], "next_cursor": str ou None}.
+
+    Raises:
+    - ValueError: Se o cursor for inválido ou não corresponder a um jogo da triagem.
+    """
+    season_screen = await screener.get(season)
+    match_ids = season_screen.screen(filtros, match_all=todos)
+
+    start = 0
+    if cursor is not None:
+        try:
+            start = match_ids.index(int(decode_cursor(cursor)["match_id"])) + 1
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Cursor inválido: {cursor}")
+
+    page_ids = match_ids[start:start + limit]
+    next_cursor = None
+    if page_ids and start + limit < len(match_ids):
+        next_cursor = encode_cursor({"match_id": page_ids[-1]})
+
+    return {
+        "confrontos_filtrados": await db_async.get_detailed_match_data_many(page_ids),
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,104 @@
+import threading
+
+
+class LeagueStandings:
+    """
+    Classificação de uma liga/temporada indexada para consultas O(1).
+
+    Attributes:
+    - league_info (dict): Informações da liga.
+    - ranks (dict): Mapa team_id -> posição.
+    - quartile_threshold (int): Tamanho de um quartil da tabela.
+    - top_quartile (frozenset): IDs dos times no primeiro quartil.
+    - bottom_quartile (frozenset): IDs dos times no último quartil.
+    """
+
+    def __init__(self, standings_data: dict):
+        self.league_info = standings_data["league_info"]
+        self.ranks = {team["team_id"]: team["rank"]
+                      for team in standings_data["standings"]}
+        self.quartile_threshold = len(standings_data["standings"]) // 4
+        self.top_quartile = frozenset(
+            team_id for team_id, rank in self.ranks.items()
+            if rank <= self.quartile_threshold)
+        self.bottom_quartile = frozenset(
+            team_id for team_id, rank in self.ranks.items()
+            if rank > 3 * self.quartile_threshold)
+
+    def rank(self, team_id: int):
+        return self.ranks.get(team_id)
+
+    def is_quartile_match(self, home_team_id: int, away_team_id: int) -> bool:
+        """
+        Indica se um time está no primeiro quartil e o outro no último.
+        """
+        return ((home_team_id in self.top_quartile and away_team_id in self.bottom_quartile) or
+                (away_team_id in self.top_quartile and home_team_id in self.bottom_quartile))
+
+
+class StandingsIndex:
+    """
+    Índice em memória das classificações por (liga, temporada).
+
+    As entradas são carregadas sob demanda a partir de ``AsyncMongoDB.get_standings_data``
+    e invalidadas quando a ingestão grava uma nova classificação.
+    """
+
+    def __init__(self, db_instance):
+        self._db = db_instance
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Incrementado a cada invalidação, para não guardar uma leitura anterior a ela
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, league_id: int, season: int) -> LeagueStandings:
+        """
+        Obtém a classificação indexada de uma liga.
+
+        Args:
+        - league_id (int): ID da liga.
+        - season (int): Temporada.
+
+        Returns:
+        - LeagueStandings: Classificação indexada da liga.
+        """
+        key = (league_id, season)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self._generation
+
+        entry = LeagueStandings(await self._db.get_standings_data(league_id, season))
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = entry
+
+        return entry
+
+    def invalidate(self, league_id: int = None, season: int = None):
+        """
+        Descarta a classificação de uma liga, ou de todas quando nenhuma é informada.
+        """
+        with self._lock:
+            if league_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((league_id, season), None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
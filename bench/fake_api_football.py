@@ -0,0 +1,192 @@
+"""
+Servidor substituto da API-Football para benchmarks e perfilamento offline.
+
+Responde /v3/standings, /v3/fixtures e /v3/teams/statistics com payloads gravados
+(quando existem em --recordings) ou sintéticos (bench/synthetic.py) para qualquer liga,
+com latência e erros configuráveis. Chamadas a /v3/fixtures só por data (sem "league")
+trazem os jogos de todas as ligas do arquivo de ligas, como a API real. Com --upstream, encaminha as requisições sem
+gravação para a API real e grava as respostas para reprodução futura.
+
+Uso:
+    python -m bench.fake_api_football --port 9000 --latency-ms 80 --error-rate 0.02
+    API_FOOTBALL_BASE_URL=http://127.0.0.1:9000 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import random
+from urllib.parse import urlencode
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from app.league_registry import LeagueRegistry
+from bench import synthetic
+
+
+class StandInConfig:
+    def __init__(self, recordings: str = None, upstream: str = None, api_key: str = None,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 daily_limit: int = 100_000, matches_per_day: int = 5, seed: int = 0,
+                 leagues_file: str = None):
+        self.recordings = recordings
+        self.upstream = upstream
+        self.api_key = api_key
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.daily_limit = daily_limit
+        self.matches_per_day = matches_per_day
+        self.seed = seed
+        # Ligas das chamadas só por data; por padrão, o mesmo arquivo que a aplicação lê
+        self.league_registry = (LeagueRegistry(leagues_file) if leagues_file
+                                else LeagueRegistry.from_env())
+
+
+def recording_path(directory: str, endpoint: str, params: dict) -> str:
+    query = urlencode(sorted(params.items()))
+    key = hashlib.sha256(f"{endpoint}?{query}".encode("utf-8")).hexdigest()
+    return os.path.join(directory, f"{key}.json")
+
+
+def synthetic_payload(endpoint: str, params: dict, config: StandInConfig) -> dict:
+    if endpoint == "/v3/fixtures" and "date" in params and "league" not in params:
+        # Chamada só por data: jogos de todas as ligas configuradas, cada uma na sua temporada
+        matches = []
+        for league in config.league_registry.leagues():
+            matches.extend(synthetic_payload(endpoint, {
+                **params, "league": league["league_id"], "season": league["season"]},
+                config)["response"])
+        return {"get": "fixtures", "errors": [], "results": len(matches), "response": matches}
+
+    league_id = int(params.get("league", 0))
+    season = int(params.get("season", synthetic.SEASON_START.year))
+
+    if endpoint == "/v3/standings":
+        return synthetic.standings(league_id, season, seed=config.seed)
+
+    if endpoint == "/v3/fixtures":
+        if "date" in params:
+            start = end = datetime.date.fromisoformat(params["date"])
+        else:
+            start = datetime.date.fromisoformat(params["from"])
+            end = datetime.date.fromisoformat(params["to"])
+        payload = synthetic.fixtures(league_id, season, start, end,
+                                     matches_per_day=config.matches_per_day, seed=config.seed)
+        if "status" in params:
+            statuses = set(params["status"].split("-"))
+            payload["response"] = [match for match in payload["response"]
+                                   if match["fixture"]["status"]["short"] in statuses]
+            payload["results"] = len(payload["response"])
+        return payload
+
+    if endpoint == "/v3/teams/statistics":
+        return synthetic.team_statistics(league_id, season, int(params["team"]), seed=config.seed)
+
+    return {"errors": {"endpoint": f"Endpoint {endpoint} não suportado"}, "response": []}
+
+
+def create_app(config: StandInConfig) -> FastAPI:
+    app = FastAPI(title="API-Football stand-in")
+    state = {"requests": 0, "errors_injected": 0, "recorded": 0, "replayed": 0}
+    upstream_client = {}
+
+    async def fetch_upstream(endpoint: str, params: dict) -> bytes:
+        if "client" not in upstream_client:
+            host = httpx.URL(config.upstream).host
+            upstream_client["client"] = httpx.AsyncClient(
+                base_url=config.upstream,
+                headers={'X-RapidAPI-Key': config.api_key or "", 'X-RapidAPI-Host': host},
+                timeout=30)
+        response = await upstream_client["client"].get(endpoint, params=params)
+        response.raise_for_status()
+        return response.content
+
+    @app.get("/_stats")
+    async def stats():
+        return state
+
+    @app.get("/v3/{path:path}")
+    async def serve(path: str, request: Request):
+        endpoint = f"/v3/{path}"
+        params = dict(request.query_params)
+        state["requests"] += 1
+
+        if config.latency_ms or config.jitter_ms:
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            await asyncio.sleep(max(delay, 0) / 1000)
+
+        if random.random() < config.error_rate:
+            state["errors_injected"] += 1
+            status = random.choice([429, 500, 503])
+            return Response(status_code=status, headers={"Retry-After": "1"})
+
+        body = None
+        if config.recordings:
+            path_on_disk = recording_path(config.recordings, endpoint, params)
+            if os.path.exists(path_on_disk):
+                with open(path_on_disk, "rb") as file:
+                    body = file.read()
+                state["replayed"] += 1
+            elif config.upstream:
+                body = await fetch_upstream(endpoint, params)
+                os.makedirs(config.recordings, exist_ok=True)
+                with open(path_on_disk, "wb") as file:
+                    file.write(body)
+                state["recorded"] += 1
+
+        if body is None:
+            body = json.dumps(synthetic_payload(endpoint, params, config)).encode("utf-8")
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "x-ratelimit-requests-limit": str(config.daily_limit),
+            "x-ratelimit-requests-remaining": str(max(config.daily_limit - state["requests"], 0)),
+        }
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.on_event("shutdown")
+    async def close_upstream():
+        if "client" in upstream_client:
+            await upstream_client["client"].aclose()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--recordings", help="Diretório de respostas gravadas")
+    parser.add_argument("--upstream", help="URL da API real para gravar respostas ausentes")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fração de requisições respondidas com 429/500/503")
+    parser.add_argument("--daily-limit", type=int, default=100_000)
+    parser.add_argument("--matches-per-day", type=int, default=5,
+                        help="Jogos por dia e por liga (até 5: só fins de semana)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--leagues-file",
+                        help="Ligas das chamadas só por data (padrão: LEAGUES_FILE da aplicação)")
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        recordings=args.recordings, upstream=args.upstream,
+        api_key=os.getenv('API_FOOTBALL_KEY'), latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate, daily_limit=args.daily_limit,
+        matches_per_day=args.matches_per_day, seed=args.seed, leagues_file=args.leagues_file)
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
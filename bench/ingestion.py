@@ -0,0 +1,110 @@
+"""
+Benchmark de vazão da ingestão contra o servidor substituto da API-Football.
+
+Requer o servidor substituto rodando (python -m bench.fake_api_football) e um MongoDB
+local (MONGODB_URI/DB_NAME apontando para um banco descartável).
+
+Os jogos são buscados como na ingestão da aplicação, pelo planejador de chamadas: com
+muitas ligas, uma chamada só por data por dia. O servidor substituto responde a essas
+chamadas com as ligas do seu arquivo de ligas, então o benchmark grava as ligas sintéticas
+em --leagues-file e o servidor precisa ser iniciado com o mesmo arquivo.
+
+Uso:
+    python -m bench.fake_api_football --port 9000 --leagues-file bench_leagues.json
+    python -m bench.ingestion --leagues 50 --api-url http://127.0.0.1:9000
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+
+async def run(args):
+    # Configura o ambiente antes de importar os serviços, que leem as variáveis na importação
+    os.environ["API_FOOTBALL_BASE_URL"] = args.api_url
+    os.environ["API_FOOTBALL_MAX_CONCURRENCY"] = str(args.concurrency)
+    os.environ["HTTP_CACHE_ENABLED"] = "false"
+    os.environ["QUOTA_BACKEND"] = "file"
+    os.environ["QUOTA_FILE_PATH"] = os.path.join(tempfile.mkdtemp(), "quota.json")
+    os.environ["QUOTA_DAILY_LIMIT"] = str(10 ** 9)
+
+    from app import services
+    services.db_instance.ensure_indexes()
+
+    leagues = [{"league_id": args.first_league_id + index, "season": args.season}
+               for index in range(args.leagues)]
+    # Relido pelo servidor substituto quando muda
+    with open(args.leagues_file, "w") as file:
+        json.dump({"current_season": args.season, "leagues": leagues}, file)
+    start = datetime.date.fromisoformat(args.start_date)
+    end = start + datetime.timedelta(days=args.days - 1)
+
+    async with httpx.AsyncClient(base_url=args.api_url) as stand_in:
+        before = (await stand_in.get("/_stats")).json()
+
+        results = {}
+        started = time.perf_counter()
+        await asyncio.gather(*(services.update_league_data(league["league_id"], league["season"])
+                               for league in leagues))
+        results["standings_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        plan = await services.db_async.run(
+            services.plan_fixture_fetch, "range", leagues, start.isoformat(), end.isoformat())
+        matches_by_league = await services.execute_fixture_plan(plan)
+        results["fixtures_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        report = await services.refresh_team_statistics(matches_by_league)
+        results["team_stats_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(services.rebuild_match_details(league_id, season)
+                               for league_id, season in matches_by_league))
+        results["match_details_s"] = time.perf_counter() - started
+
+        after = (await stand_in.get("/_stats")).json()
+
+    await services.api_client.aclose()
+
+    fixtures = sum(len(matches) for matches in matches_by_league.values())
+    total = (results["standings_s"] + results["fixtures_s"] + results["team_stats_s"]
+             + results["match_details_s"])
+    upstream_calls = after["requests"] - before["requests"]
+    results.update({
+        "leagues": len(leagues),
+        "fixtures": fixtures,
+        "fixture_plan": plan.report(),
+        "team_stats": report,
+        "upstream_calls": upstream_calls,
+        "errors_injected": after["errors_injected"] - before["errors_injected"],
+        "total_s": total,
+        "calls_per_s": upstream_calls / total if total else 0,
+        "fixtures_per_s": fixtures / results["fixtures_s"] if results["fixtures_s"] else 0,
+    })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://127.0.0.1:9000")
+    parser.add_argument("--leagues", type=int, default=4)
+    parser.add_argument("--first-league-id", type=int, default=1000)
+    parser.add_argument("--season", type=int, default=2023)
+    parser.add_argument("--start-date", default=datetime.date.today().isoformat())
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--leagues-file", default="bench_leagues.json",
+                        help="Onde gravar as ligas sintéticas, lido pelo servidor substituto")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
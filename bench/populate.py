@@ -0,0 +1,108 @@
+"""
+Popula um MongoDB local com dados sintéticos para os benchmarks de leitura.
+
+Gera classificações, jogos da semana (a partir de hoje), estatísticas de todos os
+times e os detalhes pré-calculados das partidas de 4 a 500 ligas, com até ~100k jogos,
+usando os mesmos métodos de escrita da ingestão. Também grava a lista de ligas usada pelos benchmarks.
+
+Uso:
+    python -m bench.populate --leagues 40 --fixtures 10000 --drop
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import time
+
+from bench import synthetic
+
+DEFAULT_LEAGUES_FILE = os.path.join(os.path.dirname(__file__), ".data", "leagues.json")
+WEEK_DAYS = 7
+
+
+def populate(leagues: int, fixtures: int, season: int = 2023, first_league_id: int = 1000,
+             seed: int = 0, drop: bool = False, leagues_file: str = DEFAULT_LEAGUES_FILE) -> dict:
+    from app.services import (db_instance, organize_data, organize_team_statistics,
+                              rebuild_match_details)
+
+    db_instance.ensure_indexes()
+    if drop:
+        for collection in (db_instance.collection, db_instance.fixtures_collection,
+                           db_instance.team_stats_collection, db_instance.match_details_collection):
+            collection.delete_many({})
+
+    # Jogos por dia e por liga para chegar perto do total pedido na janela da semana:
+    # até 10 jogos por liga cabem em uma rodada de fim de semana, acima disso há jogos todo dia
+    per_league = fixtures / leagues
+    if per_league <= 10:
+        matches_per_day = max(math.ceil(per_league / 2), 1)
+    else:
+        matches_per_day = min(max(math.ceil(per_league / WEEK_DAYS), 6), 99)
+    start = datetime.date.today()
+    end = start + datetime.timedelta(days=WEEK_DAYS - 1)
+
+    started = time.perf_counter()
+    league_list = []
+    total_fixtures = 0
+    for index in range(leagues):
+        league_id = first_league_id + index
+        league_list.append({"league_id": league_id, "season": season})
+
+        standings = synthetic.standings(league_id, season, seed=seed)
+        db_instance.update_league_data(league_id, season, organize_data(standings))
+
+        payload = synthetic.fixtures(league_id, season, start, end,
+                                     matches_per_day=matches_per_day, seed=seed)
+        week_matches = [{"fixture": match["fixture"], "teams": match["teams"]}
+                        for match in payload["response"]]
+        db_instance.update_week_matches(
+            league_id, season, week_matches, start.isoformat(), end.isoformat())
+        total_fixtures += len(week_matches)
+
+        for team_id in synthetic.team_ids(league_id):
+            statistics = synthetic.team_statistics(league_id, season, team_id, seed=seed)
+            db_instance.update_team_statistics(
+                league_id, season, team_id, organize_team_statistics(statistics["response"]))
+
+        asyncio.run(rebuild_match_details(league_id, season))
+
+    os.makedirs(os.path.dirname(leagues_file), exist_ok=True)
+    with open(leagues_file, "w") as file:
+        json.dump({"current_season": season, "leagues": league_list}, file)
+
+    return {
+        "leagues": leagues,
+        "fixtures": total_fixtures,
+        "matches_per_day": matches_per_day,
+        "team_stats": leagues * synthetic.TEAMS_PER_LEAGUE,
+        "leagues_file": leagues_file,
+        "elapsed_s": time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leagues", type=int, default=4, help="Entre 4 e 500 ligas")
+    parser.add_argument("--fixtures", type=int, default=40, help="Total aproximado de jogos (até 100k)")
+    parser.add_argument("--season", type=int, default=2023)
+    parser.add_argument("--first-league-id", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--leagues-file", default=DEFAULT_LEAGUES_FILE)
+    parser.add_argument("--drop", action="store_true",
+                        help="Apaga as coleções de ligas, jogos e estatísticas antes de popular")
+    args = parser.parse_args()
+
+    if not 4 <= args.leagues <= 500:
+        parser.error("--leagues deve estar entre 4 e 500")
+    if not 1 <= args.fixtures <= 100_000:
+        parser.error("--fixtures deve estar entre 1 e 100000")
+
+    print(json.dumps(populate(args.leagues, args.fixtures, season=args.season,
+                              first_league_id=args.first_league_id, seed=args.seed,
+                              drop=args.drop, leagues_file=args.leagues_file), indent=2))
+
+
+if __name__ == "__main__":
+    main()
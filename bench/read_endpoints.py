@@ -0,0 +1,245 @@
+"""
+Benchmark dos endpoints de leitura em escala realista e 10x.
+
+Popula (opcionalmente) um MongoDB local com dados sintéticos e mede, para cada endpoint
+de leitura, percentis de latência, vazão com requisições concorrentes e comandos enviados
+ao MongoDB por requisição. A aplicação roda no próprio processo (ASGI), sem o agendador.
+
+Cada endpoint é medido a frio (cache de respostas esvaziado antes de cada requisição, o
+que mede o cálculo da resposta) e a quente (respostas servidas do cache); ``--cache``
+restringe a um dos modos.
+
+Uso:
+    python -m bench.read_endpoints --scale realistic --populate --save-baseline realistic
+    python -m bench.read_endpoints --scale 10x --populate --compare 10x
+    python -m bench.read_endpoints --leagues 500 --fixtures 100000 --populate
+    python -m bench.read_endpoints --cache cold --endpoints confrontos-filtrados
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import httpx
+from pymongo import monitoring
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+CACHE_MODES = ("cold", "warm")
+
+SCALES = {
+    "realistic": {"leagues": 4, "fixtures": 40},
+    "10x": {"leagues": 40, "fixtures": 400},
+}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """
+    Conta os comandos enviados ao MongoDB (idas e voltas ao banco).
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def use_leagues_file(leagues_file: str):
+    # O registro de ligas da aplicação lê o arquivo de LEAGUES_FILE na importação dos serviços
+    os.environ["LEAGUES_FILE"] = leagues_file
+
+
+async def measure(client: httpx.AsyncClient, counter: CommandCounter, method: str,
+                  paths: list, requests: int, concurrency: int, json_body=None,
+                  before_request=None) -> dict:
+    # Aquecimento, fora das medições
+    await client.request(method, paths[0], json=json_body)
+
+    latencies = []
+    commands_before = counter.count
+    for index in range(requests):
+        if before_request is not None:
+            before_request()
+        started = time.perf_counter()
+        response = await client.request(method, paths[index % len(paths)], json=json_body)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    commands = counter.count - commands_before
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with semaphore:
+            if before_request is not None:
+                before_request()
+            await client.request(method, paths[index % len(paths)], json=json_body)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": statistics.mean(latencies),
+        "throughput_rps": requests / elapsed if elapsed else 0,
+        "concurrency": concurrency,
+        "mongo_commands_per_request": commands / requests,
+    }
+
+
+async def run(args, counter: CommandCounter) -> dict:
+    from app.main import app
+    from app.services import db_instance, league_registry, response_cache
+
+    leagues = league_registry.leagues()
+    season = league_registry.current_season
+
+    fixture_ids = [fixture["_id"] for fixture in db_instance.fixtures_collection.find(
+        {"season": season}, {"_id": 1}).limit(1000)]
+    rng = random.Random(0)
+    sample_ids = rng.sample(fixture_ids, min(len(fixture_ids), 50))
+
+    endpoints = {
+        "weekly-quartile-matches": ("GET", ["/weekly-quartile-matches/"], None),
+        "weekly-quartile-matches-ndjson": ("GET", ["/weekly-quartile-matches/?formato=ndjson"], None),
+        "today-quartile-matches": ("GET", [
+            f"/today-quartile-matches/{league['league_id']}/{league['season']}"
+            for league in leagues], None),
+        "confrontos-filtrados": ("GET", [
+            f"/confrontos-filtrados?season={season}&cartoes_min_por_time=2.5&cartoes_media_somada=4"],
+            None),
+        "confrontos-filtrados-ndjson": ("GET", [
+            f"/confrontos-filtrados?season={season}&filtros=yellow_card_avg:soma:>:4&formato=ndjson"],
+            None),
+        "confrontos-filtrados-multi": ("GET", [
+            f"/confrontos-filtrados?season={season}&filtros=yellow_card_avg:soma:>:4"
+            "&filtros=goals_for_avg:algum:>=:1.5&filtros=win_percentage_home:ambos:<:60"], None),
+        "get-detailed-match-data": ("GET", [
+            f"/get-detailed-match-data/{match_id}" for match_id in sample_ids], None),
+        "detailed-match-data-batch": ("POST", ["/detailed-match-data/batch"],
+                                      {"match_ids": sample_ids}),
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        for name, (method, paths, body) in endpoints.items():
+            if args.endpoints and name not in args.endpoints:
+                continue
+            results[name] = {}
+            for mode in args.cache:
+                # A frio, só o cache de respostas é esvaziado: classificações e arrays de
+                # triagem continuam em memória, como em um worker já em uso
+                before_request = response_cache.bump if mode == "cold" else None
+                results[name][mode] = await measure(
+                    client, counter, method, paths, args.requests, args.concurrency,
+                    json_body=body, before_request=before_request)
+
+    return {
+        "leagues": len(leagues),
+        "fixtures": db_instance.fixtures_collection.count_documents({"season": season}),
+        "endpoints": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Lista as regressões em relação a uma baseline: latência p90 acima da tolerância
+    ou mais comandos ao MongoDB por requisição.
+    """
+    regressions = []
+    for name, modes in results["endpoints"].items():
+        for mode, current in modes.items():
+            previous = baseline["endpoints"].get(name, {}).get(mode)
+            if previous is None:
+                continue
+            if current["p90_ms"] > previous["p90_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name} ({mode}): p90 {previous['p90_ms']:.1f}ms -> {current['p90_ms']:.1f}ms")
+            if current["mongo_commands_per_request"] > previous["mongo_commands_per_request"]:
+                regressions.append(
+                    f"{name} ({mode}): comandos/req {previous['mongo_commands_per_request']:.1f} -> "
+                    f"{current['mongo_commands_per_request']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="realistic")
+    parser.add_argument("--leagues", type=int, help="Sobrescreve o número de ligas da escala")
+    parser.add_argument("--fixtures", type=int, help="Sobrescreve o número de jogos da escala")
+    parser.add_argument("--populate", action="store_true",
+                        help="Apaga e popula o banco com dados sintéticos antes de medir")
+    parser.add_argument("--leagues-file", default=None)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--endpoints", nargs="*", help="Mede apenas estes endpoints")
+    parser.add_argument("--cache", choices=CACHE_MODES, action="append",
+                        help="Mede só a frio (cold) ou só a quente (warm); padrão: os dois")
+    parser.add_argument("--save-baseline", metavar="NOME")
+    parser.add_argument("--compare", metavar="NOME")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Aumento de latência p90 tolerado na comparação (fração)")
+    args = parser.parse_args()
+    args.cache = args.cache or list(CACHE_MODES)
+
+    sys.path.insert(0, REPO_ROOT)
+    from bench import populate
+
+    # O listener precisa ser registrado antes de o cliente do MongoDB ser criado
+    counter = CommandCounter()
+    monitoring.register(counter)
+
+    scale = dict(SCALES[args.scale])
+    scale["leagues"] = args.leagues or scale["leagues"]
+    scale["fixtures"] = args.fixtures or scale["fixtures"]
+    args.leagues_file = os.path.abspath(args.leagues_file or populate.DEFAULT_LEAGUES_FILE)
+
+    use_leagues_file(args.leagues_file)
+    if args.populate:
+        report = populate.populate(scale["leagues"], scale["fixtures"], drop=True,
+                                   leagues_file=args.leagues_file)
+        print(f"Banco populado: {report}", file=sys.stderr)
+
+    results = asyncio.run(run(args, counter))
+    results["scale"] = args.scale
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        with open(os.path.join(BASELINES_DIR, f"{args.save_baseline}.json"), "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(os.path.join(BASELINES_DIR, f"{args.compare}.json")) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Gerador determinístico de payloads no formato da API-Football.
+
+Os mesmos parâmetros geram sempre os mesmos times, classificações, jogos e estatísticas,
+para qualquer ID de liga. É usado pelo servidor substituto e pelos benchmarks.
+"""
+import datetime
+import random
+
+TEAMS_PER_LEAGUE = 20
+SEASON_START = datetime.date(2023, 1, 1)
+FINISHED = {"long": "Match Finished", "short": "FT", "elapsed": 90}
+NOT_STARTED = {"long": "Not Started", "short": "NS", "elapsed": None}
+CARD_INTERVALS = ["0-15", "16-30", "31-45", "46-60", "61-75", "76-90", "91-105", "106-120"]
+
+
+def team_ids(league_id: int, teams: int = TEAMS_PER_LEAGUE) -> list:
+    return [league_id * 1000 + index for index in range(1, teams + 1)]
+
+
+def _team(team_id: int) -> dict:
+    return {
+        "id": team_id,
+        "name": f"Time {team_id}",
+        "logo": f"https://media.api-sports.io/football/teams/{team_id}.png",
+    }
+
+
+def _league(league_id: int, season: int) -> dict:
+    return {
+        "id": league_id,
+        "name": f"Liga {league_id}",
+        "country": "Synthetic",
+        "logo": f"https://media.api-sports.io/football/leagues/{league_id}.png",
+        "flag": None,
+        "season": season,
+    }
+
+
+def standings(league_id: int, season: int, seed: int = 0, teams: int = TEAMS_PER_LEAGUE) -> dict:
+    rng = random.Random(f"{seed}-standings-{league_id}-{season}")
+    ids = team_ids(league_id, teams)
+    rng.shuffle(ids)
+
+    table = []
+    for rank, team_id in enumerate(ids, start=1):
+        table.append({
+            "rank": rank,
+            "team": _team(team_id),
+            "points": (teams - rank) * 3 + rng.randint(0, 2),
+            "goalsDiff": (teams // 2 - rank) * 2 + rng.randint(-3, 3),
+            "form": "".join(rng.choice("WDL") for _ in range(5)),
+        })
+
+    league = _league(league_id, season)
+    league["standings"] = [table]
+    return {"get": "standings", "errors": [], "results": 1, "response": [{"league": league}]}
+
+
+def _round_pairs(ids: list, round_number: int) -> list:
+    # Método do círculo: cada rodada emparelha todos os times uma vez
+    rotation = round_number % (len(ids) - 1)
+    rotated = [ids[0]] + ids[1:][rotation:] + ids[1:][:rotation]
+    half = len(rotated) // 2
+    pairs = list(zip(rotated[:half], reversed(rotated[half:])))
+    return [(away, home) if round_number % 2 else (home, away) for home, away in pairs]
+
+
+def fixtures_for_date(league_id: int, season: int, date: datetime.date,
+                      matches_per_day: int = 5, seed: int = 0,
+                      teams: int = TEAMS_PER_LEAGUE, now: datetime.datetime = None) -> list:
+    """
+    Jogos sintéticos de uma liga em uma data: uma rodada por semana, dividida entre
+    sábado e domingo (ou ``matches_per_day`` jogos todos os dias, se maior que 5,
+    até 99 por dia).
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    day_index = (date - SEASON_START).days
+    # Rodadas de segunda a domingo, para sábado e domingo caírem na mesma rodada
+    round_number = (day_index + SEASON_START.weekday()) // 7
+
+    if matches_per_day <= 5:
+        if date.weekday() not in (5, 6):
+            return []
+        pairs = _round_pairs(team_ids(league_id, teams), round_number)
+        offset = 0 if date.weekday() == 5 else len(pairs) // 2
+        pairs = pairs[offset:offset + len(pairs) // 2][:matches_per_day]
+    else:
+        pairs = _round_pairs(team_ids(league_id, teams), day_index)
+        pairs = (pairs * (matches_per_day // len(pairs) + 1))[:matches_per_day]
+
+    rng = random.Random(f"{seed}-fixtures-{league_id}-{season}-{day_index}")
+    league = _league(league_id, season)
+    matches = []
+    for slot, (home_id, away_id) in enumerate(pairs):
+        kickoff = datetime.datetime.combine(
+            date, datetime.time(12 + (slot % 8), 0), tzinfo=datetime.timezone.utc)
+        finished = kickoff + datetime.timedelta(hours=2) < now
+        home_goals = rng.randint(0, 4) if finished else None
+        away_goals = rng.randint(0, 3) if finished else None
+        matches.append({
+            "fixture": {
+                "id": league_id * 10_000_000 + max(day_index, 0) * 100 + slot,
+                "referee": f"Árbitro {rng.randint(1, 40)}",
+                "timezone": "UTC",
+                "date": kickoff.isoformat(),
+                "timestamp": int(kickoff.timestamp()),
+                "venue": {"id": home_id, "name": f"Estádio {home_id}", "city": "Synthetic"},
+                "status": dict(FINISHED if finished else NOT_STARTED),
+            },
+            "league": league,
+            "teams": {
+                "home": {**_team(home_id), "winner": None},
+                "away": {**_team(away_id), "winner": None},
+            },
+            "goals": {"home": home_goals, "away": away_goals},
+        })
+
+    return matches
+
+
+def fixtures(league_id: int, season: int, start: datetime.date, end: datetime.date,
+             matches_per_day: int = 5, seed: int = 0, teams: int = TEAMS_PER_LEAGUE) -> dict:
+    matches = []
+    day = start
+    while day <= end:
+        matches.extend(fixtures_for_date(
+            league_id, season, day, matches_per_day=matches_per_day, seed=seed, teams=teams))
+        day += datetime.timedelta(days=1)
+
+    return {"get": "fixtures", "errors": [], "results": len(matches), "response": matches}
+
+
+def team_statistics(league_id: int, season: int, team_id: int, seed: int = 0) -> dict:
+    rng = random.Random(f"{seed}-statistics-{league_id}-{season}-{team_id}")
+    played_home = rng.randint(8, 19)
+    played_away = rng.randint(8, 19)
+    wins_home = rng.randint(0, played_home)
+    wins_away = rng.randint(0, played_away)
+    goals_for_home = rng.randint(played_home // 2, played_home * 3)
+    goals_for_away = rng.randint(played_away // 3, played_away * 2)
+    goals_against = rng.randint(played_home, (played_home + played_away) * 2)
+
+    def cards(maximum: int) -> dict:
+        totals = {interval: rng.randint(0, maximum) for interval in CARD_INTERVALS}
+        return {interval: {"total": total or None, "percentage": None}
+                for interval, total in totals.items()}
+
+    response = {
+        "league": _league(league_id, season),
+        "team": _team(team_id),
+        "form": "".join(rng.choice("WDL") for _ in range(played_home + played_away)),
+        "fixtures": {
+            "played": {"home": played_home, "away": played_away, "total": played_home + played_away},
+            "wins": {"home": wins_home, "away": wins_away, "total": wins_home + wins_away},
+        },
+        "goals": {
+            "for": {
+                "total": {"home": goals_for_home, "away": goals_for_away,
+                          "total": goals_for_home + goals_for_away},
+                "average": {"home": f"{goals_for_home / played_home:.1f}",
+                            "away": f"{goals_for_away / played_away:.1f}"},
+            },
+            "against": {"total": {"home": None, "away": None, "total": goals_against}},
+        },
+        "clean_sheet": {"home": rng.randint(0, played_home), "away": rng.randint(0, played_away)},
+        "cards": {"yellow": cards(12), "red": cards(1)},
+    }
+
+    return {"get": "teams/statistics", "errors": [], "results": 11, "response": response}
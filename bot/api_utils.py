@@ -1,16 +1,104 @@
+import asyncio
+import time
+from collections import OrderedDict
+from os import getenv
+
 import httpx
 
+API_BASE_URL = getenv("API_BASE_URL", "http://127.0.0.1:8000")
+
+# Tempo (em segundos) em que uma resposta da API é reaproveitada, por comando
+CACHE_TTL = {
+    "match_data": float(getenv("BOT_CACHE_TTL_MATCH_DATA", 300)),
+    "filtered_matches": float(getenv("BOT_CACHE_TTL_FILTERED_MATCHES", 60)),
+    "quartile_matches": float(getenv("BOT_CACHE_TTL_QUARTILE_MATCHES", 60)),
+}
+CACHE_MAX_ENTRIES = 1024
+
+_client = None
+# Chave (comando, caminho, parâmetros) -> (expira_em, etag, dados), da menos para a mais
+# recentemente usada
+_cache = OrderedDict()
+# Chave -> requisição em andamento, compartilhada por quem pedir o mesmo dado
+_in_flight = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Cliente HTTP compartilhado, com pool de conexões, usado durante toda a vida do bot."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=API_BASE_URL, timeout=30,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+    return _client
+
+
+async def close_client(*args) -> None:
+    """Fecha o cliente compartilhado (usado no encerramento do bot)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _prune_cache() -> None:
+    """
+    Abre espaço no cache: descarta as entradas expiradas e, se ainda estiver cheio,
+    as usadas há mais tempo.
+    """
+    now = time.monotonic()
+    for key in [key for key, (expires_at, _, _) in _cache.items() if expires_at <= now]:
+        del _cache[key]
+    while len(_cache) >= CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+async def _fetch(key, path, params):
+    cached = _cache.get(key)
+    headers = {}
+    if cached is not None and cached[1]:
+        # Resposta expirada com ETag: a API responde 304 se nada mudou
+        headers["If-None-Match"] = cached[1]
+
+    response = await get_client().get(path, params=params, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        etag, data = cached[1], cached[2]
+    else:
+        response.raise_for_status()  # Lança uma exceção se a resposta indicar um erro HTTP
+        etag, data = response.headers.get("ETag"), response.json()
+
+    _cache.pop(key, None)
+    if len(_cache) >= CACHE_MAX_ENTRIES:
+        _prune_cache()
+    _cache[key] = (time.monotonic() + CACHE_TTL[key[0]], etag, data)
+    return data
+
+
+async def _get(command, path, params=None):
+    """
+    Obtém um dado da API, reaproveitando respostas recentes do mesmo comando e parâmetros
+    e juntando pedidos simultâneos iguais em uma única chamada.
+    """
+    key = (command, path, tuple(sorted((params or {}).items())))
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        _cache.move_to_end(key)
+        return cached[2]
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(key, path, params))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    # shield: se quem esperava for cancelado, a chamada continua para os demais
+    return await asyncio.shield(task)
+
+
 async def get_match_data(match_id):
     """Função para obter dados da API usando o ID da partida."""
-    api_url = f"http://127.0.0.1:8000/get-detailed-match-data/{match_id}"
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url)
-            response.raise_for_status()  # Lança uma exceção se a resposta indicar um erro HTTP
-
-        match_data = response.json()
-        return match_data
+        return await _get("match_data", f"/get-detailed-match-data/{match_id}")
     except Exception as e:
         print(f"Erro ao obter dados da API: {e}")
         raise  # Re-levanta a exceção para que o chamador saiba que houve um erro
@@ -18,15 +106,14 @@ async def get_match_data(match_id):
 
 async def get_filtered_matches(cartoes_min_med, cartoes_med_somada):
     """Função para obter dados das partidas filtradas na API usando parametros de media de um dos times e media somada de cartões."""
-    api_url = f"http://127.0.0.1:8000/confrontos-filtrados?season=2023&cartoes_min_por_time={cartoes_min_med}&cartoes_media_somada={cartoes_med_somada}"
+    # Sem "season", a API usa a temporada atual do registro de ligas
+    params = {
+        "cartoes_min_por_time": cartoes_min_med,
+        "cartoes_media_somada": cartoes_med_somada,
+    }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url)
-            response.raise_for_status()  # Lança uma exceção se a resposta indicar um erro HTTP
-            
-        match_data = response.json()
-        return match_data
+        return await _get("filtered_matches", "/confrontos-filtrados", params)
     except Exception as e:
         print(f"Erro ao obter dados da API: {e}")
         raise  # Re-levanta a exceção para que o chamador saiba que houve um erro
@@ -34,16 +121,8 @@ async def get_filtered_matches(cartoes_min_med, cartoes_med_somada):
 
 async def get_quartile_matches():
     """Função para obter dados das partidas da semana de primeiros colocados vs ultimos colocados na API."""
-    api_url = f"http://127.0.0.1:8000/weekly-quartile-matches/"
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url)
-            response.raise_for_status()  # Lança uma exceção se a resposta indicar um erro HTTP
-
-        match_data = response.json()
-        return match_data
+        return await _get("quartile_matches", "/weekly-quartile-matches/")
     except Exception as e:
         print(f"Erro ao obter dados da API: {e}")
         raise  # Re-levanta a exceção para que o chamador saiba que houve um erro
-
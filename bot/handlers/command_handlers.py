@@ -96,11 +96,15 @@ def format_match_data(match_data):
     home_team_name = home_team.get("team_name", "N/A")
     away_team_name = away_team.get("team_name", "N/A")
 
-    home_goals_for = home_team["statistics"].get("total_goals_for", "N/A")
-    away_goals_for = away_team["statistics"].get("total_goals_for", "N/A")
+    # Times ainda sem estatísticas ingeridas vêm com "statistics": null
+    home_statistics = home_team.get("statistics") or {}
+    away_statistics = away_team.get("statistics") or {}
 
-    home_win_percentage = home_team["statistics"].get("win_percentage_home", "N/A")
-    away_win_percentage = away_team["statistics"].get("win_percentage_away", "N/A")
+    home_goals_for = home_statistics.get("total_goals_for", "N/A")
+    away_goals_for = away_statistics.get("total_goals_for", "N/A")
+
+    home_win_percentage = home_statistics.get("win_percentage_home", "N/A")
+    away_win_percentage = away_statistics.get("win_percentage_away", "N/A")
 
     home_team_rank = home_team.get("team_rank")
     away_team_rank = away_team.get("team_rank")
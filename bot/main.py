@@ -1,17 +1,21 @@
 import logging
-from telegram import Update, ReplyKeyboardMarkup
-from telegram.ext import Application, CallbackContext, CommandHandler, MessageHandler, filters
-from handlers.command_handlers import handle_get_match_data, handle_quartil, handle_filtered_matches
 from dotenv import load_dotenv
 from os import getenv
 
+# Carregado antes dos módulos do bot, que leem as configurações do .env na importação
 load_dotenv()
 
+from telegram import Update, ReplyKeyboardMarkup
+from telegram.ext import Application, CallbackContext, CommandHandler, MessageHandler, filters
+from handlers.command_handlers import handle_get_match_data, handle_quartil, handle_filtered_matches
+from api_utils import close_client
+
 token = getenv("TOKEN")
 
 # Configuração do logging
 logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
-application = Application.builder().token(token).build()
+# O cliente HTTP da API é compartilhado durante toda a execução e fechado no encerramento
+application = Application.builder().token(token).post_shutdown(close_client).build()
 
 # Adição dos manipuladores de comando
 application.add_handler(CommandHandler("getmatchdata", handle_get_match_data, has_args=True))
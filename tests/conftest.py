@@ -0,0 +1,26 @@
+import mongomock
+import pytest
+
+from app import db as db_module
+from app.db import AsyncMongoDB, MongoDB
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """
+    ``MongoDB`` da aplicação sobre um servidor em memória (mongomock), vazio a cada teste.
+    """
+    monkeypatch.setattr(db_module, "MongoClient", mongomock.MongoClient)
+    monkeypatch.setenv("DB_NAME", "test")
+    monkeypatch.setenv("COLLECTION_NAME", "leagues")
+    return MongoDB()
+
+
+@pytest.fixture
+def async_db(mongo_db):
+    """
+    ``AsyncMongoDB`` sobre o mesmo banco de ``mongo_db``.
+    """
+    database = AsyncMongoDB(mongo_db)
+    yield database
+    database.shutdown()
@@ -0,0 +1,102 @@
+import datetime
+
+from app.adaptive_scheduler import POST_MATCH, PRE_KICKOFF, AdaptiveRefreshPlanner
+
+SEASON = 2023
+# 07:00 em São Paulo: todas as ações do teste caem no mesmo dia local
+NOW = datetime.datetime(2023, 3, 4, 10, tzinfo=datetime.timezone.utc)
+
+
+def at(hour: int, minute: int = 0) -> datetime.datetime:
+    return NOW.replace(hour=hour, minute=minute)
+
+
+def fixture(fixture_id: int, kickoff: datetime.datetime, league_id: int = 39,
+            status: str = "NS") -> tuple:
+    return league_id, {
+        "fixture": {"id": fixture_id, "timestamp": int(kickoff.timestamp()),
+                    "status": {"short": status}},
+        "teams": {"home": {"id": fixture_id * 2}, "away": {"id": fixture_id * 2 + 1}},
+    }
+
+
+def leagues(*league_ids, priorities: dict = None) -> list:
+    priorities = priorities or {}
+    return [{"league_id": league_id, "season": SEASON, "priority": priorities.get(league_id, 1)}
+            for league_id in league_ids]
+
+
+def plan(db, fixtures: list, league_list: list = None, budget: int = 100, **kwargs):
+    for league_id, match in fixtures:
+        db.sync_fixtures(league_id, SEASON, [match])
+    planner = AdaptiveRefreshPlanner(db, daily_budget=budget)
+    return planner.plan(league_list or leagues(39), now=NOW, **kwargs)
+
+
+def summary(schedule) -> list:
+    return [(refresh.kind, refresh.run_at, refresh.fixture_ids, refresh.status)
+            for refresh in schedule.refreshes]
+
+
+def test_refreshes_around_a_kickoff(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(15))])
+
+    assert summary(schedule) == [
+        (PRE_KICKOFF, at(14), [1], "scheduled"),
+        (PRE_KICKOFF, at(14, 45), [1], "scheduled"),
+        (POST_MATCH, at(17, 15), [1], "scheduled"),
+    ]
+    assert [refresh.cost for refresh in schedule.refreshes] == [1, 1, 4]
+
+
+def test_past_actions_are_not_planned(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(10, 30))])
+
+    assert [(refresh.kind, refresh.run_at) for refresh in schedule.refreshes] == [
+        (PRE_KICKOFF, at(10, 15)), (POST_MATCH, at(12, 45))]
+
+
+def test_close_fixtures_are_coalesced(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(15)), fixture(2, at(15, 20))])
+
+    assert summary(schedule) == [
+        (PRE_KICKOFF, at(14), [1, 2], "scheduled"),
+        (PRE_KICKOFF, at(14, 45), [1, 2], "scheduled"),
+        # Depois do fim do último jogo do grupo
+        (POST_MATCH, at(17, 35), [1, 2], "scheduled"),
+    ]
+    assert schedule.refreshes[-1].cost == 6
+
+
+def test_skipped_statuses_and_idle_leagues(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(15), status="PST"), fixture(2, at(16), league_id=61)],
+                    leagues(39, 61, 140))
+
+    assert {refresh.league_id for refresh in schedule.refreshes} == {61}
+    assert schedule.idle_leagues == [(39, SEASON), (140, SEASON)]
+
+
+def test_budget_keeps_post_match_first(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(15))], budget=4)
+
+    assert [(refresh.kind, refresh.status) for refresh in schedule.refreshes] == [
+        (PRE_KICKOFF, "skipped_budget"), (PRE_KICKOFF, "skipped_budget"),
+        (POST_MATCH, "scheduled")]
+
+
+def test_spent_and_remaining_quota_reduce_the_budget(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(15))], budget=100, spent_today=0, quota_remaining=3)
+
+    # O pós-jogo (4) não cabe; T-15 vem antes de T-60
+    assert [(refresh.run_at, refresh.status) for refresh in schedule.refreshes] == [
+        (at(14), "scheduled"), (at(14, 45), "scheduled"), (at(17, 15), "skipped_budget")]
+    assert schedule.budget["remaining"] == {"2023-03-04": 1}
+
+
+def test_league_priority_breaks_ties(mongo_db):
+    schedule = plan(mongo_db, [fixture(1, at(15), league_id=39), fixture(2, at(15), league_id=61)],
+                    leagues(39, 61, priorities={39: 2, 61: 0}), budget=4)
+
+    post = {refresh.league_id: refresh.status for refresh in schedule.refreshes
+            if refresh.kind == POST_MATCH}
+    assert post == {61: "scheduled", 39: "skipped_budget"}
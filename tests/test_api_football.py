@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+
+from app.api_football import APIFootballClient
+from app.http_cache import HTTPCache
+from app.ratelimit_mecanism import FileQuotaStore, QuotaManager
+
+ETAG = '"v1"'
+BODY = b'{"errors": [], "response": [{"league": {"id": 39}}]}'
+
+
+def client(tmp_path, requests: list) -> APIFootballClient:
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers={"ETag": ETAG})
+        return httpx.Response(200, content=BODY, headers={"ETag": ETAG})
+
+    quota = QuotaManager(FileQuotaStore(str(tmp_path / "quota.json")), capacity=100)
+    api = APIFootballClient("key", quota, base_url="http://api",
+                            cache=HTTPCache(str(tmp_path / "cache"), max_bytes=1024 * 1024))
+    api._client = httpx.AsyncClient(base_url="http://api", transport=httpx.MockTransport(handler))
+    api._semaphore = asyncio.Semaphore(1)
+    return api
+
+
+def test_force_skips_a_fresh_entry_but_revalidates(tmp_path):
+    requests = []
+    api = client(tmp_path, requests)
+    params = {"league": 39, "season": 2023}
+
+    async def scenario():
+        first = await api.get("/v3/standings", params)
+        cached = await api.get("/v3/standings", params)
+        forced = await api.get("/v3/standings", params, force=True)
+        return first, cached, forced
+
+    first, cached, forced = asyncio.run(scenario())
+
+    assert first == cached == forced
+    assert len(requests) == 2
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == ETAG
+    assert api.cache.stats()["revalidations"] == 1
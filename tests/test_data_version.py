@@ -0,0 +1,47 @@
+import asyncio
+
+from app.data_version import SharedDataVersion
+
+
+class Worker:
+    def __init__(self, db, check_interval=0.0):
+        self.discarded = 0
+        self.version = SharedDataVersion(db, self.discard, check_interval)
+
+    def discard(self):
+        self.discarded += 1
+
+
+def test_other_workers_see_a_bump(async_db):
+    ingestion, reader = Worker(async_db), Worker(async_db)
+    asyncio.run(ingestion.version.check())
+    asyncio.run(reader.version.check())
+    assert reader.discarded == 1  # primeira leitura
+
+    asyncio.run(ingestion.version.bump())
+    assert ingestion.discarded == 1  # o próprio incremento não descarta de novo
+
+    asyncio.run(reader.version.check())
+    assert reader.discarded == 2
+    asyncio.run(reader.version.check())
+    assert reader.discarded == 2
+
+
+def test_bump_after_an_unseen_bump_discards(async_db):
+    first, second = Worker(async_db), Worker(async_db)
+    asyncio.run(first.version.check())
+    asyncio.run(second.version.bump())
+    asyncio.run(first.version.bump())
+
+    assert first.discarded == 2
+    assert first.version.version == 2
+
+
+def test_reads_are_throttled(mongo_db, async_db):
+    worker = Worker(async_db, check_interval=60.0)
+    asyncio.run(worker.version.check())
+    mongo_db.increment_data_version()
+    asyncio.run(worker.version.check())
+
+    assert worker.version.stats()["checks"] == 1
+    assert worker.discarded == 1
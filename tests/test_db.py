@@ -0,0 +1,27 @@
+import datetime
+
+
+def test_team_stats_are_read_from_the_requested_league(mongo_db):
+    # Time que joga a liga nacional e uma copa continental na mesma temporada
+    mongo_db.update_team_statistics(39, 2023, 50, {"yellow_card_avg": 2.0})
+    mongo_db.update_team_statistics(2, 2023, 50, {"yellow_card_avg": 3.5})
+    mongo_db.update_team_statistics(39, 2022, 50, {"yellow_card_avg": 1.0})
+    mongo_db.update_team_statistics(2, 2023, 51, {"yellow_card_avg": 1.5})
+
+    assert mongo_db.get_team_stats_many(39, 2023, [50, 51]) == {50: {"yellow_card_avg": 2.0}}
+    assert mongo_db.get_team_stats_many(2, 2023, [50, 51, 50]) == {
+        50: {"yellow_card_avg": 3.5}, 51: {"yellow_card_avg": 1.5}}
+    assert mongo_db.get_team_stats_many(39, 2023, []) == {}
+
+
+def test_today_quartile_matches_are_not_started(mongo_db):
+    start, _ = mongo_db.today_range()
+    for match_id, status, quartile in [(1, "NS", True), (2, "FT", True), (3, "1H", True),
+                                       (4, "NS", False)]:
+        mongo_db.match_details_collection.insert_one({
+            "_id": match_id, "league_id": 39, "season": 2023, "status": status,
+            "date": start + datetime.timedelta(hours=match_id), "quartile": quartile,
+            "detail": {"fixture": {"id": match_id}},
+        })
+
+    assert mongo_db.get_today_quartile_matches(39, 2023) == [{"fixture": {"id": 1}}]
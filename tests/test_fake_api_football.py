@@ -0,0 +1,53 @@
+import datetime
+import json
+
+from app.db import MongoDB
+from app.fetch_planner import FixtureFetchPlanner
+from bench.fake_api_football import StandInConfig, synthetic_payload
+
+SEASON = 2023
+LEAGUE_IDS = (39, 61, 140)
+SATURDAY = "2023-03-04"
+
+
+def config(tmp_path) -> StandInConfig:
+    leagues_file = tmp_path / "leagues.json"
+    leagues_file.write_text(json.dumps({
+        "current_season": SEASON,
+        "leagues": [{"league_id": league_id} for league_id in LEAGUE_IDS],
+    }))
+    return StandInConfig(leagues_file=str(leagues_file))
+
+
+def matches_by_league(payload: dict) -> dict:
+    # Agrupa como services._execute_fetch_call faz nas chamadas só por data
+    matches = {}
+    for match in payload["response"]:
+        key = (match["league"]["id"], match["league"]["season"])
+        matches.setdefault(key, []).append({"fixture": match["fixture"], "teams": match["teams"]})
+    return matches
+
+
+def test_date_only_call_keeps_what_per_league_calls_stored(tmp_path, mongo_db):
+    stand_in = config(tmp_path)
+    window = MongoDB.date_window(SATURDAY, SATURDAY)
+    for league_id in LEAGUE_IDS:
+        payload = synthetic_payload("/v3/fixtures", {
+            "league": league_id, "season": SEASON, "from": SATURDAY, "to": SATURDAY}, stand_in)
+        counts = mongo_db.sync_fixtures(
+            league_id, SEASON, matches_by_league(payload)[(league_id, SEASON)], window)
+        assert counts["inserted"]
+
+    leagues = [{"league_id": league_id, "season": SEASON} for league_id in LEAGUE_IDS]
+    plan = FixtureFetchPlanner(mongo_db, datetime.timedelta(hours=6)).plan_range(
+        leagues, SATURDAY, SATURDAY)
+    [call] = plan.calls
+    assert not call.per_league
+
+    returned = matches_by_league(synthetic_payload("/v3/fixtures", call.params, stand_in))
+    for league_id, season in call.leagues:
+        counts = mongo_db.sync_fixtures(
+            league_id, season, returned.get((league_id, season), []), call.window)
+        # sync_fixtures remove da janela os jogos guardados que não vieram na resposta
+        assert counts["removed"] == 0
+        assert counts["inserted"] == counts["modified"] == 0
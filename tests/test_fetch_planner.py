@@ -0,0 +1,109 @@
+import datetime
+
+from app.db import LOCAL_TIMEZONE, MongoDB
+from app.fetch_planner import FixtureFetchPlanner
+
+SEASON = 2023
+TTL = datetime.timedelta(hours=6)
+NOW = datetime.datetime(2023, 3, 6, 12, tzinfo=datetime.timezone.utc)
+DAY = datetime.timedelta(days=1)
+
+
+def day(iso: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(iso).replace(tzinfo=datetime.timezone.utc)
+
+
+def leagues(*league_ids) -> list:
+    return [{"league_id": league_id, "season": SEASON} for league_id in league_ids]
+
+
+def planner(db, windows: dict = None) -> FixtureFetchPlanner:
+    for league_id, window in (windows or {}).items():
+        db.update_league_data(league_id, SEASON, {"week_window": window})
+    return FixtureFetchPlanner(db, TTL)
+
+
+def covered_days(plan, key) -> set:
+    days = set()
+    for call in plan.calls:
+        if key in call.leagues:
+            current = call.window["from"]
+            while current < call.window["to"]:
+                days.add(current)
+                current += DAY
+    return days
+
+
+def test_many_leagues_use_one_date_call_per_day(mongo_db):
+    plan = planner(mongo_db).plan_range(leagues(39, 61, 140), "2023-03-06", "2023-03-07", now=NOW)
+
+    assert [call.params for call in plan.calls] == [{"date": "2023-03-06"}, {"date": "2023-03-07"}]
+    assert plan.quota_cost == 2
+    assert plan.report()["api_calls_saved"] == 1
+    for key in plan.leagues:
+        assert covered_days(plan, key) == {day("2023-03-06"), day("2023-03-07")}
+
+
+def test_few_leagues_use_one_call_per_league(mongo_db):
+    plan = planner(mongo_db).plan_range(leagues(39), "2023-03-06", "2023-03-12", now=NOW)
+
+    [call] = plan.calls
+    assert call.params == {"league": 39, "season": SEASON, "from": "2023-03-06", "to": "2023-03-12"}
+    assert call.window == {"from": day("2023-03-06"), "to": day("2023-03-13")}
+
+
+def test_fresh_window_is_served_locally(mongo_db):
+    windows = {39: {"from": day("2023-03-06"), "to": day("2023-03-13"), "synced_at": NOW - TTL / 2}}
+    plan = planner(mongo_db, windows).plan_range(leagues(39), "2023-03-06", "2023-03-12", now=NOW)
+
+    assert plan.calls == []
+    assert plan.served_locally == [(39, SEASON)]
+    assert plan.week_windows[(39, SEASON)]["synced_at"] == NOW - TTL / 2
+
+
+def test_stale_window_is_fetched_again(mongo_db):
+    windows = {39: {"from": day("2023-03-06"), "to": day("2023-03-13"),
+                    "synced_at": NOW - TTL - datetime.timedelta(minutes=1)}}
+    plan = planner(mongo_db, windows).plan_range(leagues(39), "2023-03-06", "2023-03-12", now=NOW)
+
+    assert len(plan.calls) == 1
+    assert plan.week_windows[(39, SEASON)]["synced_at"] == NOW
+
+
+def test_only_the_missing_days_are_fetched(mongo_db):
+    windows = {39: {"from": day("2023-03-06"), "to": day("2023-03-09"), "synced_at": NOW}}
+    plan = planner(mongo_db, windows).plan_range(leagues(39), "2023-03-06", "2023-03-10", now=NOW)
+
+    [call] = plan.calls
+    assert (call.params["from"], call.params["to"]) == ("2023-03-09", "2023-03-10")
+    assert covered_days(plan, (39, SEASON)) == {day("2023-03-09"), day("2023-03-10")}
+
+
+def test_gaps_on_both_sides_are_merged_into_one_call(mongo_db):
+    windows = {39: {"from": day("2023-03-07"), "to": day("2023-03-09"), "synced_at": NOW}}
+    plan = planner(mongo_db, windows).plan_range(leagues(39), "2023-03-06", "2023-03-10", now=NOW)
+
+    [call] = plan.calls
+    assert (call.params["from"], call.params["to"]) == ("2023-03-06", "2023-03-10")
+
+
+def test_today_with_many_leagues_is_a_single_date_call(mongo_db):
+    plan = planner(mongo_db).plan_today(leagues(39, 61))
+    today = datetime.datetime.now(LOCAL_TIMEZONE).date().isoformat()
+
+    [call] = plan.calls
+    assert call.params == {"date": today, "timezone": LOCAL_TIMEZONE.zone, "status": "NS"}
+    assert call.leagues == [(39, SEASON), (61, SEASON)]
+    # Sem janela: a chamada do dia só insere e atualiza, nunca remove
+    assert call.window is None
+
+
+def test_today_is_served_by_a_fresh_week_window(mongo_db):
+    start, end = MongoDB.today_range()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    windows = {39: {"from": start - DAY, "to": end + DAY, "synced_at": now}}
+    plan = planner(mongo_db, windows).plan_today(leagues(39, 61))
+
+    assert plan.served_locally == [(39, SEASON)]
+    [call] = plan.calls
+    assert call.params["league"] == 61
@@ -0,0 +1,55 @@
+import asyncio
+
+from app.jobs import JobQueue
+from app.profiling import RequestProfile, current_profile
+
+
+def test_jobs_do_not_inherit_the_request_profile():
+    queue = JobQueue()
+    seen = []
+
+    async def work(job):
+        seen.append(current_profile.get())
+
+    async def request():
+        profile = RequestProfile()
+        current_profile.set(profile)
+        result = await queue.wait(queue.submit("standings", {}, [], work))
+        return profile, result
+
+    profile, result = asyncio.run(request())
+
+    assert result["status"] == "succeeded"
+    assert seen == [None]
+    assert profile.db_commands == 0
+
+
+def run_job(leagues: list, failed: list) -> dict:
+    queue = JobQueue()
+
+    async def work(job):
+        for league in leagues:
+            if league["league_id"] in failed:
+                job.league_failed(league["league_id"], league["season"], "timeout")
+            else:
+                job.league_done(league["league_id"], league["season"])
+
+    async def submit():
+        return await queue.wait(queue.submit("standings", {}, leagues, work))
+
+    return asyncio.run(submit())
+
+
+def test_job_status_reports_failed_leagues():
+    leagues = [{"league_id": 39, "season": 2023}, {"league_id": 61, "season": 2023}]
+
+    assert run_job(leagues, [])["status"] == "succeeded"
+
+    partial = run_job(leagues, [61])
+    assert partial["status"] == "partial"
+    assert partial["failed_leagues"] == [61]
+    assert partial["progress"] == {"total": 2, "done": 1, "failed": 1}
+
+    failed = run_job(leagues, [39, 61])
+    assert failed["status"] == "failed"
+    assert failed["failed_leagues"] == [39, 61]
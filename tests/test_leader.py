@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+
+import pytest
+import pytz
+from apscheduler.triggers.cron import CronTrigger
+
+from app import leader
+from app.leader import FileLeaseStore, LeaderElection, MongoLeaseStore, last_fire_time
+
+TZ = pytz.timezone("America/Sao_Paulo")
+
+
+@pytest.fixture(params=["file", "mongo"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileLeaseStore(str(tmp_path / "lease.json"))
+    return MongoLeaseStore(request.getfixturevalue("mongo_db").db["scheduler_leases"])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(leader.time, "time", lambda: now[0])
+    return now
+
+
+def test_compare_and_set_needs_the_lease_that_was_read(store):
+    first = {"holder": "a", "expires_at": 10.0}
+    assert store.compare_and_set("scheduler", None, first)
+    assert not store.compare_and_set("scheduler", None, {"holder": "b", "expires_at": 20.0})
+    assert store.read("scheduler") == first
+
+    renewed = {"holder": "a", "expires_at": 30.0}
+    assert store.compare_and_set("scheduler", first, renewed)
+    # Quem leu o lease antes da renovação não consegue trocá-lo
+    assert not store.compare_and_set("scheduler", first, {"holder": "b", "expires_at": 40.0})
+    assert store.compare_and_set("scheduler", renewed, None)
+    assert store.read("scheduler") is None
+
+
+def test_another_worker_takes_over_when_the_lease_expires(store, clock):
+    first = LeaderElection(store, ttl=30, owner="a")
+    second = LeaderElection(store, ttl=30, owner="b")
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    # O primeiro caiu sem liberar o lease
+    clock[0] += 31
+    assert second.try_acquire()
+    assert not first.try_acquire()
+    assert second.current() == {"holder": "b", "expires_at": 1061.0}
+
+
+def test_release_lets_another_worker_in(store, clock):
+    first = LeaderElection(store, ttl=30, owner="a")
+    second = LeaderElection(store, ttl=30, owner="b")
+    assert first.try_acquire()
+
+    second.release()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+
+
+def test_takeover_callback_runs_once_per_takeover(store, clock):
+    calls = []
+
+    async def on_takeover():
+        calls.append(clock[0])
+
+    election = LeaderElection(store, ttl=30, owner="a", on_takeover=on_takeover)
+
+    async def scenario():
+        assert await election.acquire()
+        assert await election.acquire()
+        lease = store.read("scheduler")
+        store.compare_and_set("scheduler", lease, {"holder": "b", "expires_at": 2000.0})
+        assert not await election.acquire()
+        clock[0] = 2001.0
+        assert await election.acquire()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert calls == [1000.0, 2001.0]
+    assert election.takeovers == 2
+
+
+def test_last_fire_time():
+    trigger = CronTrigger(hour=6, minute=10, timezone=TZ)
+    tick = TZ.localize(datetime.datetime(2023, 3, 4, 6, 10))
+    window = datetime.timedelta(seconds=60)
+
+    assert last_fire_time(trigger, tick - window / 2, tick + window / 2) == tick
+    assert last_fire_time(trigger, tick, tick + window) is None
+    assert last_fire_time(trigger, tick + window, tick + 2 * window) is None
+    assert last_fire_time(trigger, tick - datetime.timedelta(days=2), tick) == tick
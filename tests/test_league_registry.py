@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from app.league_registry import CADENCE_DAILY, CADENCE_MANUAL, LeagueConfig, LeagueRegistry
+
+
+def write(path, data, mtime: float):
+    path.write_text(json.dumps(data))
+    # mtime explícito: duas escritas seguidas podem cair no mesmo instante
+    os.utime(path, (mtime, mtime))
+
+
+def test_current_season_explicit_or_latest_of_the_list():
+    config = LeagueConfig.parse({"current_season": 2024, "leagues": [
+        {"league_id": 39}, {"league_id": 61, "season": 2023}]})
+    assert config.current_season == 2024
+    assert [(league["league_id"], league["season"]) for league in config.leagues] == [
+        (39, 2024), (61, 2023)]
+
+    legacy = LeagueConfig.parse([{"league_id": 39, "season": 2022}, {"league_id": 61, "season": 2023}])
+    assert legacy.current_season == 2023
+
+
+@pytest.mark.parametrize("data", [
+    {"current_season": 2023},
+    {"leagues": [{"league_id": 39}]},
+    {"current_season": 2023, "leagues": [{"league_id": 39, "cadence": "hourly"}]},
+    {"current_season": 2023, "leagues": [{"league_id": 39}, {"league_id": 39}]},
+])
+def test_invalid_files_are_rejected(data):
+    with pytest.raises(ValueError):
+        LeagueConfig.parse(data)
+
+
+def test_cadence_filtering(tmp_path):
+    path = tmp_path / "leagues.json"
+    write(path, {"current_season": 2023, "leagues": [
+        {"league_id": 39},
+        {"league_id": 61, "cadence": CADENCE_DAILY},
+        {"league_id": 140, "cadence": CADENCE_MANUAL},
+    ]}, 1000)
+    registry = LeagueRegistry(str(path))
+
+    assert [league["league_id"] for league in registry.leagues()] == [39, 61, 140]
+    assert [league["league_id"] for league in registry.scheduled()] == [39, 61]
+    assert [league["league_id"] for league in registry.leagues((CADENCE_MANUAL,))] == [140]
+
+
+def test_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "leagues.json"
+    write(path, {"current_season": 2023, "leagues": [{"league_id": 39}]}, 1000)
+    reloaded = []
+    registry = LeagueRegistry(str(path), on_reload=reloaded.append)
+    assert registry.current_season == 2023
+
+    write(path, {"current_season": 2024, "leagues": [{"league_id": 39}, {"league_id": 61}]}, 2000)
+    assert registry.current_season == 2024
+    assert len(registry.leagues()) == 2
+    assert registry.reloads == 1
+    assert [config.current_season for config in reloaded] == [2024]
+
+
+def test_invalid_file_keeps_the_previous_config(tmp_path):
+    path = tmp_path / "leagues.json"
+    write(path, {"current_season": 2023, "leagues": [{"league_id": 39}]}, 1000)
+    registry = LeagueRegistry(str(path))
+    registry.config()
+
+    path.write_text("{not json")
+    os.utime(path, (2000, 2000))
+    assert registry.current_season == 2023
+    assert registry.current_season == 2023
+    # O arquivo inválido é lido uma vez, não a cada chamada
+    assert registry.errors == 1
+
+    write(path, {"current_season": 2024, "leagues": [{"league_id": 39}]}, 3000)
+    assert registry.current_season == 2024
+
+
+def test_missing_file_on_first_read_raises(tmp_path):
+    with pytest.raises(ValueError):
+        LeagueRegistry(str(tmp_path / "missing.json")).config()
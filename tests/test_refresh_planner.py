@@ -0,0 +1,64 @@
+import datetime
+
+from app.refresh_planner import MATCH_DURATION, TeamStatsRefreshPlanner
+
+TTL = datetime.timedelta(hours=24)
+LEAGUE = (39, 2023)
+
+
+def now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def match(home: int, away: int) -> dict:
+    return {"teams": {"home": {"id": home}, "away": {"id": away}}}
+
+
+def store_stats(db, team_id: int, updated_at: datetime.datetime):
+    db.team_stats_collection.insert_one({
+        "team_id": team_id, "league_id": LEAGUE[0], "season": LEAGUE[1],
+        "statistics": {}, "updated_at": updated_at,
+    })
+
+
+def plan(db, matches):
+    return TeamStatsRefreshPlanner(db, TTL).plan({LEAGUE: matches})
+
+
+def test_teams_without_statistics_are_refreshed(mongo_db):
+    result = plan(mongo_db, [match(1, 2)])
+
+    assert result.to_refresh == [(39, 2023, 1), (39, 2023, 2)]
+    assert result.skipped_fresh == 0
+
+
+def test_duplicate_teams_are_fetched_once(mongo_db):
+    result = plan(mongo_db, [match(1, 2), match(2, 3), match(1, 3)])
+
+    assert result.requested == 6
+    assert result.unique == 3
+    assert result.report()["skipped_duplicates"] == 3
+
+
+def test_ttl_boundary(mongo_db):
+    store_stats(mongo_db, 1, now() - TTL + datetime.timedelta(minutes=1))
+    store_stats(mongo_db, 2, now() - TTL - datetime.timedelta(minutes=1))
+    result = plan(mongo_db, [match(1, 2)])
+
+    assert result.to_refresh == [(39, 2023, 2)]
+    assert result.skipped_fresh == 1
+
+
+def test_statistics_older_than_the_last_finished_match_are_stale(mongo_db, monkeypatch):
+    kickoff = now() - datetime.timedelta(hours=5)
+    # Atualizadas antes do fim do jogo: ainda não o incluem
+    store_stats(mongo_db, 1, kickoff + MATCH_DURATION - datetime.timedelta(minutes=1))
+    # Atualizadas depois do fim do jogo
+    store_stats(mongo_db, 2, kickoff + MATCH_DURATION + datetime.timedelta(minutes=1))
+    # O mongomock não avalia caminhos de campo dentro de arrays no $project da agregação
+    monkeypatch.setattr(mongo_db, "get_last_played_dates", lambda teams_by_league: {
+        (39, 2023, 1): kickoff, (39, 2023, 2): kickoff})
+    result = plan(mongo_db, [match(1, 2)])
+
+    assert result.to_refresh == [(39, 2023, 1)]
+    assert result.report()["api_calls_saved"] == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from app.screener import ScreenFilter, SeasonScreen
+
+
+def team(team_id: int, yellow_card_avg=None, played=None, goals_for=None) -> dict:
+    statistics = {}
+    if yellow_card_avg is not None:
+        statistics["yellow_card_avg"] = yellow_card_avg
+    if played is not None:
+        statistics["total_matches_played"] = played
+        statistics["total_goals_for"] = goals_for
+    return {"team_id": team_id, "statistics": statistics or None}
+
+
+def screen() -> SeasonScreen:
+    return SeasonScreen([
+        {"_id": 1, "home": team(10, 3.0, 10, 20), "away": team(11, 1.5, 10, 5)},
+        {"_id": 2, "home": team(12, 2.5, 10, 15), "away": team(13, 2.5, 10, 10)},
+        # Time sem estatísticas: NaN em todas as métricas
+        {"_id": 3, "home": team(10, 3.0, 10, 20), "away": team(14)},
+    ])
+
+
+def test_parse_reads_all_parts():
+    screen_filter = ScreenFilter.parse("yellow_card_avg:soma:>=:4")
+
+    assert screen_filter.metric == "yellow_card_avg"
+    assert screen_filter.scope == "soma"
+    assert screen_filter.op == ">="
+    assert screen_filter.value == 4.0
+
+
+@pytest.mark.parametrize("expression", [
+    "yellow_card_avg:soma:>",
+    "yellow_card_avg:soma:>:4:1",
+    "yellow_card_avg:soma:>:muitos",
+    "corners_avg:soma:>:4",
+    "yellow_card_avg:todos:>:4",
+    "yellow_card_avg:soma:==:4",
+])
+def test_parse_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        ScreenFilter.parse(expression)
+
+
+def test_scopes():
+    season = screen()
+
+    assert season.screen([ScreenFilter.parse("yellow_card_avg:algum:>:2.8")]) == [1, 3]
+    assert season.screen([ScreenFilter.parse("yellow_card_avg:ambos:>=:2.5")]) == [2]
+    assert season.screen([ScreenFilter.parse("yellow_card_avg:soma:>:4.6")]) == [2]
+
+
+def test_missing_statistics_never_match():
+    season = screen()
+
+    assert season.screen([ScreenFilter.parse("goals_for_avg:ambos:<:100")]) == [1, 2]
+    assert season.screen([ScreenFilter.parse("goals_for_avg:soma:>=:0")]) == [1, 2]
+
+
+def test_match_all_and_match_any():
+    season = screen()
+    filters = [
+        ScreenFilter.parse("goals_for_avg:algum:>:1.8"),
+        ScreenFilter.parse("yellow_card_avg:ambos:<=:2.5"),
+    ]
+
+    assert season.screen(filters) == []
+    assert season.screen(filters, match_all=False) == [1, 2, 3]
+    assert season.screen([]) == [1, 2, 3]
+
+
+def test_missing_value_replaces_absent_statistics():
+    season = screen()
+    # Filtro legado de /confrontos-filtrados: time sem estatísticas conta como 0 cartões
+    legacy = [
+        ScreenFilter("yellow_card_avg", "algum", ">", 3.5, missing=0.0),
+        ScreenFilter("yellow_card_avg", "soma", ">", 2.9, missing=0.0),
+    ]
+
+    assert season.screen([ScreenFilter("yellow_card_avg", "soma", ">", 2.9)]) == [1, 2]
+    assert season.screen(legacy, match_all=False) == [1, 2, 3]
+    assert season.screen([ScreenFilter("yellow_card_avg", "ambos", ">=", 0, missing=0.0)]) == [1, 2, 3]
@@ -0,0 +1,46 @@
+import asyncio
+
+from app.standings_index import LeagueStandings, StandingsIndex
+
+
+def standings_data(teams: int = 8) -> dict:
+    return {
+        "league_info": {"id": 39, "season": 2023},
+        "standings": [{"team_id": 100 + rank, "rank": rank} for rank in range(1, teams + 1)],
+    }
+
+
+def test_quartiles_split_the_table():
+    standings = LeagueStandings(standings_data(8))
+
+    assert standings.quartile_threshold == 2
+    assert standings.top_quartile == {101, 102}
+    assert standings.bottom_quartile == {107, 108}
+    assert standings.rank(105) == 5
+    assert standings.rank(999) is None
+
+
+def test_quartile_match_needs_top_against_bottom():
+    standings = LeagueStandings(standings_data(8))
+
+    assert standings.is_quartile_match(101, 108)
+    assert standings.is_quartile_match(107, 102)
+    assert not standings.is_quartile_match(101, 102)
+    assert not standings.is_quartile_match(101, 105)
+
+
+def test_index_caches_until_invalidated(mongo_db, async_db):
+    mongo_db.update_league_data(39, 2023, standings_data(8))
+    index = StandingsIndex(async_db)
+
+    first = asyncio.run(index.get(39, 2023))
+    second = asyncio.run(index.get(39, 2023))
+    assert first is second
+    assert first.top_quartile == {101, 102}
+
+    mongo_db.update_league_data(39, 2023, standings_data(4))
+    assert asyncio.run(index.get(39, 2023)) is first
+
+    index.invalidate(39, 2023)
+    assert asyncio.run(index.get(39, 2023)).top_quartile == {101}
+    assert index.stats() == {"entries": 1, "hits": 2, "misses": 2, "invalidations": 1}